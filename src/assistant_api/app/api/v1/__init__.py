@@ -4,9 +4,13 @@ from fastapi import APIRouter
 
 from assistant_api.app.api.v1.prewarm import router as prewarm_router
 from assistant_api.app.api.v1.speech import router as speech_router
+from assistant_api.app.api.v1.speech_batch import router as speech_batch_router
+from assistant_api.app.api.v1.speech_stream import router as speech_stream_router
 
 api_router = APIRouter()
 api_router.include_router(prewarm_router)
 api_router.include_router(speech_router)
+api_router.include_router(speech_batch_router)
+api_router.include_router(speech_stream_router)
 
 __all__ = ["api_router"]
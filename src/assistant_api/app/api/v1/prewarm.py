@@ -4,18 +4,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
 from assistant_api.app.core.prewarm import PrewarmRequest, get_prewarm_manager
+from assistant_api.app.core.voice_cache import get_voice_cache
 from assistant_api.app.settings import Settings
-from assistant_api.app.workers.tts_piper import PiperTtsWorker
+from assistant_api.app.workers.manager import get_worker_manager
+from assistant_api.app.workers.tts_piper import PiperTtsWorker, voice_exists
 
 router = APIRouter(prefix="/v1/audio", tags=["prewarm"])
 logger = logging.getLogger(__name__)
-_PIPER_PREWARM_WORKER: PiperTtsWorker | None = None
-_PIPER_PREWARM_LOCK = asyncio.Lock()
 
 
 class PrewarmPayload(BaseModel):
@@ -35,33 +36,57 @@ async def prewarm_audio(
     payload: PrewarmPayload,
     settings: Settings = Depends(get_settings),
 ) -> dict[str, str]:
-    """Record prewarm intent for audio resources without loading models."""
+    """Record prewarm intent and, for Piper, load the voice best-effort.
+
+    The request also counts as a usage hint for the prewarm scheduler.
+    Unknown Piper voices are rejected with 400, and loads beyond the prewarm
+    rate limit with 429.
+    """
+    tts = settings.tts
+    if tts.engine == "piper" and payload.voice and not voice_exists(tts, payload.voice):
+        raise HTTPException(status_code=400, detail=f"Unknown voice {payload.voice!r}.")
     manager = get_prewarm_manager()
+    warm = (
+        payload.resource_id is not None
+        and payload.resource_id.startswith("tts:piper")
+        and PiperTtsWorker.is_available(tts)
+    )
+    voice_id = payload.voice or tts.default_model
+    if warm and not manager.try_begin_warm(voice_id or ""):
+        raise HTTPException(
+            status_code=429,
+            detail="Prewarm already running or recently done; retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(tts.prewarm_warm_interval_s)))},
+        )
     request = PrewarmRequest(
         resource_id=payload.resource_id,
         language=payload.language,
         voice=payload.voice,
     )
     manager.request_optional(request)
-    if payload.resource_id and payload.resource_id.startswith("tts:piper"):
-        if PiperTtsWorker.is_available(settings.tts):
-            voice_id = payload.voice or settings.tts.default_model
-            logger.info(
-                "Piper prewarm requested for voice=%s",
-                voice_id or "<unspecified>",
-            )
-            global _PIPER_PREWARM_WORKER
-            if _PIPER_PREWARM_WORKER is None:
-                async with _PIPER_PREWARM_LOCK:
-                    if _PIPER_PREWARM_WORKER is None:
-                        worker = PiperTtsWorker(settings.tts)
-                        if await asyncio.to_thread(worker.preload):
-                            _PIPER_PREWARM_WORKER = worker
-                            logger.info("Piper prewarm succeeded")
-                        else:
-                            logger.warning("Piper prewarm skipped: preload failed")
-                    else:
-                        logger.info("Piper prewarm skipped: model already loaded")
+    if not warm:
+        return {"status": "accepted"}
+    try:
+        logger.info(
+            "Piper prewarm requested for voice=%s",
+            voice_id or "<unspecified>",
+        )
+        pool = get_worker_manager().get_pool(PiperTtsWorker.worker_type())
+        if pool is not None:
+            # Synthesis runs in the pool, so that is where the voice is needed.
+            warmed = await asyncio.to_thread(pool.warm, {"voice": voice_id})
+            logger.info("Piper prewarm loaded the voice in %d worker processes", warmed)
+        elif voice_id and get_voice_cache().get(voice_id) is not None:
+            logger.info("Piper prewarm skipped: model already loaded")
+        else:
+            # Loads go through the shared voice cache, so the speech
+            # endpoint reuses the warmed model and concurrent prewarm
+            # calls for the same voice share a single load.
+            worker = PiperTtsWorker(tts, voice_cache=get_voice_cache())
+            if await asyncio.to_thread(worker.preload, voice_id):
+                logger.info("Piper prewarm succeeded")
             else:
-                logger.info("Piper prewarm skipped: model already loaded")
+                logger.warning("Piper prewarm skipped: preload failed")
+    finally:
+        manager.end_warm()
     return {"status": "accepted"}
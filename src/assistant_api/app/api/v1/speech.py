@@ -2,22 +2,55 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from uuid import uuid4
 
 import logging
+import time
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, root_validator
 
+from assistant_api.app.audio.encode_pipeline import EncodePipeline, StageTimings
+from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.encoders.mp3 import DEFAULT_BITRATE_KBPS as MP3_BITRATE_KBPS
 from assistant_api.app.audio.encoders.mp3 import Mp3Encoder
+from assistant_api.app.audio.encoders.opus import DEFAULT_BITRATE_KBPS as OPUS_BITRATE_KBPS
 from assistant_api.app.audio.encoders.opus import OpusEncoder
 from assistant_api.app.audio.encoders.pcm import PcmPassthroughEncoder
+from assistant_api.app.audio.resample import ResamplingStream
 from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+from assistant_api.app.core.admission import (
+    PRIORITIES,
+    PRIORITY_NORMAL,
+    AdmissionQueueFullError,
+    AdmissionRejectedError,
+    get_admission_controller,
+)
+from assistant_api.app.core.audio_cache import audio_cache_key, get_audio_cache
+from assistant_api.app.core.coalescing import (
+    Flight,
+    RequestCoalescer,
+    get_request_coalescer,
+)
+from assistant_api.app.core.encoder_pool import get_encoder_pool
+from assistant_api.app.core.metrics import get_speech_metrics
+from assistant_api.app.core.prewarm import get_prewarm_manager
+from assistant_api.app.core.segment_cache import get_segment_cache
+from assistant_api.app.core.segment_pipeline import get_segment_pipeline
+from assistant_api.app.core.voice_cache import get_voice_cache
 from assistant_api.app.settings import Settings
+from assistant_api.app.workers.manager import get_worker_manager
+from assistant_api.app.workers.pool import WorkerPoolBusyError
 from assistant_api.app.workers.tts_dummy import DummyTtsWorker
-from assistant_api.app.workers.tts_piper import PiperTtsWorker
+from assistant_api.app.workers.tts_piper import (
+    PiperTtsWorker,
+    uses_segment_pipeline,
+    voice_content_hash,
+)
 
 router = APIRouter(prefix="/v1/audio", tags=["speech"])
 logger = logging.getLogger(__name__)
@@ -30,6 +63,7 @@ class SpeechRequest(BaseModel):
     text: str | None = None
     voice: str | None = None
     format: str | None = None
+    sample_rate: int | None = None
 
     @root_validator(pre=True)
     def require_input_or_text(cls, values: dict[str, object]) -> dict[str, object]:
@@ -38,83 +72,591 @@ class SpeechRequest(BaseModel):
         return values
 
 
+@dataclass
+class RenderedSpeech:
+    """Encoded output of one speech request and what describes it.
+
+    `content` must be consumed or closed; closing it releases the request's
+    synthesis slot, worker and encoder.
+    """
+
+    content: Iterator[bytes]
+    media_type: str
+    audio_format: str
+    model_name: str
+    cache_status: str
+    server_timing: dict[str, float] = field(default_factory=dict)
+    coalesced: bool = False
+
+
 def get_settings(request: Request) -> Settings:
     return request.app.state.settings
 
 
+def get_priority(x_priority: str | None = Header(default=None)) -> int:
+    if x_priority is None:
+        return PRIORITY_NORMAL
+    priority = PRIORITIES.get(x_priority.strip().lower())
+    if priority is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid 'x-priority' header. Supported values: high, normal, low.",
+        )
+    return priority
+
+
+def create_piper_worker(settings: Settings) -> PiperTtsWorker:
+    """Return an in-process Piper worker wired to the shared caches."""
+    segmented = uses_segment_pipeline(settings.tts)
+    return PiperTtsWorker(
+        settings.tts,
+        voice_cache=get_voice_cache(),
+        segment_pipeline=get_segment_pipeline() if segmented else None,
+        segment_cache=get_segment_cache(),
+    )
+
+
+_MEDIA_TYPES = {
+    "mp3": "audio/mpeg",
+    "pcm": "audio/pcm",
+    "opus": "audio/ogg; codecs=opus",
+}
+_CACHED_CHUNK_SIZE = 64 * 1024
+SUPPORTED_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+# libopus only encodes at these rates.
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def resolve_format(requested_format: str | None) -> tuple[str, str]:
+    """Return the audio format and media type, or raise HTTP 400."""
+    audio_format = requested_format or "mp3"
+    media_type = _MEDIA_TYPES.get(audio_format)
+    if media_type is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{requested_format}'. Supported formats: mp3, pcm, opus.",
+        )
+    return audio_format, media_type
+
+
+def resolve_sample_rate(requested: int | None, audio_format: str) -> int | None:
+    """Validate a requested output sample rate for `audio_format`."""
+    if requested is None:
+        return None
+    supported = _OPUS_SAMPLE_RATES if audio_format == "opus" else SUPPORTED_SAMPLE_RATES
+    if requested not in supported:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unsupported sample_rate {requested} for format '{audio_format}'. "
+                f"Supported sample rates: {', '.join(map(str, supported))}."
+            ),
+        )
+    return requested
+
+
+def output_sample_rate(requested: int | None, native: int, audio_format: str) -> int:
+    """Return the rate to encode at, given the voice's native rate."""
+    rate = requested or native
+    if audio_format == "opus" and rate not in _OPUS_SAMPLE_RATES:
+        # Native voice rates such as 22.05 kHz cannot be encoded as Opus.
+        rate = next((r for r in _OPUS_SAMPLE_RATES if r >= rate), _OPUS_SAMPLE_RATES[-1])
+    return rate
+
+
+def acquire_encoder(
+    settings: Settings,
+    audio_format: str,
+    pcm_spec: PcmSpec,
+) -> tuple[AudioEncoder, tuple[str, PcmSpec, str]]:
+    """Return a pooled or new encoder and the key to release it under."""
+    key = (audio_format, pcm_spec, _encoder_settings(settings, audio_format))
+    encoder = get_encoder_pool().acquire(
+        key, lambda: _create_encoder(settings, audio_format, pcm_spec)
+    )
+    return encoder, key
+
+
+def _create_encoder(
+    settings: Settings,
+    audio_format: str,
+    pcm_spec: PcmSpec,
+) -> AudioEncoder:
+    if audio_format == "mp3":
+        return Mp3Encoder(pcm_spec)
+    if audio_format == "opus":
+        return OpusEncoder(
+            pcm_spec,
+            first_page_frames=settings.tts.opus_first_page_frames,
+            frames_per_page=settings.tts.opus_frames_per_page,
+        )
+    return PcmPassthroughEncoder(pcm_spec)
+
+
+def _encoder_settings(settings: Settings, audio_format: str) -> str:
+    if audio_format == "mp3":
+        return f"bitrate_kbps={MP3_BITRATE_KBPS}"
+    if audio_format == "opus":
+        return (
+            f"bitrate_kbps={OPUS_BITRATE_KBPS};"
+            f"first_page_frames={settings.tts.opus_first_page_frames};"
+            f"frames_per_page={settings.tts.opus_frames_per_page}"
+        )
+    return ""
+
+
+def _audio_cache_key(
+    settings: Settings,
+    text: str,
+    voice: str | None,
+    audio_format: str,
+    sample_rate: int | None = None,
+) -> str | None:
+    if settings.tts.engine == "piper":
+        voice_id = voice or settings.tts.default_model
+        if not voice_id:
+            return None
+        try:
+            model_hash = voice_content_hash(settings.tts, voice_id)
+        except (OSError, RuntimeError):
+            # Let the synthesis path report missing models as usual.
+            return None
+    else:
+        voice_id = "dummy"
+        model_hash = DummyTtsWorker.worker_type()
+    encoder_settings = _encoder_settings(settings, audio_format)
+    if sample_rate is not None:
+        encoder_settings += f";sample_rate={sample_rate}"
+    return audio_cache_key(
+        text,
+        voice_id,
+        model_hash,
+        audio_format,
+        encoder_settings,
+        _synthesis_settings(settings),
+    )
+
+
+def _synthesis_settings(settings: Settings) -> str:
+    tts = settings.tts
+    if tts.engine != "piper":
+        return (
+            f"real_time_factor={tts.dummy_real_time_factor};"
+            f"sentence_latency_ms={tts.dummy_sentence_latency_ms};"
+            f"jitter_ms={tts.dummy_jitter_ms}"
+        )
+    if not uses_segment_pipeline(tts):
+        return ""
+    # Segment boundaries and the silence between them shape the PCM.
+    return (
+        f"segment_max_chars={tts.segment_max_chars};"
+        f"segment_silence_ms={tts.segment_silence_ms}"
+    )
+
+
+def _iter_cached(data: bytes) -> Generator[bytes, None, None]:
+    for start in range(0, len(data), _CACHED_CHUNK_SIZE):
+        yield data[start : start + _CACHED_CHUNK_SIZE]
+
+
+class _ResponseContent:
+    """Response body that runs `on_close` once it is exhausted or closed.
+
+    Closing works even if iteration never started, as when a client
+    disconnects before its response begins streaming; an unread body that is
+    dropped is closed when it is collected.
+    """
+
+    def __init__(self, content: Iterator[bytes], on_close: Callable[[], None]) -> None:
+        self._content = content
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self) -> _ResponseContent:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._content)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self._content, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+def _record_stage_metrics(
+    labels: dict[str, str],
+    timings: StageTimings,
+    pcm_spec: PcmSpec,
+) -> None:
+    metrics = get_speech_metrics()
+    metrics.encode_seconds.observe(timings.encode_s, **labels)
+    metrics.response_bytes.observe(timings.encoded_bytes, **labels)
+    if timings.synthesis_s is None:
+        return
+    metrics.synthesis_seconds.observe(timings.synthesis_s, **labels)
+    bytes_per_second = pcm_spec.sample_rate * pcm_spec.channels * pcm_spec.sample_width_bytes
+    audio_s = timings.pcm_bytes / bytes_per_second
+    if audio_s > 0:
+        metrics.real_time_factor.observe(timings.synthesis_s / audio_s, **labels)
+
+
+def _speech_response(rendered: RenderedSpeech) -> StreamingResponse:
+    response = StreamingResponse(rendered.content, media_type=rendered.media_type)
+    response.headers["x-request-id"] = str(uuid4())
+    response.headers["cache-control"] = "no-store"
+    response.headers["content-disposition"] = (
+        f'inline; filename="speech.{rendered.audio_format}"'
+    )
+    response.headers["x-openai-model"] = rendered.model_name
+    response.headers["x-openai-audio-format"] = rendered.audio_format
+    response.headers["x-cache"] = rendered.cache_status
+    if rendered.coalesced:
+        response.headers["x-coalesced"] = "true"
+    if rendered.server_timing:
+        _set_timing_headers(response, rendered.server_timing)
+    return response
+
+
+def _set_timing_headers(response: StreamingResponse, server_timing: dict[str, float]) -> None:
+    # Durations are in milliseconds, as Server-Timing specifies.
+    response.headers["server-timing"] = ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in server_timing.items()
+    )
+    for name, seconds in server_timing.items():
+        response.headers[f"x-{name}-ms"] = f"{seconds * 1000:.1f}"
+
+
 @router.post("/speech")
 def synthesize_speech(
     request: SpeechRequest,
     settings: Settings = Depends(get_settings),
+    priority: int = Depends(get_priority),
 ) -> StreamingResponse:
     """Stream PCM audio for the requested text."""
+    return _speech_response(render_speech(request, settings, priority))
+
+
+def render_speech(
+    request: SpeechRequest,
+    settings: Settings,
+    priority: int = PRIORITY_NORMAL,
+) -> RenderedSpeech:
+    """Run one speech request through cache, coalescing, admission and synthesis.
+
+    Raises HTTPException for requests that cannot be served.
+    """
+    engine = settings.tts.engine
+    in_flight = get_speech_metrics().requests_in_flight
+    in_flight.inc(engine=engine)
+    # Once a response is returned, closing its body closes the cleanup stack;
+    # until then, errors close it here.
+    cleanup = ExitStack()
+    cleanup.callback(in_flight.dec, engine=engine)
+    try:
+        return _render_speech(request, settings, priority, cleanup)
+    except BaseException:
+        cleanup.close()
+        raise
+
+
+def _admit(priority: int, cleanup: ExitStack) -> float:
+    """Take a synthesis slot, returning the seconds spent queued for it."""
+    admission = get_admission_controller()
+    started = time.perf_counter()
+    try:
+        admission.acquire(priority)
+    except AdmissionRejectedError as exc:
+        full = isinstance(exc, AdmissionQueueFullError)
+        logger.warning("Speech request rejected by admission control: %s", exc)
+        raise HTTPException(
+            status_code=429 if full else 503,
+            detail="Server is busy; retry later.",
+            headers={"Retry-After": str(exc.retry_after_s)},
+        ) from exc
+    cleanup.callback(admission.release)
+    return time.perf_counter() - started
+
+
+def _join_flight(
+    coalescer: RequestCoalescer,
+    key: str,
+) -> tuple[Flight | None, Iterator[bytes] | None]:
+    """Return a flight to lead, or a subscription to an identical running one.
+
+    Returns neither when the running flight does not start streaming in time;
+    the caller then synthesizes without coalescing.
+    """
+    deadline = time.monotonic() + coalescer.wait_timeout_s
+    while True:
+        flight, leader = coalescer.join(key)
+        if leader:
+            return flight, None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("Coalesced leader did not start in time; synthesizing alone.")
+            return None, None
+        # A leader that fails before streaming releases its followers, and
+        # one of them leads the next attempt.
+        if flight.wait_started(remaining):
+            subscription = flight.subscribe()
+            if subscription is not None:
+                return None, subscription
+
+
+def _render_speech(
+    request: SpeechRequest,
+    settings: Settings,
+    priority: int,
+    cleanup: ExitStack,
+) -> RenderedSpeech:
+    received_at = time.perf_counter()
+    metrics = get_speech_metrics()
     text = request.input if request.input is not None else request.text
     payload = {"text": text, "voice": request.voice, "format": request.format}
+    audio_format, media_type = resolve_format(request.format)
+    sample_rate = resolve_sample_rate(request.sample_rate, audio_format)
+    model_name = (
+        "assistant-api-tts-piper"
+        if settings.tts.engine == "piper"
+        else "assistant-api-tts-dummy"
+    )
+    audio_cache = get_audio_cache()
+    cache_key = None
+    if audio_cache.enabled:
+        cache_key = _audio_cache_key(
+            settings, text or "", request.voice, audio_format, sample_rate
+        )
+        cached = audio_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info("Audio cache hit for %s request", audio_format)
+            return RenderedSpeech(
+                _ResponseContent(_iter_cached(cached), cleanup.close),
+                media_type,
+                audio_format,
+                model_name,
+                "hit",
+                {"cache-lookup": time.perf_counter() - received_at},
+            )
+    flight = None
+    coalescer = get_request_coalescer()
+    if coalescer.enabled:
+        coalesce_key = cache_key or _audio_cache_key(
+            settings, text or "", request.voice, audio_format, sample_rate
+        )
+        if coalesce_key is not None:
+            flight, subscription = _join_flight(coalescer, coalesce_key)
+            if subscription is not None:
+                logger.info("Joined in-flight synthesis for %s request", audio_format)
+                return RenderedSpeech(
+                    _ResponseContent(subscription, cleanup.close),
+                    media_type,
+                    audio_format,
+                    model_name,
+                    "miss" if cache_key else "bypass",
+                    {"coalesce-wait": time.perf_counter() - received_at},
+                    coalesced=True,
+                )
+            if flight is not None:
+                cleanup.callback(flight.abandon)
+    # Cache hits and coalesced followers are cheap; only synthesis needs a slot.
+    queue_wait_s = _admit(priority, cleanup)
     default_pcm_spec = PcmSpec(
         sample_rate=SampleRate(16_000),
         channels=Channels(1),
         sample_width_bytes=2,
     )
     pcm_spec = default_pcm_spec
-    model_name = "assistant-api-tts-dummy"
+    voice_load_s: float | None = None
     if settings.tts.engine == "piper":
         resolved_voice = request.voice or settings.tts.default_model
+        voice_labels = {"engine": "piper", "voice": resolved_voice or "default"}
         logger.info("Using Piper TTS engine")
         logger.info(
             "Piper TTS: resolved voice=%s",
             resolved_voice or "<unspecified>",
         )
-        worker = PiperTtsWorker(settings.tts)
+        pool = get_worker_manager().get_pool(PiperTtsWorker.worker_type())
         try:
-            stream = worker.process(payload)
+            if pool is not None:
+                pooled_stream = pool.submit(payload)
+                queue_wait_s += pooled_stream.queue_wait_s
+                voice_load_s = pooled_stream.voice_load_s
+                pcm_spec = pooled_stream.pcm_spec or default_pcm_spec
+                stream = pooled_stream
+            else:
+                worker = create_piper_worker(settings)
+                if settings.tts.streaming_enabled:
+                    stream = worker.process_streaming(
+                        payload, max_buffered_bytes=settings.tts.stream_buffer_bytes
+                    )
+                else:
+                    stream = worker.process(payload)
+                voice_load_s = worker.last_voice_load_s
+                pcm_spec = worker.pcm_spec or default_pcm_spec
         except FileNotFoundError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
+        except WorkerPoolBusyError as exc:
+            raise HTTPException(
+                status_code=503,
+                detail="All TTS workers are busy; retry later.",
+                headers={"Retry-After": str(settings.tts.admission_retry_after_s)},
+            ) from exc
         except Exception as exc:
             logger.exception("Piper TTS failed.")
             raise HTTPException(
                 status_code=500,
                 detail="Piper TTS failed to synthesize speech.",
             ) from exc
-        pcm_spec = worker.pcm_spec or default_pcm_spec
-        model_name = "assistant-api-tts-piper"
+        if resolved_voice:
+            # Feeds the prewarm scheduler's prediction of voices to keep loaded.
+            get_prewarm_manager().record_usage(resolved_voice)
     else:
         logger.info("Using Dummy TTS engine")
-        worker = DummyTtsWorker()
-        stream = worker.process(payload)
-    if request.format is None or request.format == "mp3":
-        encoder = Mp3Encoder(pcm_spec)
-        media_type = "audio/mpeg"
-        audio_format = "mp3"
-    elif request.format == "pcm":
-        encoder = PcmPassthroughEncoder(pcm_spec)
-        media_type = "audio/pcm"
-        audio_format = "pcm"
-    elif request.format == "opus":
-        encoder = OpusEncoder(pcm_spec)
-        media_type = "audio/ogg; codecs=opus"
-        audio_format = "opus"
-    else:
+        voice_labels = {"engine": "dummy", "voice": "dummy"}
+        pool = get_worker_manager().get_pool(DummyTtsWorker.worker_type())
+        if pool is not None:
+            try:
+                stream = pool.submit(payload)
+                queue_wait_s += stream.queue_wait_s
+            except WorkerPoolBusyError as exc:
+                raise HTTPException(
+                    status_code=503,
+                    detail="All TTS workers are busy; retry later.",
+                    headers={"Retry-After": str(settings.tts.admission_retry_after_s)},
+                ) from exc
+        else:
+            stream = DummyTtsWorker.from_settings(settings.tts).process(payload)
+    request_labels = {**voice_labels, "format": audio_format}
+    metrics.queue_wait_seconds.observe(queue_wait_s, **request_labels)
+    if voice_load_s is not None:
+        metrics.model_load_seconds.observe(voice_load_s, **request_labels)
+    output_rate = output_sample_rate(sample_rate, int(pcm_spec.sample_rate), audio_format)
+    if output_rate != pcm_spec.sample_rate:
+        # Resample before encoding, so low-rate clients neither pay for
+        # encoding nor for transferring samples they would discard.
+        resampled = ResamplingStream(stream, pcm_spec, output_rate)
+        stream, pcm_spec = resampled, resampled.pcm_spec
+    try:
+        encoder, encoder_key = acquire_encoder(settings, audio_format, pcm_spec)
+    except BaseException:
+        # Do not leave a streaming producer blocked on a stream nobody reads.
+        stream.cancel()
+        raise
+
+    # PCM passthrough has nothing worth moving to another thread.
+    pipeline = EncodePipeline(
+        stream,
+        encoder,
+        threaded=settings.tts.encode_thread_enabled and audio_format != "pcm",
+        max_buffered_bytes=settings.tts.stream_buffer_bytes,
+    )
+    # Wait for the first chunk before sending headers, so they can carry its
+    # timing and a failure before any audio still gets a proper error status.
+    try:
+        first_chunk = pipeline.read_encoded()
+    except Exception as exc:
+        pipeline.cancel()
+        logger.exception("TTS failed before the first audio chunk.")
         raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported format '{request.format}'. Supported formats: mp3, pcm, opus.",
-        )
+            status_code=500,
+            detail="TTS failed to synthesize speech.",
+        ) from exc
+    except BaseException:
+        pipeline.cancel()
+        raise
+    server_timing = {
+        "model-load": voice_load_s or 0.0,
+        "queue": queue_wait_s,
+        "first-chunk": pipeline.timings.first_chunk_s or 0.0,
+    }
+
+    captured: bytearray | None = bytearray() if cache_key else None
 
     def stream_audio() -> Generator[bytes, None, None]:
-        while True:
-            chunk = stream.read_encoded()
-            if chunk is None:
-                break
-            yield encoder.encode_chunk(chunk)
-        flush_chunk = encoder.flush()
-        if flush_chunk:
-            yield flush_chunk
-
-    response = StreamingResponse(stream_audio(), media_type=media_type)
-    response.headers["x-request-id"] = str(uuid4())
-    response.headers["cache-control"] = "no-store"
-    response.headers["content-disposition"] = (
-        f'inline; filename="speech.{audio_format}"'
+        nonlocal captured
+        first_byte = True
+        encoded = first_chunk
+        while encoded is not None:
+            if encoded:
+                if first_byte:
+                    first_byte = False
+                    metrics.time_to_first_byte_seconds.observe(
+                        time.perf_counter() - received_at, **request_labels
+                    )
+                captured = _capture(captured, encoded, audio_cache.max_entry_bytes)
+                yield encoded
+            encoded = pipeline.read_encoded()
+
+    def finish_audio() -> None:
+        # Releases producers blocked on a full buffer if the client left.
+        pipeline.cancel()
+        completed = pipeline.completed
+        if completed:
+            # Only fully flushed encoders are clean enough to reuse.
+            get_encoder_pool().release(encoder_key, encoder)
+        if completed and cache_key and captured:
+            audio_cache.put(cache_key, bytes(captured))
+        timings = pipeline.timings
+        if completed:
+            _record_stage_metrics(request_labels, timings, pcm_spec)
+        logger.info(
+            "Speech stages (%s): request_total=%.3fs model_load=%.3fs queue=%.3fs "
+            "first_chunk=%s total=%.3fs synthesis_wait=%.3fs "
+            "encode=%.3fs output_wait=%.3fs write=%.3fs completed=%s",
+            audio_format,
+            time.perf_counter() - received_at,
+            server_timing["model-load"],
+            server_timing["queue"],
+            "-"
+            if timings.first_chunk_s is None
+            else f"{timings.first_chunk_s:.3f}s",
+            timings.total_s,
+            timings.synthesis_wait_s,
+            timings.encode_s,
+            timings.output_wait_s,
+            timings.write_s,
+            completed,
+        )
+
+    # Runs first on close, before the slot and other resources are released.
+    cleanup.callback(finish_audio)
+    content: Iterator[bytes] = _ResponseContent(stream_audio(), cleanup.close)
+    if flight is not None:
+        # Synthesis now runs for every subscriber, not just this client.
+        content = flight.start(content)
+    return RenderedSpeech(
+        content,
+        media_type,
+        audio_format,
+        model_name,
+        "miss" if cache_key else "bypass",
+        server_timing,
     )
-    response.headers["x-openai-model"] = model_name
-    response.headers["x-openai-audio-format"] = audio_format
-    return response
+
+
+def _capture(
+    captured: bytearray | None,
+    chunk: bytes,
+    max_bytes: int,
+) -> bytearray | None:
+    if captured is None:
+        return None
+    if max_bytes and len(captured) + len(chunk) > max_bytes:
+        # Too large to cache; stop holding a copy of the response.
+        return None
+    captured.extend(chunk)
+    return captured
@@ -0,0 +1,207 @@
+"""Batch speech synthesis for bulk prompt rendering.
+
+`POST /v1/audio/speech/batch` renders many `{input, voice, format}` items in
+one call, for example a nightly run over every IVR prompt. Items run through
+the same cache, coalescing, admission control and workers as
+`POST /v1/audio/speech`, up to `tts.batch.concurrency` at a time. They are
+dispatched grouped by voice, so a voice is loaded once for all of its items
+even when the voice cache cannot hold every voice of the batch.
+
+The response is JSON lines (`application/x-ndjson`), written as items
+complete rather than in request order:
+
+- `{"type": "result", "index", "id", "format", "bytes", "cache", "elapsed_s",
+  "audio", "completed", "failed", "total"}` with base64 `audio`.
+- `{"type": "error", "index", "id", "status", "detail", "completed",
+  "failed", "total"}` for an item that could not be rendered.
+- `{"type": "done", "total", "succeeded", "failed", "elapsed_s"}` last.
+
+The counters on every line report the batch's progress. Items rejected by
+admission control or a busy worker pool are retried after the advertised
+`Retry-After`, so a batch yields to interactive traffic instead of failing.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from assistant_api.app.api.v1.speech import (
+    SpeechRequest,
+    get_settings,
+    render_speech,
+)
+from assistant_api.app.core.admission import PRIORITIES, PRIORITY_LOW
+from assistant_api.app.settings import Settings
+
+router = APIRouter(prefix="/v1/audio", tags=["speech"])
+logger = logging.getLogger(__name__)
+
+# Admission and busy-pool rejections worth waiting out.
+_RETRY_STATUS_CODES = frozenset({429, 503})
+_MAX_ATTEMPTS = 5
+
+
+class BatchSpeechItem(SpeechRequest):
+    """One item of a batch; `id` is echoed back to match results."""
+
+    id: str | None = None
+
+
+class BatchSpeechRequest(BaseModel):
+    """Items to synthesize, with an optional lower concurrency."""
+
+    items: list[BatchSpeechItem]
+    concurrency: int | None = None
+
+
+def get_batch_priority(x_priority: str | None = Header(default=None)) -> int:
+    # Bulk jobs default to low priority so interactive requests go first.
+    if x_priority is None:
+        return PRIORITY_LOW
+    priority = PRIORITIES.get(x_priority.strip().lower())
+    if priority is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid 'x-priority' header. Supported values: high, normal, low.",
+        )
+    return priority
+
+
+@router.post("/speech/batch")
+def synthesize_speech_batch(
+    request: BatchSpeechRequest,
+    settings: Settings = Depends(get_settings),
+    priority: int = Depends(get_batch_priority),
+) -> StreamingResponse:
+    """Stream results of many speech items as JSON lines."""
+    items = request.items
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must include at least one item.")
+    max_items = settings.tts.batch_max_items
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(items)} items; at most {max_items} are allowed.",
+        )
+    concurrency = settings.tts.batch_concurrency
+    if request.concurrency is not None:
+        if request.concurrency < 1:
+            raise HTTPException(status_code=400, detail="'concurrency' must be positive.")
+        concurrency = min(concurrency, request.concurrency)
+    logger.info("Speech batch: items=%d concurrency=%d", len(items), concurrency)
+    return StreamingResponse(
+        _run_batch(items, settings, priority, concurrency),
+        media_type="application/x-ndjson",
+        headers={"cache-control": "no-store"},
+    )
+
+
+def _run_batch(
+    items: list[BatchSpeechItem],
+    settings: Settings,
+    priority: int,
+    concurrency: int,
+) -> Generator[bytes, None, None]:
+    started = time.perf_counter()
+    total = len(items)
+    # Grouping by voice keeps each voice loaded while its items run.
+    order = sorted(range(total), key=lambda index: items[index].voice or "")
+    cancelled = threading.Event()
+    completed = failed = 0
+    pending: dict[Future[dict[str, Any]], int] = {}
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="speech-batch")
+    try:
+        position = 0
+        while position < total or pending:
+            # Only `concurrency` items are in flight, so at most that many
+            # rendered results are held in memory at once.
+            while position < total and len(pending) < concurrency:
+                index = order[position]
+                position += 1
+                future = executor.submit(_render_item, items[index], settings, priority, cancelled)
+                pending[future] = index
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                line: dict[str, Any] = {"type": "result", "index": index, "id": items[index].id}
+                try:
+                    line.update(future.result())
+                except HTTPException as exc:
+                    failed += 1
+                    line.update(type="error", status=exc.status_code, detail=exc.detail)
+                except Exception:
+                    logger.exception("Speech batch item %d failed.", index)
+                    failed += 1
+                    line.update(
+                        type="error", status=500, detail="TTS failed to synthesize speech."
+                    )
+                completed += 1
+                line.update(completed=completed, failed=failed, total=total)
+                yield (json.dumps(line) + "\n").encode("utf-8")
+        elapsed_s = time.perf_counter() - started
+        logger.info(
+            "Speech batch done: items=%d failed=%d total=%.3fs", total, failed, elapsed_s
+        )
+        yield (
+            json.dumps(
+                {
+                    "type": "done",
+                    "total": total,
+                    "succeeded": total - failed,
+                    "failed": failed,
+                    "elapsed_s": round(elapsed_s, 3),
+                }
+            )
+            + "\n"
+        ).encode("utf-8")
+    finally:
+        # Stops retries and queued items if the client went away; items
+        # already synthesizing finish and release their resources.
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_item(
+    item: BatchSpeechItem,
+    settings: Settings,
+    priority: int,
+    cancelled: threading.Event,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    attempt = 1
+    while True:
+        try:
+            rendered = render_speech(item, settings, priority)
+            break
+        except HTTPException as exc:
+            if exc.status_code not in _RETRY_STATUS_CODES or attempt >= _MAX_ATTEMPTS:
+                raise
+            delay_s = float((exc.headers or {}).get("Retry-After", 1))
+            if cancelled.wait(delay_s):
+                raise
+            attempt += 1
+    content = rendered.content
+    try:
+        audio = b"".join(content)
+    finally:
+        close = getattr(content, "close", None)
+        if close is not None:
+            close()
+    return {
+        "format": rendered.audio_format,
+        "bytes": len(audio),
+        "cache": rendered.cache_status,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "audio": base64.b64encode(audio).decode("ascii"),
+    }
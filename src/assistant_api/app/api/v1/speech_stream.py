@@ -0,0 +1,470 @@
+"""WebSocket endpoint for incremental text-in / audio-out synthesis.
+
+Clients that produce text progressively (for example an assistant streaming
+LLM tokens) send it over one socket as it arrives. Every sentence is
+synthesized as soon as it is complete and its audio streams back on the same
+socket, so speech starts long before the whole reply exists.
+
+Client messages are JSON text frames:
+
+- `{"type": "start", "voice": ..., "format": ..., "sample_rate": ...}`:
+  optional session options, only as the first message.
+- `{"type": "text", "text": "..."}`: append text.
+- `{"type": "flush"}`: synthesize buffered text that has no sentence end yet.
+- `{"type": "end"}`: synthesize the rest, finish the audio and close.
+
+Binary client frames are rejected with close code 1003.
+
+The server answers `{"type": "started", "format": ...}` once the session is
+configured and `{"type": "segment", "index": ..., "text": ..., "sample_rate":
+..., "channels": ...}` before the audio of each segment. Audio is sent as
+binary frames that together form one continuous stream in the negotiated
+format. `{"type": "done"}` follows the last frame; failures send
+`{"type": "error", "message": ...}` and close the socket.
+
+Synthesis runs on one thread per session, segment after segment, through the
+same workers, process pool, admission control, resampler and encoders as
+`POST /v1/audio/speech`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from assistant_api.app.api.v1.speech import (
+    acquire_encoder,
+    create_piper_worker,
+    output_sample_rate,
+    resolve_format,
+    resolve_sample_rate,
+)
+from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.resample import PolyphaseResampler
+from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+from assistant_api.app.core.admission import (
+    PRIORITIES,
+    PRIORITY_NORMAL,
+    AdmissionRejectedError,
+    get_admission_controller,
+)
+from assistant_api.app.core.encoder_pool import get_encoder_pool
+from assistant_api.app.core.metrics import get_speech_metrics
+from assistant_api.app.core.prewarm import get_prewarm_manager
+from assistant_api.app.core.segment_pipeline import split_complete_sentences
+from assistant_api.app.settings import Settings
+from assistant_api.app.workers.manager import get_worker_manager
+from assistant_api.app.workers.pool import WorkerPoolBusyError
+from assistant_api.app.workers.tts_dummy import DummyTtsWorker
+from assistant_api.app.workers.tts_piper import PiperTtsWorker
+
+router = APIRouter(prefix="/v1/audio", tags=["speech"])
+logger = logging.getLogger(__name__)
+
+# Segments waiting for synthesis; a client sending faster is rejected.
+_MAX_QUEUED_SEGMENTS = 256
+# Unterminated text held per max segment length before the client is rejected.
+_MAX_PENDING_SEGMENTS = 8
+_CLOSE_NORMAL = 1000
+_CLOSE_UNSUPPORTED_DATA = 1003
+_CLOSE_POLICY_VIOLATION = 1008
+_CLOSE_INTERNAL_ERROR = 1011
+_CLOSE_TRY_AGAIN_LATER = 1013
+_DEFAULT_PCM_SPEC = PcmSpec(
+    sample_rate=SampleRate(16_000),
+    channels=Channels(1),
+    sample_width_bytes=2,
+)
+
+
+class _ProtocolError(ValueError):
+    """Raised when a client message cannot be accepted."""
+
+    def __init__(self, message: str, close_code: int = _CLOSE_POLICY_VIOLATION) -> None:
+        super().__init__(message)
+        self.close_code = close_code
+
+
+class _SessionClosed(RuntimeError):
+    """Raised on the session thread once the socket can no longer be used."""
+
+
+class _SpeechSession:
+    """Synthesis state and thread of one WebSocket session."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        websocket: WebSocket,
+        loop: asyncio.AbstractEventLoop,
+        audio_format: str,
+        voice: str | None,
+        sample_rate: int | None,
+        priority: int,
+    ) -> None:
+        self._settings = settings
+        self._websocket = websocket
+        self._loop = loop
+        self._audio_format = audio_format
+        self._voice = voice
+        self._sample_rate = sample_rate
+        self._priority = priority
+        self._segments: queue.Queue[str | None] = queue.Queue(_MAX_QUEUED_SEGMENTS + 1)
+        self._cancelled = threading.Event()
+        self._stream: AudioStream | None = None
+        self._encoder: AudioEncoder | None = None
+        self._encoder_key: Any = None
+        self._resampler: PolyphaseResampler | None = None
+        self._output_spec: PcmSpec | None = None
+        self._index = 0
+        self._started_at = time.perf_counter()
+        self._first_audio_s: float | None = None
+
+    @property
+    def audio_format(self) -> str:
+        return self._audio_format
+
+    def start(self, done: asyncio.Future[None]) -> None:
+        """Start the session thread; `done` resolves when it exits."""
+
+        def run() -> None:
+            try:
+                self._run()
+            except _SessionClosed:
+                self._resolve(done, None)
+            except BaseException as exc:
+                self._resolve(done, exc)
+            else:
+                self._resolve(done, None)
+
+        threading.Thread(target=run, name="speech-stream", daemon=True).start()
+
+    def submit(self, segment: str) -> None:
+        try:
+            self._segments.put_nowait(segment)
+        except queue.Full as exc:
+            raise _ProtocolError("Too much text is waiting for synthesis.") from exc
+
+    def finish(self) -> None:
+        """Synthesize what was submitted, then finish the audio stream."""
+        self._segments.put(None)
+
+    def cancel(self) -> None:
+        """Stop synthesis; the session thread exits without finishing."""
+        self._cancelled.set()
+        stream = self._stream
+        if stream is not None:
+            stream.cancel()
+        try:
+            self._segments.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            segment = self._segments.get()
+            if segment is None or self._cancelled.is_set():
+                break
+            self._synthesize(segment)
+        if self._cancelled.is_set():
+            return
+        if self._encoder is not None:
+            pcm = self._resampler.flush() if self._resampler is not None else b""
+            encoded = self._encoder.encode_chunk(pcm) if pcm else b""
+            tail = encoded + (self._encoder.flush() or b"")
+            if tail:
+                self._send_bytes(tail)
+            get_encoder_pool().release(self._encoder_key, self._encoder)
+        logger.info(
+            "Speech stream (%s): segments=%d first_audio=%s total=%.3fs",
+            self._audio_format,
+            self._index,
+            "-" if self._first_audio_s is None else f"{self._first_audio_s:.3f}s",
+            time.perf_counter() - self._started_at,
+        )
+
+    def _synthesize(self, segment: str) -> None:
+        admission = get_admission_controller()
+        admission.acquire(self._priority)
+        try:
+            stream, pcm_spec = self._open_stream(segment)
+            self._stream = stream
+            try:
+                if self._encoder is None:
+                    self._start_encoder(pcm_spec)
+                assert self._encoder is not None and self._output_spec is not None
+                self._send_json(
+                    {
+                        "type": "segment",
+                        "index": self._index,
+                        "text": segment,
+                        "sample_rate": int(self._output_spec.sample_rate),
+                        "channels": int(self._output_spec.channels),
+                    }
+                )
+                self._index += 1
+                while not self._cancelled.is_set():
+                    chunk = stream.read_encoded()
+                    if chunk is None:
+                        break
+                    if self._resampler is not None:
+                        chunk = self._resampler.process(chunk)
+                    encoded = self._encoder.encode_chunk(chunk) if chunk else b""
+                    if encoded:
+                        if self._first_audio_s is None:
+                            self._first_audio_s = time.perf_counter() - self._started_at
+                        self._send_bytes(encoded)
+            finally:
+                # Releases a producer blocked on a full buffer if we stopped early.
+                stream.cancel()
+                self._stream = None
+        finally:
+            admission.release()
+
+    def _open_stream(self, segment: str) -> tuple[AudioStream, PcmSpec]:
+        settings = self._settings
+        payload = {"text": segment, "voice": self._voice, "format": self._audio_format}
+        if settings.tts.engine == "piper":
+            voice_id = self._voice or settings.tts.default_model
+            pool = get_worker_manager().get_pool(PiperTtsWorker.worker_type())
+            if pool is not None:
+                pooled_stream = pool.submit(payload)
+                stream: AudioStream = pooled_stream
+                pcm_spec = pooled_stream.pcm_spec
+            else:
+                worker = create_piper_worker(settings)
+                if settings.tts.streaming_enabled:
+                    stream = worker.process_streaming(
+                        payload, max_buffered_bytes=settings.tts.stream_buffer_bytes
+                    )
+                else:
+                    stream = worker.process(payload)
+                pcm_spec = worker.pcm_spec
+            if voice_id:
+                get_prewarm_manager().record_usage(voice_id)
+            return stream, pcm_spec or _DEFAULT_PCM_SPEC
+        pool = get_worker_manager().get_pool(DummyTtsWorker.worker_type())
+        if pool is not None:
+            return pool.submit(payload), _DEFAULT_PCM_SPEC
+        return DummyTtsWorker.from_settings(settings.tts).process(payload), _DEFAULT_PCM_SPEC
+
+    def _start_encoder(self, pcm_spec: PcmSpec) -> None:
+        output_rate = output_sample_rate(
+            self._sample_rate, int(pcm_spec.sample_rate), self._audio_format
+        )
+        output_spec = pcm_spec
+        if output_rate != pcm_spec.sample_rate:
+            self._resampler = PolyphaseResampler(
+                int(pcm_spec.sample_rate), output_rate, int(pcm_spec.channels)
+            )
+            output_spec = PcmSpec(
+                sample_rate=SampleRate(output_rate),
+                channels=pcm_spec.channels,
+                sample_width_bytes=pcm_spec.sample_width_bytes,
+            )
+        self._encoder, self._encoder_key = acquire_encoder(
+            self._settings, self._audio_format, output_spec
+        )
+        self._output_spec = output_spec
+
+    def _send_json(self, message: dict[str, Any]) -> None:
+        self._send(self._websocket.send_text(json.dumps(message)))
+
+    def _send_bytes(self, data: bytes) -> None:
+        self._send(self._websocket.send_bytes(data))
+
+    def _send(self, coroutine: Any) -> None:
+        if self._cancelled.is_set():
+            coroutine.close()
+            raise _SessionClosed("Session was cancelled.")
+        try:
+            # Waiting for each send applies the client's backpressure.
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+        except Exception as exc:
+            self._cancelled.set()
+            raise _SessionClosed("Client connection is gone.") from exc
+
+    def _resolve(self, done: asyncio.Future[None], error: BaseException | None) -> None:
+        def resolve() -> None:
+            if done.done():
+                return
+            if error is None:
+                done.set_result(None)
+            else:
+                done.set_exception(error)
+
+        try:
+            self._loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            # The event loop is already closed; nobody is waiting any more.
+            pass
+
+
+@router.websocket("/speech/stream")
+async def stream_speech(websocket: WebSocket) -> None:
+    """Synthesize text sent incrementally and stream audio back."""
+    settings: Settings = websocket.app.state.settings
+    await websocket.accept()
+    engine = settings.tts.engine
+    in_flight = get_speech_metrics().requests_in_flight
+    in_flight.inc(engine=engine)
+    loop = asyncio.get_running_loop()
+    done: asyncio.Future[None] = loop.create_future()
+    # Failures after the client left are logged by the session, not raised.
+    done.add_done_callback(lambda future: future.cancelled() or future.exception())
+    session: _SpeechSession | None = None
+    pending = ""
+    max_pending_chars = settings.tts.segment_max_chars * _MAX_PENDING_SEGMENTS
+    try:
+        while True:
+            receive = asyncio.ensure_future(_receive_text(websocket))
+            await asyncio.wait({receive, done}, return_when=asyncio.FIRST_COMPLETED)
+            if not receive.done():
+                # The session thread failed; its error is handled below.
+                receive.cancel()
+                await done
+                return
+            message = _parse_message(receive.result())
+            kind = message.get("type")
+            if session is None:
+                session = _open_session(settings, websocket, loop, message)
+                session.start(done)
+                await websocket.send_json(
+                    {"type": "started", "format": session.audio_format}
+                )
+                if kind == "start":
+                    continue
+            if kind == "start":
+                raise _ProtocolError("'start' must be the first message.")
+            if kind == "text":
+                text = message.get("text")
+                if not isinstance(text, str):
+                    raise _ProtocolError("'text' messages need a string 'text' field.")
+                segments, pending = split_complete_sentences(
+                    pending + text, settings.tts.segment_max_chars
+                )
+                if len(pending) > max_pending_chars:
+                    raise _ProtocolError("Too much text without a sentence or word break.")
+                for segment in segments:
+                    session.submit(segment)
+            elif kind in {"flush", "end"}:
+                if pending.strip():
+                    session.submit(pending.strip())
+                pending = ""
+                if kind == "end":
+                    session.finish()
+                    await done
+                    await websocket.send_json({"type": "done"})
+                    await websocket.close(code=_CLOSE_NORMAL)
+                    return
+            else:
+                raise _ProtocolError(f"Unsupported message type: {kind!r}.")
+    except WebSocketDisconnect:
+        logger.info("Speech stream client disconnected.")
+    except _ProtocolError as exc:
+        await _close_with_error(websocket, str(exc), exc.close_code)
+    except _SessionClosed:
+        pass
+    except AdmissionRejectedError as exc:
+        logger.warning("Speech stream segment rejected by admission control: %s", exc)
+        await _close_with_error(
+            websocket,
+            "Server is busy; retry later.",
+            _CLOSE_TRY_AGAIN_LATER,
+            retry_after_s=exc.retry_after_s,
+        )
+    except WorkerPoolBusyError:
+        await _close_with_error(
+            websocket,
+            "All TTS workers are busy; retry later.",
+            _CLOSE_TRY_AGAIN_LATER,
+            retry_after_s=settings.tts.admission_retry_after_s,
+        )
+    except FileNotFoundError as exc:
+        await _close_with_error(websocket, str(exc), _CLOSE_POLICY_VIOLATION)
+    except Exception:
+        logger.exception("Speech stream failed.")
+        await _close_with_error(
+            websocket, "TTS failed to synthesize speech.", _CLOSE_INTERNAL_ERROR
+        )
+    finally:
+        if session is not None:
+            session.cancel()
+        in_flight.dec(engine=engine)
+
+
+async def _receive_text(websocket: WebSocket) -> str:
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", _CLOSE_NORMAL), message.get("reason"))
+    text = message.get("text")
+    if text is None:
+        raise _ProtocolError(
+            "Binary frames are not accepted; send JSON text messages.",
+            _CLOSE_UNSUPPORTED_DATA,
+        )
+    return text
+
+
+def _parse_message(raw: str) -> dict[str, Any]:
+    try:
+        message = json.loads(raw)
+    except ValueError as exc:
+        raise _ProtocolError("Messages must be JSON objects.") from exc
+    if not isinstance(message, dict):
+        raise _ProtocolError("Messages must be JSON objects.")
+    return message
+
+
+def _open_session(
+    settings: Settings,
+    websocket: WebSocket,
+    loop: asyncio.AbstractEventLoop,
+    message: dict[str, Any],
+) -> _SpeechSession:
+    options = message if message.get("type") == "start" else {}
+    voice = options.get("voice")
+    if voice is not None and not isinstance(voice, str):
+        raise _ProtocolError("'voice' must be a string.")
+    requested_rate = options.get("sample_rate")
+    if requested_rate is not None and (
+        isinstance(requested_rate, bool) or not isinstance(requested_rate, int)
+    ):
+        raise _ProtocolError("'sample_rate' must be an integer.")
+    header = websocket.headers.get("x-priority")
+    priority = PRIORITY_NORMAL if header is None else PRIORITIES.get(header.strip().lower())
+    if priority is None:
+        raise _ProtocolError("Invalid 'x-priority' header. Supported values: high, normal, low.")
+    try:
+        audio_format, _ = resolve_format(options.get("format"))
+        sample_rate = resolve_sample_rate(requested_rate, audio_format)
+    except HTTPException as exc:
+        raise _ProtocolError(str(exc.detail)) from exc
+    return _SpeechSession(
+        settings, websocket, loop, audio_format, voice, sample_rate, priority
+    )
+
+
+async def _close_with_error(
+    websocket: WebSocket,
+    message: str,
+    code: int,
+    retry_after_s: int | None = None,
+) -> None:
+    payload: dict[str, Any] = {"type": "error", "message": message}
+    if retry_after_s is not None:
+        payload["retry_after_s"] = retry_after_s
+    try:
+        await websocket.send_json(payload)
+        await websocket.close(code=code)
+    except (RuntimeError, WebSocketDisconnect):
+        # The client is already gone.
+        pass
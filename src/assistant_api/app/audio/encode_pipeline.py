@@ -0,0 +1,191 @@
+"""Encode stage between PCM synthesis and the HTTP response.
+
+Synthesis, encoding and the network write run as separate stages connected
+by bounded buffers: the worker's producer pushes PCM into its stream, an
+encode thread turns it into the output format, and the response consumes
+encoded chunks. Each stage can then overlap the others, so LAME or libopus
+cost hides behind inference and a slow client only stalls the stages once
+the buffers fill up.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.pcm_stream import PcmBufferStream
+from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.audio.types import AudioFormat
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTimings:
+    """Seconds spent per pipeline stage for one response.
+
+    `synthesis_wait_s` is time the encode stage waited for PCM,
+    `encode_s` time spent inside the encoder, `output_wait_s` time the
+    encode stage was blocked on a full output buffer, and `write_s` time the
+    consumer spent between reads, i.e. writing to the network.
+    `first_chunk_s` is measured from pipeline start to the first encoded
+    chunk handed to the consumer, and `synthesis_s` from pipeline start to
+    the end of the PCM source.
+    """
+
+    synthesis_wait_s: float = 0.0
+    encode_s: float = 0.0
+    output_wait_s: float = 0.0
+    write_s: float = 0.0
+    first_chunk_s: float | None = None
+    synthesis_s: float | None = None
+    total_s: float = 0.0
+    pcm_bytes: int = 0
+    encoded_bytes: int = 0
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        return asdict(self)
+
+
+class EncodePipeline(AudioStream):
+    """Encoded-audio stream fed by a PCM stream through an encoder.
+
+    With `threaded` set, encoding runs on its own thread and feeds a bounded
+    buffer of `max_buffered_bytes`; otherwise chunks are encoded inline on
+    the consumer's thread. Either way the consumer reads encoded chunks with
+    `read_encoded`, and `completed` turns True once the encoder was flushed
+    and every chunk was read, which is when the encoder may be reused.
+    """
+
+    def __init__(
+        self,
+        source: AudioStream,
+        encoder: AudioEncoder,
+        threaded: bool = True,
+        max_buffered_bytes: int | None = None,
+    ) -> None:
+        self._source = source
+        self._encoder = encoder
+        self._threaded = threaded
+        self._output = PcmBufferStream(max_buffered_bytes=max_buffered_bytes)
+        self._timings = StageTimings()
+        self._started_at = time.perf_counter()
+        self._last_read_at: float | None = None
+        self._flushed = False
+        self._completed = False
+        self._thread: threading.Thread | None = None
+        if threaded:
+            self._thread = threading.Thread(
+                target=self._run_encoder,
+                name="audio-encode",
+                daemon=True,
+            )
+            self._thread.start()
+
+    @property
+    def output_format(self) -> AudioFormat:
+        return self._encoder.output_format
+
+    @property
+    def timings(self) -> StageTimings:
+        return self._timings
+
+    @property
+    def completed(self) -> bool:
+        """Return True once the whole encoded stream has been read."""
+        return self._completed
+
+    def push_pcm(self, chunk: bytes) -> None:
+        raise TypeError("EncodePipeline is fed by its source stream.")
+
+    def read_encoded(self, timeout: float | None = None) -> Optional[bytes]:
+        now = time.perf_counter()
+        if self._last_read_at is not None:
+            self._timings.write_s += now - self._last_read_at
+        if self._threaded:
+            chunk = self._output.read_encoded(timeout)
+        else:
+            chunk = self._encode_next()
+        now = time.perf_counter()
+        self._last_read_at = now
+        if chunk is None:
+            self._completed = self._flushed and not self._output.cancelled
+            self._timings.total_s = now - self._started_at
+        elif chunk and self._timings.first_chunk_s is None:
+            self._timings.first_chunk_s = now - self._started_at
+        return chunk
+
+    def cancel(self) -> None:
+        self._output.cancel()
+        self._source.cancel()
+
+    def _encode_next(self) -> Optional[bytes]:
+        # Inline mode: pull PCM until the encoder yields output or EOS.
+        while not self._flushed:
+            pcm = self._read_source()
+            if pcm is None:
+                return self._flush_encoder() or None
+            encoded = self._encode(pcm)
+            if encoded:
+                return encoded
+        return None
+
+    def _run_encoder(self) -> None:
+        try:
+            while True:
+                pcm = self._read_source()
+                if pcm is None:
+                    break
+                encoded = self._encode(pcm)
+                if encoded and not self._push(encoded):
+                    return
+            tail = self._flush_encoder()
+            if tail and not self._push(tail):
+                return
+        except Exception as exc:
+            logger.exception("EncodePipeline: encoding failed.")
+            self._source.cancel()
+            self._output.fail(exc)
+            return
+        self._output.close()
+
+    def _read_source(self) -> Optional[bytes]:
+        start = time.perf_counter()
+        chunk = self._source.read_encoded()
+        now = time.perf_counter()
+        self._timings.synthesis_wait_s += now - start
+        if chunk is None:
+            self._timings.synthesis_s = now - self._started_at
+        return chunk
+
+    def _encode(self, pcm: bytes) -> bytes:
+        if not pcm:
+            return b""
+        start = time.perf_counter()
+        encoded = self._encoder.encode_chunk(pcm)
+        self._timings.encode_s += time.perf_counter() - start
+        self._timings.pcm_bytes += len(pcm)
+        self._timings.encoded_bytes += len(encoded)
+        return encoded
+
+    def _flush_encoder(self) -> bytes:
+        start = time.perf_counter()
+        tail = self._encoder.flush() or b""
+        self._timings.encode_s += time.perf_counter() - start
+        self._timings.encoded_bytes += len(tail)
+        self._flushed = True
+        return tail
+
+    def _push(self, encoded: bytes) -> bool:
+        start = time.perf_counter()
+        self._output.push_pcm(encoded)
+        self._timings.output_wait_s += time.perf_counter() - start
+        if self._output.cancelled:
+            # The consumer went away; stop pulling PCM from synthesis.
+            self._source.cancel()
+            return False
+        return True
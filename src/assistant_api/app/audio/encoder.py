@@ -34,3 +34,12 @@ class AudioEncoder(ABC):
     @abstractmethod
     def flush(self) -> Optional[bytes]:
         """Flush any buffered data and return final encoded bytes, if any."""
+
+    def reset(self) -> bool:
+        """Return the encoder to its initial state to encode a new stream.
+
+        Returns False when the encoder cannot be reused; the encoder pool
+        discards such encoders instead of keeping them idle.
+        """
+
+        return False
@@ -9,11 +9,17 @@ import lameenc
 from assistant_api.app.audio.encoder import AudioEncoder
 from assistant_api.app.audio.types import AudioFormat, PcmSpec
 
+DEFAULT_BITRATE_KBPS = 128
+
 
 class Mp3Encoder(AudioEncoder):
-    """Streaming MP3 encoder backed by lameenc."""
+    """Streaming MP3 encoder backed by lameenc.
+
+    A flushed lameenc encoder cannot be reset, so MP3 encoders are not
+    reused by the encoder pool; each stream builds its own.
+    """
 
-    def __init__(self, pcm_spec: PcmSpec, bitrate_kbps: int = 128) -> None:
+    def __init__(self, pcm_spec: PcmSpec, bitrate_kbps: int = DEFAULT_BITRATE_KBPS) -> None:
         # MP3 encoding currently expects 16-bit PCM input; other widths must be
         # handled upstream until additional sample formats are supported.
         super().__init__(pcm_spec=pcm_spec, output_format=AudioFormat.MP3)
@@ -22,12 +28,17 @@ class Mp3Encoder(AudioEncoder):
         self._encoder.set_in_sample_rate(int(pcm_spec.sample_rate))
         self._encoder.set_channels(int(pcm_spec.channels))
         self._encoder.set_quality(2)
+        # LAME initializes lazily on the first encode call, which costs more
+        # than construction; do it now so the first real chunk does not pay.
+        self._encoder.encode(b"")
 
     def encode_chunk(self, chunk: bytes) -> bytes:
         if not chunk:
             return b""
-        return self._encoder.encode(chunk)
+        # lameenc returns bytearray; responses need immutable bytes.
+        return bytes(self._encoder.encode(chunk))
 
     def flush(self) -> Optional[bytes]:
         flushed = self._encoder.flush()
-        return flushed or None
+        return bytes(flushed) if flushed else None
+
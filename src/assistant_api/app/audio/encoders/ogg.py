@@ -0,0 +1,176 @@
+"""Streaming Ogg muxer for Opus packets (RFC 3533, RFC 7845)."""
+
+from __future__ import annotations
+
+import random
+import struct
+
+OPUS_GRANULE_RATE = 48_000
+DEFAULT_FIRST_PAGE_FRAMES = 1
+DEFAULT_FRAMES_PER_PAGE = 10
+
+_VENDOR = b"assistant-api"
+_MAX_SEGMENTS = 255
+_FLAG_BOS = 0x02
+_FLAG_EOS = 0x04
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+
+
+def _crc_table() -> list[int]:
+    table = []
+    for index in range(256):
+        crc = index << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def ogg_crc32(data: bytes) -> int:
+    """Return the Ogg page checksum (CRC-32, polynomial 0x04C11DB7, unreflected)."""
+    crc = 0
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ byte]
+    return crc
+
+
+class OggOpusMuxer:
+    """Wrap Opus packets into Ogg pages as they are produced.
+
+    Page flushing trades latency for overhead: the first audio page is
+    emitted as soon as `first_page_frames` packets are available so clients
+    can start decoding right away, and later pages batch up to
+    `frames_per_page` packets to amortize the 27-byte page header.
+    """
+
+    def __init__(
+        self,
+        channels: int,
+        input_sample_rate: int,
+        pre_skip: int = 0,
+        first_page_frames: int = DEFAULT_FIRST_PAGE_FRAMES,
+        frames_per_page: int = DEFAULT_FRAMES_PER_PAGE,
+        serial: int | None = None,
+    ) -> None:
+        if first_page_frames < 1 or frames_per_page < 1:
+            raise ValueError("Ogg page frame counts must be at least 1.")
+        self._channels = channels
+        self._input_sample_rate = input_sample_rate
+        self._pre_skip = pre_skip
+        self._first_page_frames = first_page_frames
+        self._frames_per_page = frames_per_page
+        self._serial = random.getrandbits(32) if serial is None else serial
+        self._sequence = 0
+        self._granule = pre_skip
+        self._packets: list[bytes] = []
+        self._segments = 0
+        self._audio_pages = 0
+        self._headers_written = False
+        self._finished = False
+
+    def reset(self, serial: int | None = None) -> None:
+        """Start a new logical stream with a fresh serial number."""
+        self._serial = random.getrandbits(32) if serial is None else serial
+        self._sequence = 0
+        self._granule = self._pre_skip
+        self._packets.clear()
+        self._segments = 0
+        self._audio_pages = 0
+        self._headers_written = False
+        self._finished = False
+
+    def header_pages(self) -> bytes:
+        """Return the OpusHead and OpusTags pages, once per stream."""
+        if self._headers_written:
+            return b""
+        self._headers_written = True
+        opus_head = struct.pack(
+            "<8sBBHIhB",
+            b"OpusHead",
+            1,
+            self._channels,
+            self._pre_skip,
+            self._input_sample_rate,
+            0,
+            0,
+        )
+        opus_tags = (
+            b"OpusTags"
+            + struct.pack("<I", len(_VENDOR))
+            + _VENDOR
+            + struct.pack("<I", 0)
+        )
+        return self._page([opus_head], 0, _FLAG_BOS) + self._page([opus_tags], 0, 0)
+
+    def add_packet(self, packet: bytes, samples: int, hold: bool = False) -> bytes:
+        """Queue one Opus packet covering `samples` 48 kHz samples.
+
+        Returns any pages that became ready, headers included on first use.
+        With `hold`, the packet stays queued even if it fills the page, so
+        the end-of-stream page from `finish` carries it: end trimming only
+        applies to the page holding the padded last packet, and an empty
+        end-of-stream page would move the granule position backwards.
+        """
+        output = self.header_pages()
+        lacing = len(packet) // 255 + 1
+        if self._packets and self._segments + lacing > _MAX_SEGMENTS:
+            output += self._flush_page(0)
+        self._packets.append(packet)
+        self._segments += lacing
+        self._granule += samples
+        if hold:
+            return output
+        limit = self._first_page_frames if not self._audio_pages else self._frames_per_page
+        if len(self._packets) >= limit:
+            output += self._flush_page(0)
+        return output
+
+    def finish(self, total_samples: int | None = None) -> bytes:
+        """Flush queued packets into a final end-of-stream page.
+
+        `total_samples` is the real stream length in 48 kHz samples; when
+        given, the final granule position trims encoder padding.
+        """
+        if self._finished:
+            return b""
+        output = self.header_pages()
+        if total_samples is not None:
+            self._granule = min(self._granule, self._pre_skip + total_samples)
+        output += self._flush_page(_FLAG_EOS, force=True)
+        self._finished = True
+        return output
+
+    def _flush_page(self, flags: int, force: bool = False) -> bytes:
+        if not self._packets and not force:
+            return b""
+        packets, self._packets = self._packets, []
+        self._segments = 0
+        self._audio_pages += 1
+        return self._page(packets, self._granule, flags)
+
+    def _page(self, packets: list[bytes], granule: int, flags: int) -> bytes:
+        lacing = bytearray()
+        for packet in packets:
+            lacing.extend(b"\xff" * (len(packet) // 255))
+            lacing.append(len(packet) % 255)
+        header = _PAGE_HEADER.pack(
+            b"OggS",
+            0,
+            flags,
+            granule,
+            self._serial,
+            self._sequence,
+            0,
+            len(lacing),
+        )
+        page = bytearray(header)
+        page.extend(lacing)
+        for packet in packets:
+            page.extend(packet)
+        struct.pack_into("<I", page, 22, ogg_crc32(page))
+        self._sequence += 1
+        return bytes(page)
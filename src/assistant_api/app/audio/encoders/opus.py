@@ -2,16 +2,35 @@
 
 from __future__ import annotations
 
+import ctypes
 from typing import Optional
 
 import opuslib
 
 from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.encoders.ogg import (
+    DEFAULT_FIRST_PAGE_FRAMES,
+    DEFAULT_FRAMES_PER_PAGE,
+    OPUS_GRANULE_RATE,
+    OggOpusMuxer,
+)
 from assistant_api.app.audio.types import AudioFormat, PcmSpec
 
+DEFAULT_BITRATE_KBPS = 64
+_RING_FRAMES = 50
+
 
 class OpusEncoder(AudioEncoder):
-    """Streaming Opus encoder backed by opuslib.
+    """Streaming Ogg/Opus encoder backed by opuslib.
+
+    Output is a valid Ogg Opus stream: header pages come first, and audio
+    pages carry granule positions so clients can start decoding and seek.
+    See `OggOpusMuxer` for the page flush policy.
+
+    Incoming PCM is copied once into a ring buffer whose capacity is a whole
+    number of frames. The read position always sits on a frame boundary, so
+    every frame is contiguous and is handed to libopus through a ctypes view
+    of the ring instead of a sliced copy.
 
     Notes:
         Opus encoding currently expects 16-bit PCM input and mono or stereo
@@ -21,7 +40,13 @@ class OpusEncoder(AudioEncoder):
 
     _FRAME_DURATION_MS = 20
 
-    def __init__(self, pcm_spec: PcmSpec, bitrate_kbps: int = 64) -> None:
+    def __init__(
+        self,
+        pcm_spec: PcmSpec,
+        bitrate_kbps: int = DEFAULT_BITRATE_KBPS,
+        first_page_frames: int = DEFAULT_FIRST_PAGE_FRAMES,
+        frames_per_page: int = DEFAULT_FRAMES_PER_PAGE,
+    ) -> None:
         super().__init__(pcm_spec=pcm_spec, output_format=AudioFormat.OPUS)
         self._encoder = opuslib.Encoder(
             int(pcm_spec.sample_rate),
@@ -32,31 +57,98 @@ class OpusEncoder(AudioEncoder):
         self._channels = int(pcm_spec.channels)
         self._bytes_per_sample = int(pcm_spec.sample_width_bytes)
         self._frame_size = int(pcm_spec.sample_rate) * self._FRAME_DURATION_MS // 1000
-        self._buffer = bytearray()
+        self._frame_bytes = self._frame_size * self._channels * self._bytes_per_sample
+        self._ring = bytearray(self._frame_bytes * _RING_FRAMES)
+        self._ring_view = memoryview(self._ring)
+        # One view per frame slot, created once; libopus reads straight from
+        # the ring through these.
+        frame_type = ctypes.c_char * self._frame_bytes
+        self._frames = [
+            frame_type.from_buffer(self._ring, slot * self._frame_bytes)
+            for slot in range(_RING_FRAMES)
+        ]
+        self._read_pos = 0
+        self._write_pos = 0
+        self._buffered = 0
+        self._input_bytes = 0
+        sample_rate = int(pcm_spec.sample_rate)
+        self._granule_per_frame = self._frame_size * OPUS_GRANULE_RATE // sample_rate
+        self._muxer = OggOpusMuxer(
+            channels=self._channels,
+            input_sample_rate=sample_rate,
+            pre_skip=self._encoder.lookahead * OPUS_GRANULE_RATE // sample_rate,
+            first_page_frames=first_page_frames,
+            frames_per_page=frames_per_page,
+        )
 
     def encode_chunk(self, chunk: bytes) -> bytes:
         if not chunk:
             return b""
-        self._buffer.extend(chunk)
-        return self._drain_frames()
+        pages: list[bytes] = []
+        source = memoryview(chunk).cast("B")
+        self._input_bytes += len(source)
+        offset = 0
+        while offset < len(source):
+            offset += self._write(source[offset:])
+            self._drain_frames(pages)
+        return b"".join(pages)
 
     def flush(self) -> Optional[bytes]:
-        if not self._buffer:
-            return None
-        output = bytearray()
-        frame_bytes = self._frame_size * self._channels * self._bytes_per_sample
-        output.extend(self._drain_frames())
-        if self._buffer:
-            padded = bytes(self._buffer) + b"\x00" * (frame_bytes - len(self._buffer))
-            output.extend(self._encoder.encode(padded, self._frame_size))
-            self._buffer.clear()
-        return bytes(output) if output else None
-
-    def _drain_frames(self) -> bytes:
-        output = bytearray()
-        frame_bytes = self._frame_size * self._channels * self._bytes_per_sample
-        while len(self._buffer) >= frame_bytes:
-            frame = bytes(self._buffer[:frame_bytes])
-            del self._buffer[:frame_bytes]
-            output.extend(self._encoder.encode(frame, self._frame_size))
-        return bytes(output)
+        pages: list[bytes] = []
+        self._drain_frames(pages)
+        if self._buffered:
+            # Pad the partial frame in place with silence.
+            end = self._read_pos + self._frame_bytes
+            self._ring_view[self._write_pos : end] = bytes(end - self._write_pos)
+            self._buffered = self._frame_bytes
+            self._drain_frames(pages, last=True)
+        frame_width = self._channels * self._bytes_per_sample
+        total_samples = (
+            self._input_bytes // frame_width * OPUS_GRANULE_RATE
+            // int(self._pcm_spec.sample_rate)
+        )
+        pages.append(self._muxer.finish(total_samples))
+        return b"".join(pages) or None
+
+    def reset(self) -> bool:
+        self._encoder.reset_state()
+        self._read_pos = 0
+        self._write_pos = 0
+        self._buffered = 0
+        self._input_bytes = 0
+        self._muxer.reset()
+        return True
+
+    def _write(self, source: memoryview) -> int:
+        capacity = len(self._ring)
+        size = min(len(source), capacity - self._buffered)
+        first = min(size, capacity - self._write_pos)
+        self._ring_view[self._write_pos : self._write_pos + first] = source[:first]
+        if size > first:
+            self._ring_view[: size - first] = source[first:size]
+        self._write_pos = (self._write_pos + size) % capacity
+        self._buffered += size
+        return size
+
+    def _drain_frames(self, pages: list[bytes], last: bool = False) -> None:
+        count = self._buffered // self._frame_bytes
+        if not count:
+            return
+        encode = self._encoder.encode
+        add_packet = self._muxer.add_packet
+        frame_size = self._frame_size
+        granule_per_frame = self._granule_per_frame
+        frames = self._frames
+        slot = self._read_pos // self._frame_bytes
+        for index in range(count):
+            # The padded last frame waits for the trimmed end-of-stream page.
+            hold = last and index == count - 1
+            page = add_packet(encode(frames[slot], frame_size), granule_per_frame, hold)
+            if page:
+                pages.append(page)
+            slot = (slot + 1) % _RING_FRAMES
+        self._buffered -= count * self._frame_bytes
+        self._read_pos = slot * self._frame_bytes
+        if not self._buffered:
+            # Realign so the next write starts on a frame boundary.
+            self._read_pos = self._write_pos = 0
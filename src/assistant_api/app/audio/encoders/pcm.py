@@ -19,3 +19,6 @@ class PcmPassthroughEncoder(AudioEncoder):
 
     def flush(self) -> Optional[bytes]:
         return None
+
+    def reset(self) -> bool:
+        return True
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
 from collections import deque
 from typing import Deque, Optional
 
@@ -10,27 +12,124 @@ from assistant_api.app.audio.types import AudioFormat
 
 
 class PcmBufferStream(AudioStream):
-    """PCM buffer stream with explicit empty vs finished signaling."""
+    """Bounded PCM stream shared by one producer and one consumer.
 
-    def __init__(self) -> None:
+    Reads block until a chunk or end-of-stream arrives, either on a thread
+    (`read_encoded`) or on the event loop (`read_encoded_async`), so consumers
+    never poll. When `max_buffered_bytes` is set, `push_pcm` blocks while the
+    buffer is full, which caps memory per request regardless of text length
+    and stalls a fast producer behind a slow client. A single chunk larger
+    than the capacity is still accepted once the buffer is empty.
+    """
+
+    def __init__(self, max_buffered_bytes: int | None = None) -> None:
+        if max_buffered_bytes is not None and max_buffered_bytes < 1:
+            raise ValueError("max_buffered_bytes must be at least 1.")
         self._buffer: Deque[bytes] = deque()
+        self._buffered_bytes = 0
+        self._max_buffered_bytes = max_buffered_bytes
         self._closed = False
+        self._cancelled = False
+        self._error: BaseException | None = None
+        self._condition = threading.Condition()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
 
     @property
     def output_format(self) -> AudioFormat:
         return AudioFormat.PCM
 
+    @property
+    def cancelled(self) -> bool:
+        """Return True once the consumer has abandoned the stream."""
+        return self._cancelled
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Return the number of PCM bytes waiting to be read."""
+        return self._buffered_bytes
+
     def push_pcm(self, chunk: bytes) -> None:
         if not isinstance(chunk, (bytes, bytearray, memoryview)):
             raise TypeError("PCM chunks must be bytes-like")
-        self._buffer.append(bytes(chunk))
+        data = bytes(chunk)
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_room(len(data)))
+            if self._cancelled:
+                return
+            if self._closed:
+                raise RuntimeError("Cannot push PCM into a closed stream.")
+            self._buffer.append(data)
+            self._buffered_bytes += len(data)
+            self._notify_locked()
 
     def close(self) -> None:
-        self._closed = True
+        with self._condition:
+            self._closed = True
+            self._notify_locked()
+
+    def fail(self, error: BaseException) -> None:
+        """Close the stream and re-raise `error` to the consumer after buffered data."""
+        with self._condition:
+            self._error = error
+            self._closed = True
+            self._notify_locked()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._cancelled = True
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            self._notify_locked()
 
-    def read_encoded(self) -> Optional[bytes]:
+    def read_encoded(self, timeout: float | None = None) -> Optional[bytes]:
+        with self._condition:
+            self._condition.wait_for(self._readable, timeout=timeout)
+            return self._pop_locked()
+
+    async def read_encoded_async(self) -> Optional[bytes]:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._readable():
+                    return self._pop_locked()
+                waiter: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _has_room(self, size: int) -> bool:
+        if self._cancelled or self._closed or self._max_buffered_bytes is None:
+            return True
+        if not self._buffer:
+            return True
+        return self._buffered_bytes + size <= self._max_buffered_bytes
+
+    def _readable(self) -> bool:
+        return bool(self._buffer) or self._closed or self._cancelled
+
+    def _pop_locked(self) -> Optional[bytes]:
         if self._buffer:
-            return self._buffer.popleft()
-        if self._closed:
+            chunk = self._buffer.popleft()
+            self._buffered_bytes -= len(chunk)
+            # Wake a producer blocked on a full buffer.
+            self._condition.notify_all()
+            return chunk
+        if self._closed or self._cancelled:
+            if self._error is not None:
+                raise self._error
             return None
         return b""
+
+    def _notify_locked(self) -> None:
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                # The waiting event loop has already been closed.
+                pass
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,179 @@
+"""Streaming sample-rate conversion for signed 16-bit PCM.
+
+Voices synthesize at their native rate (often 22.05 kHz), while telephony
+and embedded clients only need 8 or 16 kHz. Resampling before the encoder
+means those clients do not pay for encoding and transferring samples they
+throw away.
+
+`PolyphaseResampler` converts by the rational factor `up / down` with a
+Kaiser-windowed sinc low-pass split into `up` polyphase branches, so only the
+output samples that are kept are ever computed. Each output sample is a dot
+product of one branch with the most recent input samples; a whole chunk is
+computed at once with NumPy by gathering those input windows into a matrix.
+Input history is carried between chunks, so chunk boundaries do not produce
+clicks, and the output is aligned with the input (the filter delay is
+compensated by centering the filter on the output instant).
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.audio.types import AudioFormat, PcmSpec, SampleRate
+
+# Zero crossings of the sinc on each side of its center, at the lower of the
+# two rates. More gives a sharper cutoff at a linear cost per output sample.
+_ZERO_CROSSINGS = 10
+_KAISER_BETA = 8.0
+# Passband edge as a fraction of the lower Nyquist frequency; the rest is
+# the transition band, which keeps aliasing out of the audible range.
+_CUTOFF = 0.92
+_SAMPLE_WIDTH_BYTES = 2
+
+
+@lru_cache(maxsize=32)
+def _filter_bank(up: int, down: int) -> np.ndarray:
+    """Return the polyphase filter bank, shape (up, taps_per_phase).
+
+    The prototype is centered on tap `up * taps_per_phase // 2`.
+    """
+    taps_per_phase = 2 * math.ceil(_ZERO_CROSSINGS * max(1.0, down / up))
+    length = up * taps_per_phase
+    # Cutoff in cycles per sample of the virtual signal upsampled by `up`.
+    cutoff = _CUTOFF * 0.5 / max(up, down)
+    positions = np.arange(length) - length // 2
+    # An odd-length window keeps the center on a whole tap; its last tap
+    # (zero) is dropped so the prototype splits evenly into branches.
+    window = np.kaiser(length + 1, _KAISER_BETA)[:length]
+    prototype = np.sinc(2 * cutoff * positions) * window
+    # Branch p holds taps p, p + up, p + 2 * up, ... of the prototype.
+    bank = prototype.reshape(taps_per_phase, up).T
+    # Unity DC gain per branch, which also undoes the zero-stuffing loss.
+    bank = bank / bank.sum(axis=1, keepdims=True)
+    return np.ascontiguousarray(bank, dtype=np.float32)
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler for interleaved signed 16-bit PCM.
+
+    Feed PCM with `process` and call `flush` once at end of stream to get
+    the filter's tail. Chunks may split samples or frames at any byte.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, channels: int = 1) -> None:
+        if input_rate < 1 or output_rate < 1 or channels < 1:
+            raise ValueError("Sample rates and channels must be positive.")
+        divisor = math.gcd(input_rate, output_rate)
+        self._up = output_rate // divisor
+        self._down = input_rate // divisor
+        self._channels = channels
+        self._bank = _filter_bank(self._up, self._down)
+        self._taps = self._bank.shape[1]
+        self._offsets = np.arange(self._taps)
+        self._frame_bytes = channels * _SAMPLE_WIDTH_BYTES
+        # The last taps - 1 input frames, preceded by silence at the start.
+        self._history = np.zeros((self._taps - 1, channels), dtype=np.float32)
+        self._input_frames = 0
+        self._carry = b""
+        # Output n sits at input time n * down / up; the filter center is
+        # added so each output uses the input around that instant.
+        self._center = self._up * self._taps // 2
+        self._next_output = 0
+        self._flushed = False
+
+    def process(self, pcm: bytes) -> bytes:
+        """Resample a chunk, returning every output sample it completes."""
+        if self._flushed:
+            raise RuntimeError("Resampler was already flushed.")
+        data = self._carry + pcm
+        usable = len(data) - len(data) % self._frame_bytes
+        self._carry = data[usable:]
+        if not usable:
+            return b""
+        frames = np.frombuffer(data, dtype="<i2", count=usable // _SAMPLE_WIDTH_BYTES)
+        return self._convert(frames.reshape(-1, self._channels).astype(np.float32))
+
+    def flush(self) -> bytes:
+        """Return the remaining output; a dangling partial frame is dropped."""
+        if self._flushed:
+            return b""
+        self._flushed = True
+        # Keep exactly as many outputs as the input duration calls for.
+        expected = -(-self._input_frames * self._up // self._down)
+        produced = self._next_output
+        tail = self._convert(np.zeros((self._taps, self._channels), dtype=np.float32))
+        return tail[: max(0, expected - produced) * self._frame_bytes]
+
+    def _convert(self, frames: np.ndarray) -> bytes:
+        buffer = np.concatenate((self._history, frames))
+        # Global index of buffer[0]; negative indices are the initial silence.
+        start = self._input_frames - (self._taps - 1)
+        self._input_frames += len(frames)
+        self._history = buffer[len(buffer) - (self._taps - 1) :]
+        last_index = self._input_frames - 1
+        # Outputs whose newest input sample, floor((n * down + center) / up),
+        # has arrived.
+        end_output = ((last_index + 1) * self._up - 1 - self._center) // self._down + 1
+        if end_output <= self._next_output:
+            return b""
+        outputs = np.arange(self._next_output, end_output, dtype=np.int64)
+        self._next_output = end_output
+        positions = outputs * self._down + self._center
+        bases = positions // self._up
+        phases = positions - bases * self._up
+        # Row i holds the input window of output i, newest sample first.
+        windows = buffer[(bases - start)[:, None] - self._offsets[None, :]]
+        result = np.einsum("nk,nkc->nc", self._bank[phases], windows)
+        np.rint(result, out=result)
+        np.clip(result, -32768, 32767, out=result)
+        return result.astype("<i2").tobytes()
+
+
+class ResamplingStream(AudioStream):
+    """PCM stream that resamples another PCM stream as it is read."""
+
+    def __init__(self, source: AudioStream, pcm_spec: PcmSpec, output_rate: int) -> None:
+        self._source = source
+        self._resampler = PolyphaseResampler(
+            int(pcm_spec.sample_rate), output_rate, int(pcm_spec.channels)
+        )
+        self._pcm_spec = PcmSpec(
+            sample_rate=SampleRate(output_rate),
+            channels=pcm_spec.channels,
+            sample_width_bytes=pcm_spec.sample_width_bytes,
+        )
+        self._done = False
+
+    @property
+    def output_format(self) -> AudioFormat:
+        return AudioFormat.PCM
+
+    @property
+    def pcm_spec(self) -> PcmSpec:
+        return self._pcm_spec
+
+    def push_pcm(self, chunk: bytes) -> None:
+        raise TypeError("ResamplingStream is fed by its source stream.")
+
+    def read_encoded(self, timeout: float | None = None) -> Optional[bytes]:
+        while not self._done:
+            chunk = self._source.read_encoded(timeout)
+            if chunk is None:
+                self._done = True
+                tail = self._resampler.flush()
+                return tail or None
+            if not chunk:
+                # The source timed out; report it the same way.
+                return b""
+            resampled = self._resampler.process(chunk)
+            if resampled or timeout is not None:
+                return resampled
+        return None
+
+    def cancel(self) -> None:
+        self._source.cancel()
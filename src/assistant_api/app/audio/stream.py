@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional
 
@@ -12,7 +13,9 @@ class AudioStream(ABC):
     """Bidirectional audio stream contract.
 
     Producers push PCM chunks into the stream, and consumers read encoded chunks
-    out of it. Implementations can decide buffering and concurrency strategy.
+    out of it. Implementations can decide buffering and concurrency strategy,
+    but reads must block (without spinning) until data or end-of-stream is
+    available.
     """
 
     @property
@@ -25,8 +28,24 @@ class AudioStream(ABC):
         """Accept a PCM audio chunk from a producer."""
 
     @abstractmethod
-    def read_encoded(self) -> Optional[bytes]:
-        """Read the next encoded audio chunk if available.
+    def read_encoded(self, timeout: float | None = None) -> Optional[bytes]:
+        """Block until the next encoded audio chunk is available and return it.
 
-        Returns None when no more data is available or the stream is closed.
+        Returns None at end-of-stream, and b"" only if `timeout` expires
+        before a chunk arrives. Errors raised by the producer are re-raised
+        here once buffered chunks have been read.
         """
+
+    async def read_encoded_async(self) -> Optional[bytes]:
+        """Await the next encoded chunk without blocking the event loop.
+
+        The default implementation waits on a worker thread; implementations
+        that can signal the event loop directly should override it.
+        """
+        return await asyncio.to_thread(self.read_encoded)
+
+    def close(self) -> None:
+        """Signal end-of-stream from the producer side."""
+
+    def cancel(self) -> None:
+        """Signal that the consumer stopped reading and buffered data can go."""
@@ -0,0 +1,151 @@
+"""Admission control for speech synthesis.
+
+Synthesis is CPU-bound: running more ONNX sessions at once than there are
+cores makes every request slower instead of serving more of them. The
+controller caps concurrent syntheses and parks the excess in a bounded,
+priority-ordered wait queue. Requests that find the queue full, or that wait
+longer than the queue timeout, are rejected immediately so clients can back
+off and retry instead of piling onto an overloaded server.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITIES = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_QUEUE_TIMEOUT_S = 10.0
+DEFAULT_RETRY_AFTER_S = 1
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a request is not admitted; carries a retry hint."""
+
+    def __init__(self, message: str, retry_after_s: int) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionQueueFullError(AdmissionRejectedError):
+    """Raised when the wait queue is already at capacity."""
+
+
+class AdmissionTimeoutError(AdmissionRejectedError):
+    """Raised when a queued request was not admitted within the queue timeout."""
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded priority wait queue.
+
+    `acquire` returns once the caller holds one of `max_concurrent` slots and
+    every caller must pair it with `release`. Waiting callers are admitted by
+    priority (lower values first), then in arrival order. A controller with
+    `max_concurrent` of 0 admits everything.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 0,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout_s: float = DEFAULT_QUEUE_TIMEOUT_S,
+        retry_after_s: int = DEFAULT_RETRY_AFTER_S,
+    ) -> None:
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._queue_timeout_s = queue_timeout_s
+        self._retry_after_s = retry_after_s
+        self._active = 0
+        self._waiting: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_concurrent > 0
+
+    def configure(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout_s: float,
+        retry_after_s: int,
+    ) -> None:
+        """Update limits; requests already admitted keep their slots."""
+        if max_concurrent < 0 or max_queue < 0:
+            raise ValueError("Admission limits must not be negative.")
+        with self._condition:
+            self._max_concurrent = max_concurrent
+            self._max_queue = max_queue
+            self._queue_timeout_s = queue_timeout_s
+            self._retry_after_s = retry_after_s
+            self._condition.notify_all()
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        """Block until admitted, or raise `AdmissionRejectedError`."""
+        with self._condition:
+            if not self.enabled:
+                self._active += 1
+                return
+            if self._active < self._max_concurrent and not self._waiting:
+                self._active += 1
+                return
+            if len(self._waiting) >= self._max_queue:
+                raise AdmissionQueueFullError(
+                    "Admission queue is full.", self._retry_after_s
+                )
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            deadline = time.monotonic() + self._queue_timeout_s
+            try:
+                while True:
+                    if self._waiting[0] == entry and self._has_free_slot_locked():
+                        heapq.heappop(self._waiting)
+                        self._active += 1
+                        # More than one slot may have freed up at once.
+                        self._condition.notify_all()
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionTimeoutError(
+                            "Request was not admitted within the queue timeout.",
+                            self._retry_after_s,
+                        )
+                    self._condition.wait(remaining)
+            except BaseException:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._condition.notify_all()
+                raise
+
+    def release(self) -> None:
+        """Return a slot taken by `acquire`."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def active_count(self) -> int:
+        with self._condition:
+            return self._active
+
+    def queued_count(self) -> int:
+        with self._condition:
+            return len(self._waiting)
+
+    def _has_free_slot_locked(self) -> bool:
+        return not self.enabled or self._active < self._max_concurrent
+
+
+_ADMISSION_CONTROLLER = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the shared admission controller instance."""
+    return _ADMISSION_CONTROLLER
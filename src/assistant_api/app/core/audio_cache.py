@@ -0,0 +1,278 @@
+"""Content-addressed cache of synthesized audio.
+
+Entries are keyed by a hash of everything that determines the output bytes:
+normalized text, voice, the voice files' content hash, output format,
+encoder settings and the synthesis settings that shape the PCM. Lookups check
+an in-memory LRU tier first and then an optional on-disk tier; disk hits are
+promoted to memory. Both tiers evict by size, least recently used first.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+_DISK_SUFFIX = ".audio"
+# Memoized hashes of voice files: a model and a config per voice, plus stale
+# entries left by files that were replaced.
+_MODEL_HASH_MEMO_SIZE = 256
+
+
+def normalize_text(text: str) -> str:
+    """Return text normalized for cache keys (NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def audio_cache_key(
+    text: str,
+    voice: str,
+    model_hash: str,
+    audio_format: str,
+    encoder_settings: str,
+    synthesis_settings: str = "",
+) -> str:
+    """Return the content address for a synthesized response."""
+    material = json.dumps(
+        [
+            normalize_text(text),
+            voice,
+            model_hash,
+            audio_format,
+            encoder_settings,
+            synthesis_settings,
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def model_file_hash(path: Path) -> str:
+    """Return the SHA-256 of a model file, memoized by path, size and mtime."""
+    stat = path.stat()
+    return _file_hash(str(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=_MODEL_HASH_MEMO_SIZE)
+def _file_hash(path: str, size: int, mtime_ns: int) -> str:
+    # Size and mtime are part of the memo key, so a replaced file is rehashed.
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ByteLruCache:
+    """Thread-safe in-memory LRU of byte strings bounded by total size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskAudioCache:
+    """On-disk cache tier bounded by total size.
+
+    Files are written atomically and their modification time doubles as the
+    recency marker; reads touch the file so eviction is least recently used.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._files())
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("Audio disk cache read failed for %s: %s", path, exc)
+            return None
+        return data
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self._max_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+                handle.write(value)
+                temp_path = Path(handle.name)
+        except OSError as exc:
+            logger.warning("Audio disk cache write failed for %s: %s", path, exc)
+            return
+        with self._lock:
+            # The replaced entry's size is read under the lock, so concurrent
+            # puts of one key do not both subtract the same previous file.
+            try:
+                previous = path.stat().st_size if path.exists() else 0
+                os.replace(temp_path, path)
+            except OSError as exc:
+                logger.warning("Audio disk cache write failed for %s: %s", path, exc)
+                temp_path.unlink(missing_ok=True)
+                return
+            self._size += len(value) - previous
+            if self._size > self._max_bytes:
+                self._evict_locked()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size
+
+    def _evict_locked(self) -> None:
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the budget so each write does not rescan.
+        target = self._max_bytes * 9 // 10
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def _files(self) -> list[Path]:
+        return list(self._directory.glob(f"*/*{_DISK_SUFFIX}"))
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / f"{key}{_DISK_SUFFIX}"
+
+
+class AudioCache:
+    """Two-tier cache of encoded audio responses.
+
+    A cache with no memory budget and no disk directory is disabled and
+    ignores every call, so callers do not need to branch on configuration.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int = 0,
+        disk_directory: Path | None = None,
+        disk_max_bytes: int = 0,
+        max_entry_bytes: int = 0,
+    ) -> None:
+        self._memory: ByteLruCache | None = None
+        self._disk: DiskAudioCache | None = None
+        self._max_entry_bytes = 0
+        self.configure(memory_max_bytes, disk_directory, disk_max_bytes, max_entry_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self._memory is not None or self._disk is not None
+
+    @property
+    def max_entry_bytes(self) -> int:
+        return self._max_entry_bytes
+
+    def configure(
+        self,
+        memory_max_bytes: int,
+        disk_directory: Path | None,
+        disk_max_bytes: int,
+        max_entry_bytes: int,
+    ) -> None:
+        """Replace both tiers; existing in-memory entries are dropped."""
+        self._memory = ByteLruCache(memory_max_bytes) if memory_max_bytes > 0 else None
+        self._disk = (
+            DiskAudioCache(disk_directory, disk_max_bytes)
+            if disk_directory is not None and disk_max_bytes > 0
+            else None
+        )
+        self._max_entry_bytes = max_entry_bytes
+
+    def get(self, key: str) -> bytes | None:
+        if self._memory is not None:
+            value = self._memory.get(key)
+            if value is not None:
+                return value
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                if self._memory is not None:
+                    self._memory.put(key, value)
+                return value
+        return None
+
+    def put(self, key: str, value: bytes) -> None:
+        if not value or (self._max_entry_bytes and len(value) > self._max_entry_bytes):
+            return
+        if self._memory is not None:
+            self._memory.put(key, value)
+        if self._disk is not None:
+            self._disk.put(key, value)
+
+
+_AUDIO_CACHE = AudioCache()
+
+
+def get_audio_cache() -> AudioCache:
+    """Return the shared audio cache instance."""
+    return _AUDIO_CACHE
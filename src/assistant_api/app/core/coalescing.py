@@ -0,0 +1,235 @@
+"""Single-flight coalescing of identical in-flight speech requests.
+
+When many clients ask for the same text, voice and format at the same time,
+only the first request (the leader) synthesizes. Its encoded output is
+appended to a shared in-memory buffer by a pump thread, and every request,
+the leader included, streams its own copy from that buffer. Requests that
+join while the synthesis is running get the already-produced prefix replayed
+before the live tail.
+
+A flight is joinable from the moment its leader registers it until its output
+is complete. If the leader fails before producing audio, waiting followers
+are released to try again and one of them becomes the new leader. A follower
+that waits longer than the configured timeout for the leader's first chunk
+synthesizes on its own instead. Once no subscription is left open, the pump
+stops synthesizing.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable, Generator, Iterator
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "pending"
+_STREAMING = "streaming"
+_DONE = "done"
+_FAILED = "failed"
+_ABANDONED = "abandoned"
+
+DEFAULT_WAIT_TIMEOUT_S = 30.0
+
+
+class Flight:
+    """Encoded output of one synthesis, shared by all of its subscribers."""
+
+    def __init__(self, key: str, on_close: Callable[[Flight], None]) -> None:
+        self.key = key
+        self._on_close = on_close
+        self._condition = threading.Condition()
+        self._chunks: list[bytes] = []
+        self._state = _PENDING
+        self._error: BaseException | None = None
+        self._subscribers = 0
+
+    def wait_started(self, timeout: float | None = None) -> bool:
+        """Block until the leader started streaming (True) or gave up (False).
+
+        Also returns False if the flight is still pending after `timeout`
+        seconds.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._state != _PENDING, timeout)
+            return self._state in {_STREAMING, _DONE}
+
+    def abandon(self) -> None:
+        """Give up leading a flight that never started streaming."""
+        with self._condition:
+            if self._state != _PENDING:
+                return
+        # Unregister before waking followers, so they cannot join this flight
+        # again while it is being torn down.
+        self._on_close(self)
+        with self._condition:
+            self._state = _ABANDONED
+            self._condition.notify_all()
+
+    def start(self, content: Iterator[bytes]) -> Subscription:
+        """Pump `content` into the shared buffer; return the leader's copy."""
+        with self._condition:
+            self._state = _STREAMING
+            self._subscribers += 1
+            self._condition.notify_all()
+        threading.Thread(
+            target=self._pump,
+            args=(content,),
+            name="speech-coalesce",
+            daemon=True,
+        ).start()
+        return Subscription(self)
+
+    def subscribe(self) -> Subscription | None:
+        """Return a stream of the whole output, replaying what was produced.
+
+        Returns None when the flight can no longer be joined.
+        """
+        with self._condition:
+            if self._state not in {_STREAMING, _DONE}:
+                return None
+            self._subscribers += 1
+        return Subscription(self)
+
+    def _unsubscribe(self) -> None:
+        with self._condition:
+            self._subscribers -= 1
+            self._condition.notify_all()
+
+    def _iterate(self) -> Generator[bytes, None, None]:
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._chunks) and self._state == _STREAMING:
+                    self._condition.wait()
+                chunks = self._chunks[index:]
+                state = self._state
+                error = self._error
+            index += len(chunks)
+            yield from chunks
+            if not chunks and state != _STREAMING:
+                if state == _FAILED:
+                    raise RuntimeError("Coalesced synthesis failed.") from error
+                return
+
+    def _pump(self, content: Iterator[bytes]) -> None:
+        state = _DONE
+        error: BaseException | None = None
+        try:
+            for chunk in content:
+                with self._condition:
+                    if self._subscribers <= 0:
+                        # Every client left; stop synthesizing for nobody.
+                        state = self._state = _ABANDONED
+                        break
+                    self._chunks.append(chunk)
+                    self._condition.notify_all()
+        except Exception as exc:
+            logger.exception("Coalesced synthesis failed mid-stream.")
+            state = _FAILED
+            error = exc
+        finally:
+            close = getattr(content, "close", None)
+            if close is not None:
+                close()
+            self._on_close(self)
+            with self._condition:
+                self._state = state
+                self._error = error
+                self._condition.notify_all()
+
+
+class Subscription:
+    """One client's stream of a flight's output.
+
+    The client counts as a subscriber until the stream is exhausted or
+    closed. Closing releases it even if iteration never started, as when a
+    client disconnects before its response begins streaming; an unread
+    subscription that is dropped is closed when it is collected.
+    """
+
+    def __init__(self, flight: Flight) -> None:
+        self._flight = flight
+        self._chunks = flight._iterate()
+        self._closed = False
+
+    def __iter__(self) -> Subscription:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._chunks.close()
+        self._flight._unsubscribe()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class RequestCoalescer:
+    """Registry of joinable flights keyed by request identity."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        wait_timeout_s: float = DEFAULT_WAIT_TIMEOUT_S,
+    ) -> None:
+        self._enabled = enabled
+        self._wait_timeout_s = wait_timeout_s
+        self._flights: dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def wait_timeout_s(self) -> float:
+        """Seconds a follower waits for the leader's first chunk."""
+        return self._wait_timeout_s
+
+    def configure(
+        self,
+        enabled: bool,
+        wait_timeout_s: float = DEFAULT_WAIT_TIMEOUT_S,
+    ) -> None:
+        self._enabled = enabled
+        self._wait_timeout_s = wait_timeout_s
+
+    def join(self, key: str) -> tuple[Flight, bool]:
+        """Return the flight for `key` and whether the caller must lead it.
+
+        A leader must either `start` the flight or `abandon` it.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = Flight(key, self._close)
+            self._flights[key] = flight
+            return flight, True
+
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def _close(self, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+
+_REQUEST_COALESCER = RequestCoalescer()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Return the shared request coalescer instance."""
+    return _REQUEST_COALESCER
@@ -0,0 +1,128 @@
+"""Pool of reusable audio encoders.
+
+Building an encoder per request (a libopus state plus our own buffers) shows
+up in request profiles. Encoders that finished a stream and can be reset are
+kept idle, keyed by everything that fixes their configuration, so
+the next request with the same PCM spec, format and settings can take one
+that is ready to use.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+
+from assistant_api.app.audio.encoder import AudioEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE = 16
+DEFAULT_IDLE_TIMEOUT_S = 300.0
+
+EncoderKey = Hashable
+
+
+class EncoderPool:
+    """Bounded pool of idle encoders with idle-time eviction.
+
+    `acquire` returns an idle encoder for the key or builds a new one;
+    `release` resets it and keeps it for reuse. Encoders that cannot be
+    reset (MP3) or were not released (for example after a client disconnect
+    mid-stream) are simply dropped. A pool with `max_idle` of 0 keeps nothing.
+    """
+
+    def __init__(
+        self,
+        max_idle: int = DEFAULT_MAX_IDLE,
+        idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S,
+    ) -> None:
+        self._max_idle = max_idle
+        self._idle_timeout_s = idle_timeout_s
+        self._idle: dict[EncoderKey, deque[tuple[float, AudioEncoder]]] = {}
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_idle: int, idle_timeout_s: float) -> None:
+        """Update pool bounds; idle encoders are dropped."""
+        if max_idle < 0:
+            raise ValueError("max_idle must not be negative.")
+        with self._lock:
+            self._max_idle = max_idle
+            self._idle_timeout_s = idle_timeout_s
+            self._idle.clear()
+            self._idle_count = 0
+
+    def acquire(
+        self,
+        key: EncoderKey,
+        factory: Callable[[], AudioEncoder],
+    ) -> AudioEncoder:
+        """Return a ready encoder for `key`, building one if none is idle."""
+        with self._lock:
+            self._evict_expired_locked(time.monotonic())
+            idle = self._idle.get(key)
+            if idle:
+                # Most recently released first; it is the least likely to expire.
+                _, encoder = idle.pop()
+                self._idle_count -= 1
+                if not idle:
+                    del self._idle[key]
+                return encoder
+        return factory()
+
+    def release(self, key: EncoderKey, encoder: AudioEncoder) -> None:
+        """Reset a finished encoder and keep it idle for reuse."""
+        if self._max_idle <= 0:
+            return
+        try:
+            if not encoder.reset():
+                return
+        except Exception:
+            logger.exception("EncoderPool: reset failed; discarding encoder")
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired_locked(now)
+            self._idle.setdefault(key, deque()).append((now, encoder))
+            self._idle_count += 1
+            while self._idle_count > self._max_idle:
+                self._evict_oldest_locked()
+
+    def idle_count(self) -> int:
+        """Return the number of idle encoders across all keys."""
+        with self._lock:
+            return self._idle_count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._idle_count = 0
+
+    def _evict_expired_locked(self, now: float) -> None:
+        cutoff = now - self._idle_timeout_s
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and idle[0][0] < cutoff:
+                idle.popleft()
+                self._idle_count -= 1
+            if not idle:
+                del self._idle[key]
+
+    def _evict_oldest_locked(self) -> None:
+        oldest_key = min(self._idle, key=lambda key: self._idle[key][0][0])
+        idle = self._idle[oldest_key]
+        idle.popleft()
+        self._idle_count -= 1
+        if not idle:
+            del self._idle[oldest_key]
+
+
+_ENCODER_POOL = EncoderPool()
+
+
+def get_encoder_pool() -> EncoderPool:
+    """Return the shared encoder pool instance."""
+    return _ENCODER_POOL
@@ -0,0 +1,288 @@
+"""Prometheus metrics for the speech pipeline.
+
+A small in-process registry of histograms and gauges rendered in the
+Prometheus text exposition format by `GET /metrics`. Request handlers record
+per-stage latencies (model load, queue wait, synthesis, encode, first byte)
+and response sizes; gauges report in-flight requests and loaded voices.
+
+Values are process-local. Voices loaded inside pool worker processes are not
+counted by the loaded-voice gauges, although their load times are reported
+back to the API process with each job and recorded here. Under the
+multi-process server (`assistant_api.app.server`), every forked API worker
+has its own registry, and `/metrics` shows only the worker that answered the
+scrape.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+
+from assistant_api.app.core.admission import get_admission_controller
+from assistant_api.app.core.voice_cache import get_voice_cache
+
+LATENCY_BUCKETS_S = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+# 1 KiB to 16 MiB in powers of four.
+BYTES_BUCKETS = tuple(float(1024 * 4**power) for power in range(8))
+
+LabelValues = tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    metric_type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}."
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        yield from self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> Iterable[str]:
+        """Yield the metric's sample lines."""
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS_S,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (non-cumulative), then sum and count.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self._buckets) + 1), [0.0, 0.0])
+                self._series[key] = series
+            counts, totals = series
+            index = len(self._buckets)
+            for position, bound in enumerate(self._buckets):
+                if value <= bound:
+                    index = position
+                    break
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def _render_samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = {
+                key: (list(counts), list(totals))
+                for key, (counts, totals) in self._series.items()
+            }
+        bucket_names = self.labelnames + ("le",)
+        for key, (counts, totals) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self._buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(bucket_names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(totals[0])}"
+            yield f"{self.name}_count{labels} {_format_value(totals[1])}"
+
+
+class Gauge(_Metric):
+    """Gauge set directly, moved up and down, or read from a callback."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from `function` at render time."""
+        if self.labelnames:
+            raise ValueError("Callback gauges cannot have labels.")
+        self._function = function
+
+    def _render_samples(self) -> Iterable[str]:
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        with self._lock:
+            snapshot = dict(self._values)
+        for key, value in sorted(snapshot.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SpeechMetrics:
+    """Metrics recorded by the speech endpoint."""
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        # Every stage histogram shares one label set, so stages can be joined.
+        request_labels = ("engine", "voice", "format")
+        self.model_load_seconds = self._histogram(
+            "tts_model_load_seconds",
+            "Time spent loading a voice model for a request.",
+            request_labels,
+        )
+        self.queue_wait_seconds = self._histogram(
+            "tts_queue_wait_seconds",
+            "Time a request waited for admission and for an idle pool worker process.",
+            request_labels,
+        )
+        self.synthesis_seconds = self._histogram(
+            "tts_synthesis_seconds",
+            "Time from the start of encoding until synthesis produced its last PCM.",
+            request_labels,
+        )
+        self.real_time_factor = self._histogram(
+            "tts_real_time_factor",
+            "Synthesis time divided by the duration of the produced audio.",
+            request_labels,
+            REAL_TIME_FACTOR_BUCKETS,
+        )
+        self.encode_seconds = self._histogram(
+            "tts_encode_seconds",
+            "Time spent inside the audio encoder per response.",
+            request_labels,
+        )
+        self.time_to_first_byte_seconds = self._histogram(
+            "tts_time_to_first_byte_seconds",
+            "Time from receiving a request to its first audio chunk.",
+            request_labels,
+        )
+        self.response_bytes = self._histogram(
+            "tts_response_bytes",
+            "Encoded audio bytes sent per response.",
+            request_labels,
+            BYTES_BUCKETS,
+        )
+        self.requests_in_flight = self._gauge(
+            "tts_requests_in_flight",
+            "Speech requests currently being handled or streamed.",
+            ("engine",),
+        )
+        self.admission_active = self._gauge(
+            "tts_admission_active",
+            "Speech requests holding a synthesis slot.",
+        )
+        self.admission_active.set_function(get_admission_controller().active_count)
+        self.admission_queued = self._gauge(
+            "tts_admission_queued",
+            "Speech requests waiting in the admission queue.",
+        )
+        self.admission_queued.set_function(get_admission_controller().queued_count)
+        self.loaded_voices = self._gauge(
+            "tts_loaded_voices",
+            "Voices resident in the API process voice cache.",
+        )
+        self.loaded_voices.set_function(lambda: len(get_voice_cache().list_loaded()))
+        self.loaded_voice_bytes = self._gauge(
+            "tts_loaded_voice_bytes",
+            "Estimated memory held by voices in the API process voice cache.",
+        )
+        self.loaded_voice_bytes.set_function(get_voice_cache().memory_bytes)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def _histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS_S,
+    ) -> Histogram:
+        histogram = Histogram(name, help_text, labelnames, buckets)
+        self.registry.register(histogram)
+        return histogram
+
+    def _gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        gauge = Gauge(name, help_text, labelnames)
+        self.registry.register(gauge)
+        return gauge
+
+
+_SPEECH_METRICS = SpeechMetrics()
+
+
+def get_speech_metrics() -> SpeechMetrics:
+    """Return the shared speech metrics instance."""
+    return _SPEECH_METRICS
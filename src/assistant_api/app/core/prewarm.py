@@ -1,15 +1,48 @@
 """Prewarm infrastructure for resource initialization.
 
-This module defines lightweight request and registry structures used to
-record prewarm intents without performing any real model loading. The
-intent is to provide a consistent API surface so future implementations
-can plug in actual resource initialization logic.
+This module tracks the startup prewarm of default resources, so readiness
+can be reported until every default resource is warm, and schedules voice
+loading from observed demand afterwards.
+
+The scheduler keeps an exponentially decayed usage score per voice: each
+speech request adds one, and a prewarm request adds a hint of the same
+weight. On every tick the highest scoring voices that fit the memory budget
+are predicted to be used next and loaded if they are not resident, while
+resident voices that are neither predicted, pinned, nor used within the idle
+period are unloaded. Loading and unloading go through a `PrewarmBackend`
+provided by the engine.
 """
 
 from __future__ import annotations
 
+import logging
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable, Protocol
+
+if TYPE_CHECKING:
+    from assistant_api.app.settings import TtsSettings
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_PENDING = "pending"
+RESOURCE_WARM = "warm"
+RESOURCE_FAILED = "failed"
+
+DEFAULT_REQUEST_TTL_S = 300.0
+DEFAULT_MAX_REQUESTS = 256
+DEFAULT_USAGE_HALF_LIFE_S = 900.0
+DEFAULT_IDLE_UNLOAD_S = 600.0
+DEFAULT_MAX_VOICES = 4
+DEFAULT_WARM_INTERVAL_S = 10.0
+# Voices whose decayed score fell below this are no longer predicted, i.e.
+# one use is forgotten after two half-lives.
+_MIN_PREDICTED_SCORE = 0.25
+_MAX_TRACKED_VOICES = 1024
+
+_RequestKey = tuple[str | None, str | None, str | None]
 
 
 @dataclass(frozen=True)
@@ -26,35 +59,394 @@ class PrewarmRequest:
     metadata: dict[str, str] = field(default_factory=dict)
 
 
+class PrewarmBackend(Protocol):
+    """Engine hooks used by the prewarm scheduler."""
+
+    def loaded_voices(self) -> dict[str, int] | None:
+        """Return resident voices with their sizes, or None when unknown."""
+
+    def voice_size(self, voice_id: str) -> int | None:
+        """Return the estimated memory of a voice, or None if it does not exist."""
+
+    def load(self, voice_id: str) -> bool:
+        """Load a voice, returning whether it succeeded."""
+
+    def unload(self, voice_id: str) -> bool:
+        """Unload a voice, returning whether it was resident."""
+
+
+@dataclass(frozen=True)
+class PrewarmPlan:
+    """Voices to load and to unload on one scheduler tick."""
+
+    warm: tuple[str, ...] = ()
+    unload: tuple[str, ...] = ()
+
+
+class _VoiceUsage:
+    """Decayed usage score and residency belief for one voice."""
+
+    __slots__ = ("score", "scored_at", "last_used", "resident")
+
+    def __init__(self, now: float) -> None:
+        self.score = 0.0
+        self.scored_at = now
+        self.last_used = now
+        self.resident = False
+
+    def decayed(self, now: float, half_life_s: float) -> float:
+        return self.score * 0.5 ** ((now - self.scored_at) / half_life_s)
+
+    def add(self, weight: float, now: float, half_life_s: float) -> None:
+        self.score = self.decayed(now, half_life_s) + weight
+        self.scored_at = now
+        self.last_used = now
+
+
 class PrewarmManager:
-    """Registry for default and optional prewarm requests.
+    """Registry for default prewarm resources and usage-driven scheduler.
 
-    This process-local manager records intent only and performs no
-    loading; it stays intentionally simple for now.
+    Default resources are loaded at application startup, and the manager
+    tracks each one as pending, warm or failed. The process is ready once
+    startup prewarm finished and every default resource is warm.
 
-    Default resources are intended to be loaded at application startup in
-    the future, while optional resources are registered on demand.
+    Optional prewarm requests are deduplicated by resource, language and
+    voice, expire after `request_ttl_s`, and at most `max_requests` are kept.
+    The scheduler predicts at most `max_voices` voices within
+    `memory_budget_bytes` (None for no memory limit); pinned voices always
+    count against that budget first and are never unloaded. An
+    `idle_unload_s` of 0 disables unloading.
+
+    Warm-ups requested by clients run one at a time, and each voice is warmed
+    at most once per `warm_interval_s`.
     """
 
-    def __init__(self, default_resources: Iterable[str] | None = None) -> None:
+    def __init__(
+        self,
+        default_resources: Iterable[str] | None = None,
+        request_ttl_s: float = DEFAULT_REQUEST_TTL_S,
+        max_requests: int = DEFAULT_MAX_REQUESTS,
+        usage_half_life_s: float = DEFAULT_USAGE_HALF_LIFE_S,
+        idle_unload_s: float = DEFAULT_IDLE_UNLOAD_S,
+        max_voices: int = DEFAULT_MAX_VOICES,
+        memory_budget_bytes: int | None = None,
+        pinned: Iterable[str] | None = None,
+        warm_interval_s: float = DEFAULT_WARM_INTERVAL_S,
+    ) -> None:
         self._default_resources = set(default_resources or [])
-        self._optional_requests: list[PrewarmRequest] = []
+        self._optional_requests: OrderedDict[
+            _RequestKey, tuple[PrewarmRequest, float]
+        ] = OrderedDict()
+        self._startup_status = {
+            resource_id: RESOURCE_PENDING for resource_id in self._default_resources
+        }
+        self._startup_finished = False
+        self._request_ttl_s = request_ttl_s
+        self._max_requests = max_requests
+        self._usage_half_life_s = usage_half_life_s
+        self._idle_unload_s = idle_unload_s
+        self._max_voices = max_voices
+        self._memory_budget_bytes = memory_budget_bytes
+        self._pinned = set(pinned or [])
+        self._warm_interval_s = warm_interval_s
+        self._warming = False
+        self._last_warm: dict[str, float] = {}
+        self._usage: dict[str, _VoiceUsage] = {}
+        self._lock = threading.Lock()
+        self._scheduler: threading.Thread | None = None
+        self._scheduler_stop = threading.Event()
+
+    def configure(
+        self,
+        request_ttl_s: float,
+        max_requests: int,
+        usage_half_life_s: float,
+        idle_unload_s: float,
+        max_voices: int,
+        memory_budget_bytes: int | None,
+        pinned: Iterable[str],
+        warm_interval_s: float = DEFAULT_WARM_INTERVAL_S,
+    ) -> None:
+        """Update request retention, scheduler budgets and warm-up throttling."""
+        if max_requests < 1 or max_voices < 1:
+            raise ValueError("max_requests and max_voices must be at least 1.")
+        with self._lock:
+            self._request_ttl_s = request_ttl_s
+            self._max_requests = max_requests
+            self._usage_half_life_s = usage_half_life_s
+            self._idle_unload_s = idle_unload_s
+            self._max_voices = max_voices
+            self._memory_budget_bytes = memory_budget_bytes
+            self._pinned = set(pinned)
+            self._warm_interval_s = warm_interval_s
+            self._trim_requests_locked(time.monotonic())
 
     def register_default_resource(self, resource_id: str) -> None:
-        """Register a resource intended for future startup prewarming."""
-        self._default_resources.add(resource_id)
+        """Register a resource to be prewarmed at startup."""
+        with self._lock:
+            self._default_resources.add(resource_id)
+            self._startup_status.setdefault(resource_id, RESOURCE_PENDING)
+
+    def mark_warm(self, resource_id: str) -> None:
+        """Record that a default resource finished prewarming."""
+        with self._lock:
+            self._startup_status[resource_id] = RESOURCE_WARM
+
+    def mark_failed(self, resource_id: str) -> None:
+        """Record that a default resource could not be prewarmed."""
+        with self._lock:
+            self._startup_status[resource_id] = RESOURCE_FAILED
+
+    def finish_startup(self) -> None:
+        """Record that startup prewarm is over, successful or not."""
+        with self._lock:
+            self._startup_finished = True
+
+    def readiness(self) -> tuple[bool, dict[str, str]]:
+        """Return whether the process is ready and the status per resource."""
+        with self._lock:
+            status = dict(self._startup_status)
+            ready = self._startup_finished and all(
+                state == RESOURCE_WARM for state in status.values()
+            )
+        return ready, status
 
     def list_default_resources(self) -> tuple[str, ...]:
         """Return registered default resource identifiers."""
         return tuple(sorted(self._default_resources))
 
     def request_optional(self, request: PrewarmRequest) -> None:
-        """Record an optional prewarm request without performing work."""
-        self._optional_requests.append(request)
+        """Record an optional prewarm request as a usage hint for its voice.
+
+        Repeating a request refreshes its expiry instead of adding a copy.
+        """
+        now = time.monotonic()
+        key = (request.resource_id, request.language, request.voice)
+        with self._lock:
+            self._optional_requests.pop(key, None)
+            self._optional_requests[key] = (request, now + self._request_ttl_s)
+            self._trim_requests_locked(now)
+            if request.voice:
+                self._record_locked(request.voice, now)
 
     def list_optional_requests(self) -> tuple[PrewarmRequest, ...]:
-        """Return the recorded optional prewarm requests."""
-        return tuple(self._optional_requests)
+        """Return the unexpired optional prewarm requests, oldest first."""
+        with self._lock:
+            self._trim_requests_locked(time.monotonic())
+            return tuple(request for request, _ in self._optional_requests.values())
+
+    def try_begin_warm(self, voice_id: str) -> bool:
+        """Claim the right to warm `voice_id` for a client request.
+
+        Returns False while another warm-up runs or when the voice was warmed
+        within `warm_interval_s`. A successful claim must be ended with
+        `end_warm`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._warming:
+                return False
+            last = self._last_warm.get(voice_id)
+            if last is not None and now - last < self._warm_interval_s:
+                return False
+            self._warming = True
+            self._last_warm[voice_id] = now
+            # Forget voices that are past their interval, so arbitrary voice
+            # ids cannot grow the map.
+            for stale in [
+                other
+                for other, started in self._last_warm.items()
+                if now - started >= self._warm_interval_s
+            ]:
+                del self._last_warm[stale]
+            return True
+
+    def end_warm(self) -> None:
+        """Release the claim taken by `try_begin_warm`."""
+        with self._lock:
+            self._warming = False
+
+    def record_usage(self, voice_id: str) -> None:
+        """Record that a request synthesized with `voice_id`."""
+        with self._lock:
+            usage = self._record_locked(voice_id, time.monotonic())
+            usage.resident = True
+
+    def usage_scores(self) -> dict[str, float]:
+        """Return the current decayed usage score of every tracked voice."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                voice_id: usage.decayed(now, self._usage_half_life_s)
+                for voice_id, usage in self._usage.items()
+            }
+
+    def plan(self, backend: PrewarmBackend) -> PrewarmPlan:
+        """Return the voices to load and unload given current usage."""
+        now = time.monotonic()
+        loaded = backend.loaded_voices()
+        with self._lock:
+            if loaded is None:
+                # The backend cannot see its voices (for example inside pool
+                # worker processes); rely on what this manager observed.
+                resident = [v for v, usage in self._usage.items() if usage.resident]
+            else:
+                resident = list(loaded)
+                for voice_id, usage in self._usage.items():
+                    usage.resident = voice_id in loaded
+            for voice_id in resident:
+                if voice_id not in self._usage:
+                    # First sighting of a voice loaded by someone else; it
+                    # becomes idle from now on.
+                    self._usage[voice_id] = _VoiceUsage(now)
+                    self._usage[voice_id].resident = True
+            ranked = sorted(
+                (
+                    (usage.decayed(now, self._usage_half_life_s), voice_id)
+                    for voice_id, usage in self._usage.items()
+                    if voice_id not in self._pinned
+                ),
+                reverse=True,
+            )
+            pinned = set(self._pinned)
+            max_voices = self._max_voices
+            budget = self._memory_budget_bytes
+            idle_cutoff = now - self._idle_unload_s if self._idle_unload_s else None
+            last_used = {voice_id: usage.last_used for voice_id, usage in self._usage.items()}
+            self._prune_usage_locked(now)
+
+        def size_of(voice_id: str) -> int | None:
+            if loaded is not None and voice_id in loaded:
+                return loaded[voice_id]
+            return backend.voice_size(voice_id)
+
+        used_bytes = sum(size_of(voice_id) or 0 for voice_id in pinned)
+        predicted: list[str] = []
+        for score, voice_id in ranked:
+            if score < _MIN_PREDICTED_SCORE or len(pinned) + len(predicted) >= max_voices:
+                break
+            size = size_of(voice_id)
+            if size is None:
+                continue
+            if budget is not None and used_bytes + size > budget:
+                continue
+            predicted.append(voice_id)
+            used_bytes += size
+        warm = tuple(voice_id for voice_id in predicted if voice_id not in resident)
+        unload = tuple(
+            voice_id
+            for voice_id in resident
+            if voice_id not in pinned
+            and voice_id not in predicted
+            and idle_cutoff is not None
+            and last_used.get(voice_id, now) <= idle_cutoff
+        )
+        return PrewarmPlan(warm=warm, unload=unload)
+
+    def run_scheduler_once(self, backend: PrewarmBackend) -> PrewarmPlan:
+        """Plan one tick and apply it through `backend`."""
+        plan = self.plan(backend)
+        for voice_id in plan.warm:
+            loaded = backend.load(voice_id)
+            logger.info(
+                "Prewarm scheduler: %s predicted voice %s",
+                "loaded" if loaded else "failed to load",
+                voice_id,
+            )
+            self._set_resident(voice_id, loaded)
+        for voice_id in plan.unload:
+            backend.unload(voice_id)
+            logger.info("Prewarm scheduler: unloaded idle voice %s", voice_id)
+            self._set_resident(voice_id, False)
+        return plan
+
+    def start_scheduler(self, backend: PrewarmBackend, interval_s: float) -> None:
+        """Run the scheduler every `interval_s` seconds on a daemon thread."""
+        if self._scheduler is not None:
+            return
+        self._scheduler_stop.clear()
+        self._scheduler = threading.Thread(
+            target=self._scheduler_loop,
+            args=(backend, interval_s),
+            name="prewarm-scheduler",
+            daemon=True,
+        )
+        self._scheduler.start()
+
+    def stop_scheduler(self) -> None:
+        """Stop the scheduler thread, waiting for a tick in progress."""
+        scheduler = self._scheduler
+        if scheduler is None:
+            return
+        self._scheduler_stop.set()
+        scheduler.join()
+        self._scheduler = None
+
+    def _scheduler_loop(self, backend: PrewarmBackend, interval_s: float) -> None:
+        while not self._scheduler_stop.wait(interval_s):
+            try:
+                self.run_scheduler_once(backend)
+            except Exception:
+                logger.exception("Prewarm scheduler tick failed.")
+
+    def _set_resident(self, voice_id: str, resident: bool) -> None:
+        with self._lock:
+            usage = self._usage.get(voice_id)
+            if usage is not None:
+                usage.resident = resident
+
+    def _record_locked(self, voice_id: str, now: float) -> _VoiceUsage:
+        usage = self._usage.get(voice_id)
+        if usage is None:
+            usage = self._usage[voice_id] = _VoiceUsage(now)
+        usage.add(1.0, now, self._usage_half_life_s)
+        if len(self._usage) > _MAX_TRACKED_VOICES:
+            self._prune_usage_locked(now)
+        return usage
+
+    def _prune_usage_locked(self, now: float) -> None:
+        """Forget voices that are neither resident nor likely to be predicted."""
+        forgotten = [
+            voice_id
+            for voice_id, usage in self._usage.items()
+            if not usage.resident
+            and usage.decayed(now, self._usage_half_life_s) < _MIN_PREDICTED_SCORE
+        ]
+        for voice_id in forgotten:
+            del self._usage[voice_id]
+        overflow = len(self._usage) - _MAX_TRACKED_VOICES
+        if overflow > 0:
+            coldest = sorted(
+                self._usage,
+                key=lambda voice_id: self._usage[voice_id].decayed(
+                    now, self._usage_half_life_s
+                ),
+            )
+            for voice_id in coldest[:overflow]:
+                del self._usage[voice_id]
+
+    def _trim_requests_locked(self, now: float) -> None:
+        expired = [
+            key
+            for key, (_, expires_at) in self._optional_requests.items()
+            if expires_at <= now
+        ]
+        for key in expired:
+            del self._optional_requests[key]
+        while len(self._optional_requests) > self._max_requests:
+            self._optional_requests.popitem(last=False)
+
+
+def startup_voices(settings: TtsSettings) -> tuple[str, ...]:
+    """Return the voices loaded at startup: the default model, then prewarm voices."""
+    voices = [settings.default_model] if settings.default_model else []
+    voices.extend(settings.prewarm_voices)
+    return tuple(dict.fromkeys(voices))
+
+
+def startup_resource_id(engine: str, voice_id: str | None) -> str:
+    """Return the prewarm resource identifier of an engine voice."""
+    return f"tts:{engine}:{voice_id or 'default'}"
 
 
 _PREWARM_MANAGER = PrewarmManager()
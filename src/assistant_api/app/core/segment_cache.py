@@ -0,0 +1,91 @@
+"""Per-segment PCM cache.
+
+Templated responses often repeat most of their sentences and change only one
+("Your order 123 has shipped. Anything else?"), so a whole-response cache
+misses on them. Caching PCM per sentence segment lets a response be spliced
+together from cached segments and freshly synthesized ones before encoding.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Iterator
+
+from assistant_api.app.core.audio_cache import ByteLruCache, normalize_text
+
+
+def segment_cache_key(voice_id: str, model_hash: str, segment: str) -> str:
+    """Return the cache key for one segment of one voice."""
+    material = json.dumps(
+        [voice_id, model_hash, normalize_text(segment)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SegmentPcmCache:
+    """Memory-bounded LRU of raw PCM keyed by voice and segment text.
+
+    A cache with no memory budget is disabled; `wrap` then returns the
+    synthesize callable unchanged.
+    """
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        self._memory: ByteLruCache | None = None
+        self.configure(max_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self._memory is not None
+
+    def configure(self, max_bytes: int) -> None:
+        """Replace the cache; existing entries are dropped."""
+        self._memory = ByteLruCache(max_bytes) if max_bytes > 0 else None
+
+    def size_bytes(self) -> int:
+        return self._memory.size_bytes() if self._memory is not None else 0
+
+    def clear(self) -> None:
+        if self._memory is not None:
+            self._memory.clear()
+
+    def wrap(
+        self,
+        synthesize: Callable[[str], Iterable[bytes]],
+        voice_id: str,
+        model_hash: str,
+    ) -> Callable[[str], Iterable[bytes]]:
+        """Return a synthesize callable that serves repeated segments from cache.
+
+        Fresh segments are stored once they have been synthesized completely;
+        a segment abandoned half-way is not cached.
+        """
+        memory = self._memory
+        if memory is None:
+            return synthesize
+
+        def cached_synthesize(segment: str) -> Iterator[bytes]:
+            key = segment_cache_key(voice_id, model_hash, segment)
+            cached = memory.get(key)
+            if cached is not None:
+                yield cached
+                return
+            parts: list[bytes] = []
+            for chunk in synthesize(segment):
+                parts.append(chunk)
+                yield chunk
+            pcm = b"".join(parts)
+            if pcm:
+                memory.put(key, pcm)
+
+        return cached_synthesize
+
+
+_SEGMENT_CACHE = SegmentPcmCache()
+
+
+def get_segment_cache() -> SegmentPcmCache:
+    """Return the shared segment PCM cache instance."""
+    return _SEGMENT_CACHE
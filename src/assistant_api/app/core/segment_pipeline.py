@@ -0,0 +1,220 @@
+"""Sentence-parallel synthesis pipeline.
+
+Long inputs are split into sentence (and, for very long sentences, clause)
+segments. Segments are synthesized concurrently on a shared thread pool and
+their PCM is emitted strictly in the original order, optionally separated by
+silence. ONNX Runtime releases the GIL during inference, so threads are enough
+to spread one long request across several cores.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from assistant_api.app.audio.types import PcmSpec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SEGMENT_CHARS = 300
+
+_SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"'”’)\]]))\s+")
+_CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:—])\s+")
+
+
+def split_text_segments(
+    text: str,
+    max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+) -> list[str]:
+    """Split text into sentence segments, breaking long sentences at clauses.
+
+    Segments keep their trailing punctuation so prosody is preserved. Clauses
+    are merged back together while they fit in `max_segment_chars`; a single
+    clause longer than the limit is kept whole rather than cut mid-phrase.
+    """
+    segments: list[str] = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_segment_chars:
+            segments.append(sentence)
+            continue
+        current = ""
+        for clause in _CLAUSE_BOUNDARY.split(sentence):
+            candidate = f"{current} {clause}" if current else clause
+            if current and len(candidate) > max_segment_chars:
+                segments.append(current)
+                current = clause
+            else:
+                current = candidate
+        if current:
+            segments.append(current)
+    return segments
+
+
+def split_complete_sentences(
+    text: str,
+    max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+) -> tuple[list[str], str]:
+    """Split streamed text into finished segments and the unfinished rest.
+
+    A sentence is finished once whitespace follows its closing punctuation,
+    so text arriving token by token is not cut at "3." of "3.14". A rest
+    longer than `max_segment_chars` without a sentence end is cut at its
+    last clause boundary, or failing that its last space, so unpunctuated
+    input still gets synthesized.
+    """
+    boundaries = list(_SENTENCE_BOUNDARY.finditer(text))
+    finished = text[: boundaries[-1].start()] if boundaries else ""
+    rest = text[boundaries[-1].end() :] if boundaries else text
+    segments = split_text_segments(finished, max_segment_chars)
+    while len(rest) > max_segment_chars:
+        cut = _last_cut(rest, max_segment_chars)
+        if not cut:
+            break
+        segments.append(rest[:cut].strip())
+        rest = rest[cut:].lstrip()
+    return segments, rest
+
+
+def _last_cut(text: str, limit: int) -> int:
+    clauses = [match.start() for match in _CLAUSE_BOUNDARY.finditer(text, 0, limit)]
+    if clauses:
+        return clauses[-1]
+    space = text.rfind(" ", 0, limit)
+    return max(space, 0)
+
+
+class SegmentPipeline:
+    """Synthesize text segments concurrently and reassemble them in order.
+
+    Each request keeps at most `max_workers` segments in flight, so a long
+    input cannot monopolize the pool ahead of its consumer. With a single
+    worker the pipeline degenerates to sequential, in-thread synthesis.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        silence_ms: int = 0,
+        max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+    ) -> None:
+        self._max_workers = 1
+        self._silence_ms = 0
+        self._max_segment_chars = DEFAULT_MAX_SEGMENT_CHARS
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.configure(max_workers, silence_ms, max_segment_chars)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def configure(
+        self,
+        max_workers: int,
+        silence_ms: int = 0,
+        max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+    ) -> None:
+        """Update pool size and segmentation; the pool is rebuilt lazily."""
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if silence_ms < 0:
+            raise ValueError("silence_ms must not be negative.")
+        with self._lock:
+            if self._executor is not None and max_workers != self._max_workers:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._max_workers = max_workers
+            self._silence_ms = silence_ms
+            self._max_segment_chars = max_segment_chars
+
+    def run(
+        self,
+        synthesize: Callable[[str], Iterable[bytes]],
+        text: str,
+        pcm_spec: PcmSpec | None = None,
+    ) -> Iterator[bytes]:
+        """Yield PCM chunks for `text`, synthesizing segments in parallel."""
+        segments = split_text_segments(text, self._max_segment_chars)
+        silence = self._silence_chunk(pcm_spec)
+        if self._max_workers <= 1 or len(segments) <= 1:
+            yield from self._run_sequential(synthesize, segments, silence)
+            return
+        logger.debug(
+            "SegmentPipeline: synthesizing %d segments on %d workers",
+            len(segments),
+            self._max_workers,
+        )
+        executor = self._get_executor()
+        pending: deque[Future[list[bytes]]] = deque()
+        remaining = iter(segments)
+        try:
+            for segment in remaining:
+                pending.append(executor.submit(_collect, synthesize, segment))
+                if len(pending) >= self._max_workers:
+                    break
+            first = True
+            while pending:
+                chunks = pending.popleft().result()
+                next_segment = next(remaining, None)
+                if next_segment is not None:
+                    pending.append(executor.submit(_collect, synthesize, next_segment))
+                if silence and not first:
+                    yield silence
+                first = False
+                yield from chunks
+        finally:
+            # Drop queued segments when the consumer stops early.
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the worker pool; in-flight segments finish in the background."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run_sequential(
+        self,
+        synthesize: Callable[[str], Iterable[bytes]],
+        segments: list[str],
+        silence: bytes,
+    ) -> Iterator[bytes]:
+        for index, segment in enumerate(segments):
+            if silence and index:
+                yield silence
+            yield from synthesize(segment)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="tts-segment",
+                )
+            return self._executor
+
+    def _silence_chunk(self, pcm_spec: PcmSpec | None) -> bytes:
+        if not self._silence_ms or pcm_spec is None:
+            return b""
+        frames = int(pcm_spec.sample_rate) * self._silence_ms // 1000
+        return b"\x00" * (frames * int(pcm_spec.channels) * pcm_spec.sample_width_bytes)
+
+
+def _collect(synthesize: Callable[[str], Iterable[bytes]], segment: str) -> list[bytes]:
+    return [chunk for chunk in synthesize(segment) if chunk]
+
+
+_SEGMENT_PIPELINE = SegmentPipeline()
+
+
+def get_segment_pipeline() -> SegmentPipeline:
+    """Return the shared segment pipeline instance."""
+    return _SEGMENT_PIPELINE
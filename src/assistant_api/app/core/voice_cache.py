@@ -0,0 +1,216 @@
+"""Process-wide cache of loaded TTS voice models.
+
+Loading a voice model (for Piper, building an ONNX Runtime session) is the
+most expensive part of a cold request. The cache keeps several voices loaded
+at once, keyed by voice id, and evicts the least recently used entries when a
+count or memory budget is exceeded. Concurrent first loads of the same voice
+share a single load: the first caller performs it and later callers wait.
+
+The cache is engine-agnostic; callers provide a loader that returns a
+`LoadedVoice` describing the model and its estimated memory footprint.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from assistant_api.app.audio.types import PcmSpec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_VOICES = 4
+
+
+@dataclass(frozen=True)
+class LoadedVoice:
+    """A loaded voice model and the metadata needed to use it."""
+
+    voice_id: str
+    voice: Any
+    pcm_spec: PcmSpec
+    size_bytes: int = 0
+
+
+class _PendingLoad:
+    """Single-flight state for a voice that is currently being loaded."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: LoadedVoice | None = None
+        self.error: BaseException | None = None
+
+
+class VoiceCache:
+    """Thread-safe LRU cache of loaded voices with a count and memory budget.
+
+    Pinned voices (typically the configured default model) are never evicted,
+    so the budget may be exceeded when pinned voices alone do not fit. A voice
+    that is evicted while a request still holds a reference keeps working for
+    that request; it is only dropped from the cache.
+    """
+
+    def __init__(
+        self,
+        max_voices: int = DEFAULT_MAX_VOICES,
+        max_memory_bytes: int | None = None,
+        pinned: Iterable[str] | None = None,
+    ) -> None:
+        if max_voices < 1:
+            raise ValueError("max_voices must be at least 1.")
+        self._max_voices = max_voices
+        self._max_memory_bytes = max_memory_bytes
+        self._pinned = set(pinned or [])
+        self._entries: OrderedDict[str, LoadedVoice] = OrderedDict()
+        self._pending: dict[str, _PendingLoad] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_voices(self) -> int:
+        return self._max_voices
+
+    @property
+    def max_memory_bytes(self) -> int | None:
+        return self._max_memory_bytes
+
+    def configure(
+        self,
+        max_voices: int | None = None,
+        max_memory_bytes: int | None = None,
+        pinned: Iterable[str] | None = None,
+    ) -> None:
+        """Update the cache budget and pinned voices, evicting as needed."""
+        if max_voices is not None and max_voices < 1:
+            raise ValueError("max_voices must be at least 1.")
+        with self._lock:
+            if max_voices is not None:
+                self._max_voices = max_voices
+            self._max_memory_bytes = max_memory_bytes
+            if pinned is not None:
+                self._pinned = set(pinned)
+            self._evict_locked()
+
+    def get(self, voice_id: str) -> LoadedVoice | None:
+        """Return a loaded voice without loading it, marking it recently used."""
+        with self._lock:
+            entry = self._entries.get(voice_id)
+            if entry is not None:
+                self._entries.move_to_end(voice_id)
+            return entry
+
+    def get_or_load(
+        self,
+        voice_id: str,
+        loader: Callable[[], LoadedVoice],
+    ) -> LoadedVoice:
+        """Return a cached voice, loading it once if it is not resident.
+
+        Concurrent callers asking for the same missing voice block until the
+        first caller's load finishes and then share its result (or error).
+        """
+        with self._lock:
+            entry = self._entries.get(voice_id)
+            if entry is not None:
+                self._entries.move_to_end(voice_id)
+                return entry
+            pending = self._pending.get(voice_id)
+            is_owner = pending is None
+            if pending is None:
+                pending = _PendingLoad()
+                self._pending[voice_id] = pending
+
+        if not is_owner:
+            logger.info("VoiceCache: waiting for in-flight load of %s", voice_id)
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            assert pending.result is not None
+            return pending.result
+
+        try:
+            loaded = loader()
+        except BaseException as exc:
+            pending.error = exc
+            with self._lock:
+                self._pending.pop(voice_id, None)
+            pending.done.set()
+            raise
+
+        with self._lock:
+            self._entries[voice_id] = loaded
+            self._entries.move_to_end(voice_id)
+            self._pending.pop(voice_id, None)
+            self._evict_locked()
+        pending.result = loaded
+        pending.done.set()
+        logger.info(
+            "VoiceCache: loaded voice %s (%d bytes, %d resident)",
+            voice_id,
+            loaded.size_bytes,
+            len(self._entries),
+        )
+        return loaded
+
+    def evict(self, voice_id: str) -> bool:
+        """Drop a voice from the cache, returning whether it was resident."""
+        with self._lock:
+            return self._entries.pop(voice_id, None) is not None
+
+    def list_loaded(self) -> tuple[str, ...]:
+        """Return resident voice ids from least to most recently used."""
+        with self._lock:
+            return tuple(self._entries.keys())
+
+    def loaded_sizes(self) -> dict[str, int]:
+        """Return the estimated memory of each resident voice."""
+        with self._lock:
+            return {voice_id: entry.size_bytes for voice_id, entry in self._entries.items()}
+
+    def memory_bytes(self) -> int:
+        """Return the estimated memory held by resident voices."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def clear(self) -> None:
+        """Drop every resident voice, including pinned ones."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_locked(self) -> None:
+        while self._over_budget_locked():
+            victim = next(
+                (
+                    voice_id
+                    for voice_id in self._entries
+                    if voice_id not in self._pinned
+                ),
+                None,
+            )
+            if victim is None:
+                return
+            # Keep the most recently used voice even when it alone exceeds the
+            # memory budget; evicting it would only force an immediate reload.
+            if victim == next(reversed(self._entries)):
+                return
+            del self._entries[victim]
+            logger.info("VoiceCache: evicted least recently used voice %s", victim)
+
+    def _over_budget_locked(self) -> bool:
+        if len(self._entries) > self._max_voices:
+            return True
+        if self._max_memory_bytes is None:
+            return False
+        used = sum(entry.size_bytes for entry in self._entries.values())
+        return used > self._max_memory_bytes
+
+
+_VOICE_CACHE = VoiceCache()
+
+
+def get_voice_cache() -> VoiceCache:
+    """Return the shared voice cache instance."""
+    return _VOICE_CACHE
@@ -3,21 +3,44 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
 import sys
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from assistant_api.app.api.v1 import api_router
-from assistant_api.app.core.prewarm import get_prewarm_manager
+from assistant_api.app.core.admission import get_admission_controller
+from assistant_api.app.core.audio_cache import get_audio_cache
+from assistant_api.app.core.coalescing import get_request_coalescer
+from assistant_api.app.core.encoder_pool import get_encoder_pool
+from assistant_api.app.core.metrics import get_speech_metrics
+from assistant_api.app.core.prewarm import (
+    get_prewarm_manager,
+    startup_resource_id,
+    startup_voices,
+)
+from assistant_api.app.core.segment_cache import get_segment_cache
+from assistant_api.app.core.segment_pipeline import get_segment_pipeline
+from assistant_api.app.core.voice_cache import get_voice_cache
 from assistant_api.app.settings import DEFAULT_CONFIG_PATH, load_settings
+from assistant_api.app.workers.manager import get_worker_manager
+from assistant_api.app.workers.pool import partition_cpus
+from assistant_api.app.workers.tts_dummy import DummyTtsWorker
+from assistant_api.app.workers.tts_piper import PiperPrewarmBackend, PiperTtsWorker
 
 if TYPE_CHECKING:
     from assistant_api.app.settings import Settings
 
 LOG_FILENAME = "assistant-api.log"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Threads kept free for requests that do not go through admission control.
+THREADPOOL_HEADROOM = 16
 
 
 def resolve_config_path(argv: list[str] | None = None) -> Path:
@@ -59,8 +82,220 @@ def configure_logging(settings: Settings) -> None:
     root_logger.addHandler(stream_handler)
 
 
-def create_app() -> FastAPI:
-    config_path = resolve_config_path(sys.argv[1:])
+def configure_voice_cache(settings: Settings) -> None:
+    max_memory_mb = settings.tts.voice_cache_max_memory_mb
+    pinned = list(startup_voices(settings.tts))
+    get_voice_cache().configure(
+        max_voices=settings.tts.voice_cache_max_voices,
+        max_memory_bytes=max_memory_mb * 1024 * 1024 if max_memory_mb else None,
+        pinned=pinned,
+    )
+    logging.getLogger(__name__).info(
+        "Voice cache: max_voices=%s max_memory_mb=%s pinned=%s",
+        settings.tts.voice_cache_max_voices,
+        max_memory_mb or "<unlimited>",
+        ", ".join(pinned) or "<none>",
+    )
+
+
+def configure_segment_pipeline(settings: Settings) -> None:
+    get_segment_pipeline().configure(
+        max_workers=settings.tts.segment_workers,
+        silence_ms=settings.tts.segment_silence_ms,
+        max_segment_chars=settings.tts.segment_max_chars,
+    )
+    get_segment_cache().configure(settings.tts.segment_cache_mb * 1024 * 1024)
+    logging.getLogger(__name__).info(
+        "Segment pipeline: workers=%s silence_ms=%s max_chars=%s cache_mb=%s",
+        settings.tts.segment_workers,
+        settings.tts.segment_silence_ms,
+        settings.tts.segment_max_chars,
+        settings.tts.segment_cache_mb,
+    )
+
+
+def configure_audio_cache(settings: Settings) -> None:
+    tts = settings.tts
+    get_audio_cache().configure(
+        memory_max_bytes=tts.audio_cache_memory_mb * 1024 * 1024,
+        disk_directory=tts.audio_cache_disk_path,
+        disk_max_bytes=tts.audio_cache_disk_mb * 1024 * 1024,
+        max_entry_bytes=tts.audio_cache_max_entry_kb * 1024,
+    )
+    logging.getLogger(__name__).info(
+        "Audio cache: memory_mb=%s disk_path=%s disk_mb=%s max_entry_kb=%s",
+        tts.audio_cache_memory_mb,
+        tts.audio_cache_disk_path or "<disabled>",
+        tts.audio_cache_disk_mb,
+        tts.audio_cache_max_entry_kb,
+    )
+
+
+def configure_encoder_pool(settings: Settings) -> None:
+    get_encoder_pool().configure(
+        max_idle=settings.tts.encoder_pool_max_idle,
+        idle_timeout_s=settings.tts.encoder_pool_idle_timeout_s,
+    )
+    logging.getLogger(__name__).info(
+        "Encoder pool: max_idle=%s idle_timeout_s=%s",
+        settings.tts.encoder_pool_max_idle,
+        settings.tts.encoder_pool_idle_timeout_s,
+    )
+
+
+def configure_admission(settings: Settings) -> None:
+    tts = settings.tts
+    get_admission_controller().configure(
+        max_concurrent=tts.admission_max_concurrent,
+        max_queue=tts.admission_max_queue,
+        queue_timeout_s=tts.admission_queue_timeout_s,
+        retry_after_s=tts.admission_retry_after_s,
+    )
+    logging.getLogger(__name__).info(
+        "Admission control: max_concurrent=%s max_queue=%s queue_timeout_s=%s",
+        tts.admission_max_concurrent or "<unlimited>",
+        tts.admission_max_queue,
+        tts.admission_queue_timeout_s,
+    )
+
+
+def configure_coalescing(settings: Settings) -> None:
+    tts = settings.tts
+    get_request_coalescer().configure(
+        tts.coalescing_enabled,
+        wait_timeout_s=tts.coalescing_wait_timeout_s,
+    )
+    logging.getLogger(__name__).info(
+        "Request coalescing: enabled=%s wait_timeout_s=%s",
+        tts.coalescing_enabled,
+        tts.coalescing_wait_timeout_s,
+    )
+
+
+def configure_prewarm(settings: Settings) -> None:
+    tts = settings.tts
+    if tts.prewarm_memory_mb:
+        memory_mb: int | None = tts.prewarm_memory_mb
+    else:
+        memory_mb = tts.voice_cache_max_memory_mb
+    get_prewarm_manager().configure(
+        request_ttl_s=tts.prewarm_request_ttl_s,
+        max_requests=tts.prewarm_max_requests,
+        usage_half_life_s=tts.prewarm_usage_half_life_s,
+        idle_unload_s=tts.prewarm_idle_unload_s,
+        max_voices=tts.voice_cache_max_voices,
+        memory_budget_bytes=memory_mb * 1024 * 1024 if memory_mb else None,
+        pinned=startup_voices(tts),
+        warm_interval_s=tts.prewarm_warm_interval_s,
+    )
+    logging.getLogger(__name__).info(
+        "Prewarm scheduler: interval_s=%s idle_unload_s=%s memory_mb=%s",
+        tts.prewarm_scheduler_interval_s or "<disabled>",
+        tts.prewarm_idle_unload_s or "<never>",
+        memory_mb or "<unlimited>",
+    )
+
+
+def start_prewarm_scheduler(settings: Settings) -> None:
+    interval_s = settings.tts.prewarm_scheduler_interval_s
+    if settings.tts.engine != "piper" or not interval_s:
+        return
+    pool = get_worker_manager().get_pool(PiperTtsWorker.worker_type())
+    backend = PiperPrewarmBackend(settings.tts, get_voice_cache(), pool)
+    get_prewarm_manager().start_scheduler(backend, interval_s)
+
+
+def size_threadpool(settings: Settings) -> None:
+    """Make room in the sync-endpoint threadpool for every admitted and queued request.
+
+    Queued requests wait on a threadpool thread. If the pool were smaller than
+    the admission limits, excess requests would queue unbounded inside the
+    threadpool instead of being rejected by admission control.
+    """
+    tts = settings.tts
+    if not tts.admission_max_concurrent:
+        return
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    required = tts.admission_max_concurrent + tts.admission_max_queue + THREADPOOL_HEADROOM
+    if limiter.total_tokens < required:
+        limiter.total_tokens = required
+        logging.getLogger(__name__).info("Threadpool size raised to %d", required)
+
+
+def start_worker_pool(settings: Settings) -> None:
+    if settings.tts.process_pool_size < 1:
+        return
+    manager = get_worker_manager()
+    if settings.tts.engine == "piper":
+        worker_cls: type[PiperTtsWorker] | type[DummyTtsWorker] = PiperTtsWorker
+    else:
+        worker_cls = DummyTtsWorker
+    manager.register(worker_cls)
+    cpu_sets = settings.tts.process_pool_cpu_affinity
+    if cpu_sets == "auto":
+        cpu_sets = partition_cpus(settings.tts.process_pool_size)
+    manager.start_pool(
+        worker_cls.worker_type(),
+        size=settings.tts.process_pool_size,
+        factory_args=(settings.tts,),
+        health_interval_s=settings.tts.process_pool_health_interval_s,
+        acquire_timeout_s=settings.tts.process_pool_acquire_timeout_s,
+        job_timeout_s=settings.tts.process_pool_job_timeout_s,
+        warm_timeout_s=settings.tts.process_pool_warm_timeout_s,
+        cpu_sets=cpu_sets,
+    )
+    logging.getLogger(__name__).info(
+        "Started %s process pool with %d workers (cpu_sets=%s)",
+        worker_cls.worker_type(),
+        settings.tts.process_pool_size,
+        " ".join(",".join(map(str, cpu_set)) for cpu_set in cpu_sets) or "<unpinned>",
+    )
+
+
+def prewarm_startup(settings: Settings) -> None:
+    """Load every startup voice and run one warm-up synthesis with it.
+
+    With a process pool, each idle worker process warms up; otherwise the
+    voices are loaded into the API process voice cache. The outcome of each
+    voice is recorded on the prewarm manager, which gates readiness.
+    """
+    logger = logging.getLogger(__name__)
+    prewarm_manager = get_prewarm_manager()
+    tts = settings.tts
+    voices: tuple[str | None, ...] = startup_voices(tts) or (None,)
+    try:
+        if tts.engine == "piper":
+            worker_cls: type[PiperTtsWorker] | type[DummyTtsWorker] = PiperTtsWorker
+        else:
+            worker_cls = DummyTtsWorker
+        pool = get_worker_manager().get_pool(worker_cls.worker_type())
+        worker = PiperTtsWorker(tts, voice_cache=get_voice_cache())
+        for voice in voices:
+            resource_id = startup_resource_id(tts.engine, voice)
+            started = time.perf_counter()
+            if pool is not None:
+                ok = pool.warm({"voice": voice, "text": tts.prewarm_warmup_text}) > 0
+            elif worker_cls is PiperTtsWorker:
+                ok = worker.warm_up(voice, tts.prewarm_warmup_text)
+            else:
+                # The in-process dummy engine has no model to load.
+                ok = True
+            if ok:
+                prewarm_manager.mark_warm(resource_id)
+                logger.info(
+                    "Prewarmed %s in %.3fs", resource_id, time.perf_counter() - started
+                )
+            else:
+                prewarm_manager.mark_failed(resource_id)
+                logger.error("Prewarm failed for %s", resource_id)
+    finally:
+        prewarm_manager.finish_startup()
+
+
+def create_app(config_path: Path | None = None) -> FastAPI:
+    """Build the application; without `config_path`, `--config` is read from argv."""
+    if config_path is None:
+        config_path = resolve_config_path(sys.argv[1:])
     settings = load_settings_or_exit(config_path)
     configure_logging(settings)
 
@@ -75,30 +310,83 @@ def create_app() -> FastAPI:
         settings.tts.models_path,
         settings.tts.default_model,
     )
+    configure_voice_cache(settings)
+    configure_segment_pipeline(settings)
+    configure_encoder_pool(settings)
+    configure_audio_cache(settings)
+    configure_admission(settings)
+    configure_coalescing(settings)
+    configure_prewarm(settings)
 
     @app.on_event("startup")
     async def on_startup() -> None:
         logger.info("Starting application.")
+        size_threadpool(settings)
         prewarm_manager = get_prewarm_manager()
-        default_resources = ("tts:default", "tts:piper:default")
+        voices = startup_voices(settings.tts) or (None,)
+        default_resources = [
+            startup_resource_id(settings.tts.engine, voice) for voice in voices
+        ]
         for resource_id in default_resources:
             prewarm_manager.register_default_resource(resource_id)
         logger.info(
             "Registered default prewarm resources: %s",
             ", ".join(default_resources),
         )
+        await asyncio.to_thread(start_worker_pool, settings)
+        if settings.tts.prewarm_enabled:
+            # Serve /health and /ready while voices load; /ready reports 503
+            # until every default resource is warm.
+            app.state.prewarm_task = asyncio.create_task(
+                asyncio.to_thread(prewarm_startup, settings)
+            )
+        else:
+            for resource_id in default_resources:
+                prewarm_manager.mark_warm(resource_id)
+            prewarm_manager.finish_startup()
+        start_prewarm_scheduler(settings)
 
     @app.on_event("shutdown")
     async def on_shutdown() -> None:
         logger.info("Shutting down application.")
+        await asyncio.to_thread(get_prewarm_manager().stop_scheduler)
+        get_segment_pipeline().shutdown()
+        await asyncio.to_thread(get_worker_manager().shutdown_pools)
 
     @app.get("/health")
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/ready")
+    async def ready() -> JSONResponse:
+        is_ready, resources = get_prewarm_manager().readiness()
+        return JSONResponse(
+            {"status": "ready" if is_ready else "not_ready", "resources": resources},
+            status_code=200 if is_ready else 503,
+        )
+
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            get_speech_metrics().render(),
+            media_type=PROMETHEUS_CONTENT_TYPE,
+        )
+
     app.include_router(api_router)
 
     return app
 
 
-app = create_app()
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> Any:
+    # `app` is built on first access (as uvicorn's "main:app" lookup does),
+    # so entry points can import this module and call create_app() with
+    # their own config path without loading the one named in argv.
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
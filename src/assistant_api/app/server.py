@@ -0,0 +1,220 @@
+"""Multi-process server with optional preload-then-fork voice sharing.
+
+`uvicorn --workers N` starts every worker process from scratch, so each one
+loads its own copy of every voice and memory grows with the worker count.
+This entry point forks the workers from one parent instead:
+
+    python -m assistant_api.app.server --config /etc/assistant-api/config.yaml \\
+        --workers 4 --preload
+
+With `--preload`, the parent loads and warms the startup voices (the default
+model and `tts.prewarm.voices`) before forking. The workers inherit those
+voice sessions, and because inference only reads the model weights, the pages
+holding them stay shared copy-on-write instead of being duplicated per
+worker. Voices loaded later are private to the worker that loads them.
+
+ONNX Runtime thread pool threads do not survive a fork, so preloaded
+sessions are built with one intra-op and one inter-op thread; parallelism
+then comes from the worker processes. Preloading needs the piper engine
+without a process pool, whose processes are spawned and load their own
+voices.
+
+The parent restarts workers that exit unexpectedly and forwards SIGTERM and
+SIGINT to all of them. Each worker keeps its own metrics, so a `/metrics`
+scrape reports only the worker that served it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from types import FrameType
+
+import uvicorn
+from fastapi import FastAPI
+
+from assistant_api.app.core.prewarm import startup_voices
+from assistant_api.app.core.voice_cache import get_voice_cache
+from assistant_api.app.main import create_app
+from assistant_api.app.settings import DEFAULT_CONFIG_PATH, Settings
+from assistant_api.app.workers.tts_piper import PiperTtsWorker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+# Workers that exit sooner than this after starting are restarted with a
+# delay, so a worker failing at startup does not spin the parent.
+_RESTART_BACKOFF_S = 1.0
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", dest="config_path", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Load the startup voices before forking so workers share them",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def preload_voices(settings: Settings) -> list[str]:
+    """Load and warm the startup voices in this process, before forking.
+
+    Returns the voices that were loaded.
+    """
+    tts = settings.tts
+    if tts.engine != "piper" or not PiperTtsWorker.is_available(tts):
+        logger.warning("Preload skipped: it only applies to the piper engine.")
+        return []
+    if tts.process_pool_size > 0:
+        logger.warning(
+            "Preload skipped: voices are loaded by the tts.process_pool processes."
+        )
+        return []
+    # Forked workers would inherit sessions whose pool threads do not exist.
+    preload_settings = replace(
+        tts,
+        onnx_intra_op_threads=1,
+        onnx_inter_op_threads=1,
+        onnx_execution_mode="sequential",
+    )
+    worker = PiperTtsWorker(preload_settings, voice_cache=get_voice_cache())
+    loaded = []
+    for voice in startup_voices(tts):
+        started = time.perf_counter()
+        if worker.warm_up(voice, tts.prewarm_warmup_text):
+            loaded.append(voice)
+            logger.info(
+                "Preloaded voice %s in %.3fs", voice, time.perf_counter() - started
+            )
+        else:
+            logger.warning("Could not preload voice %s; workers load it themselves.", voice)
+    return loaded
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Forks worker processes serving one shared socket and keeps them running."""
+
+    def __init__(self, application: FastAPI, sock: socket.socket, workers: int) -> None:
+        self._app = application
+        self._socket = sock
+        self._workers = workers
+        # pid -> (worker index, start time)
+        self._children: dict[int, tuple[int, float]] = {}
+        self._stopping = False
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for index in range(self._workers):
+            self._spawn(index)
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self._children.pop(pid, None)
+            if child is None or self._stopping:
+                continue
+            index, started = child
+            logger.warning(
+                "Worker %d (pid %d) exited with code %d; restarting it.",
+                index,
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            if time.monotonic() - started < _RESTART_BACKOFF_S:
+                time.sleep(_RESTART_BACKOFF_S)
+            if not self._stopping:
+                self._spawn(index)
+        logger.info("All workers stopped.")
+        return 0
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve()
+            except BaseException:
+                logger.exception("Worker %d failed.", index)
+                code = 1
+            finally:
+                # Never return into the parent's supervision loop.
+                os._exit(code)
+        self._children[pid] = (index, time.monotonic())
+        logger.info("Started worker %d (pid %d).", index, pid)
+
+    def _serve(self) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        host, port = self._socket.getsockname()[:2]
+        config = uvicorn.Config(self._app, host=host, port=port)
+        uvicorn.Server(config).run(sockets=[self._socket])
+
+    def _stop(self, signum: int, frame: FrameType | None) -> None:
+        if not self._stopping:
+            logger.info("Stopping %d workers.", len(self._children))
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    app = create_app(Path(args.config_path))
+    settings: Settings = app.state.settings
+    if args.preload:
+        voices = preload_voices(settings)
+        logger.info("Preloaded %d voices before forking workers.", len(voices))
+    if threading.active_count() > 1:
+        logger.warning(
+            "%d threads are running before fork; only the calling thread is copied.",
+            threading.active_count(),
+        )
+    # Preloaded objects are never collected; keeping them out of the
+    # collector's reach stops workers from writing to (and copying) their pages.
+    gc.collect()
+    gc.freeze()
+    sock = bind_socket(args.host, args.port)
+    logger.info(
+        "Serving on %s:%d with %d workers (preload=%s)",
+        args.host,
+        args.port,
+        args.workers,
+        args.preload,
+    )
+    return Supervisor(app, sock, args.workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,34 @@ import yaml
 
 DEFAULT_CONFIG_PATH = "/etc/assistant-api/config.yaml"
 DEFAULT_LOG_DIRECTORY = "/var/log/assistant-api"
+DEFAULT_VOICE_CACHE_MAX_VOICES = 4
+DEFAULT_STREAM_BUFFER_KB = 256
+DEFAULT_SEGMENT_MAX_CHARS = 300
+DEFAULT_POOL_HEALTH_INTERVAL_S = 10.0
+DEFAULT_POOL_ACQUIRE_TIMEOUT_S = 30.0
+DEFAULT_POOL_JOB_TIMEOUT_S = 120.0
+DEFAULT_POOL_WARM_TIMEOUT_S = 300.0
+DEFAULT_OPUS_FIRST_PAGE_FRAMES = 1
+DEFAULT_OPUS_FRAMES_PER_PAGE = 10
+DEFAULT_ENCODER_POOL_MAX_IDLE = 16
+DEFAULT_ENCODER_POOL_IDLE_TIMEOUT_S = 300.0
+DEFAULT_AUDIO_CACHE_DISK_MB = 1024
+DEFAULT_AUDIO_CACHE_MAX_ENTRY_KB = 4096
+DEFAULT_ADMISSION_MAX_QUEUE = 16
+DEFAULT_ADMISSION_QUEUE_TIMEOUT_S = 10.0
+DEFAULT_ADMISSION_RETRY_AFTER_S = 1
+DEFAULT_COALESCING_WAIT_TIMEOUT_S = 30.0
+DEFAULT_PREWARM_WARMUP_TEXT = "Hello."
+DEFAULT_PREWARM_SCHEDULER_INTERVAL_S = 30.0
+DEFAULT_PREWARM_IDLE_UNLOAD_S = 600.0
+DEFAULT_PREWARM_USAGE_HALF_LIFE_S = 900.0
+DEFAULT_PREWARM_REQUEST_TTL_S = 300.0
+DEFAULT_PREWARM_MAX_REQUESTS = 256
+DEFAULT_PREWARM_WARM_INTERVAL_S = 10.0
+DEFAULT_BATCH_MAX_ITEMS = 1000
+DEFAULT_BATCH_CONCURRENCY = 4
+ONNX_EXECUTION_MODES = ("sequential", "parallel")
+ONNX_GRAPH_OPTIMIZATION_LEVELS = ("disabled", "basic", "extended", "all")
 
 
 @dataclass(frozen=True)
@@ -28,6 +56,56 @@ class TtsSettings:
     engine: str
     models_path: Path | None
     default_model: str | None
+    voice_cache_max_voices: int = DEFAULT_VOICE_CACHE_MAX_VOICES
+    voice_cache_max_memory_mb: int | None = None
+    streaming_enabled: bool = True
+    stream_buffer_bytes: int = DEFAULT_STREAM_BUFFER_KB * 1024
+    encode_thread_enabled: bool = True
+    segment_workers: int = 1
+    segment_silence_ms: int = 0
+    segment_max_chars: int = DEFAULT_SEGMENT_MAX_CHARS
+    segment_cache_mb: int = 0
+    process_pool_size: int = 0
+    process_pool_health_interval_s: float = DEFAULT_POOL_HEALTH_INTERVAL_S
+    process_pool_acquire_timeout_s: float = DEFAULT_POOL_ACQUIRE_TIMEOUT_S
+    process_pool_job_timeout_s: float = DEFAULT_POOL_JOB_TIMEOUT_S
+    process_pool_warm_timeout_s: float = DEFAULT_POOL_WARM_TIMEOUT_S
+    # CPU sets assigned to pool processes round-robin; "auto" splits the
+    # available CPUs evenly. Empty leaves scheduling to the OS.
+    process_pool_cpu_affinity: tuple[tuple[int, ...], ...] | str = ()
+    onnx_intra_op_threads: int = 0
+    onnx_inter_op_threads: int = 0
+    onnx_execution_mode: str = "sequential"
+    onnx_graph_optimization: str = "all"
+    dummy_real_time_factor: float = 0.0
+    dummy_sentence_latency_ms: int = 0
+    dummy_jitter_ms: int = 0
+    opus_first_page_frames: int = DEFAULT_OPUS_FIRST_PAGE_FRAMES
+    opus_frames_per_page: int = DEFAULT_OPUS_FRAMES_PER_PAGE
+    encoder_pool_max_idle: int = DEFAULT_ENCODER_POOL_MAX_IDLE
+    encoder_pool_idle_timeout_s: float = DEFAULT_ENCODER_POOL_IDLE_TIMEOUT_S
+    audio_cache_memory_mb: int = 0
+    audio_cache_disk_path: Path | None = None
+    audio_cache_disk_mb: int = DEFAULT_AUDIO_CACHE_DISK_MB
+    audio_cache_max_entry_kb: int = DEFAULT_AUDIO_CACHE_MAX_ENTRY_KB
+    admission_max_concurrent: int = 0
+    admission_max_queue: int = DEFAULT_ADMISSION_MAX_QUEUE
+    admission_queue_timeout_s: float = DEFAULT_ADMISSION_QUEUE_TIMEOUT_S
+    admission_retry_after_s: int = DEFAULT_ADMISSION_RETRY_AFTER_S
+    coalescing_enabled: bool = False
+    coalescing_wait_timeout_s: float = DEFAULT_COALESCING_WAIT_TIMEOUT_S
+    prewarm_enabled: bool = True
+    prewarm_voices: tuple[str, ...] = ()
+    prewarm_warmup_text: str = DEFAULT_PREWARM_WARMUP_TEXT
+    prewarm_scheduler_interval_s: float = DEFAULT_PREWARM_SCHEDULER_INTERVAL_S
+    prewarm_idle_unload_s: float = DEFAULT_PREWARM_IDLE_UNLOAD_S
+    prewarm_usage_half_life_s: float = DEFAULT_PREWARM_USAGE_HALF_LIFE_S
+    prewarm_request_ttl_s: float = DEFAULT_PREWARM_REQUEST_TTL_S
+    prewarm_max_requests: int = DEFAULT_PREWARM_MAX_REQUESTS
+    prewarm_memory_mb: int | None = None
+    prewarm_warm_interval_s: float = DEFAULT_PREWARM_WARM_INTERVAL_S
+    batch_max_items: int = DEFAULT_BATCH_MAX_ITEMS
+    batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY
 
 
 def _load_yaml(path: Path) -> dict[str, Any]:
@@ -38,6 +116,46 @@ def _load_yaml(path: Path) -> dict[str, Any]:
     return data
 
 
+def _positive_int(value: Any, name: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"'{name}' must be a positive integer.")
+    return value
+
+
+def _non_negative_int(value: Any, name: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"'{name}' must be a non-negative integer.")
+    return value
+
+
+def _positive_number(value: Any, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"'{name}' must be a positive number.")
+    return float(value)
+
+
+def _non_negative_number(value: Any, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"'{name}' must be a non-negative number.")
+    return float(value)
+
+
+def _cpu_affinity(value: Any) -> tuple[tuple[int, ...], ...] | str:
+    if value is None:
+        return ()
+    if value == "auto":
+        return "auto"
+    name = "tts.process_pool.cpu_affinity"
+    if not isinstance(value, list):
+        raise ValueError(f"'{name}' must be 'auto' or a list of CPU lists.")
+    cpu_sets = []
+    for cpu_set in value:
+        if not isinstance(cpu_set, list) or not cpu_set:
+            raise ValueError(f"'{name}' entries must be non-empty lists of CPU numbers.")
+        cpu_sets.append(tuple(_non_negative_int(cpu, name) for cpu in cpu_set))
+    return tuple(cpu_sets)
+
+
 def load_settings(config_path: str = DEFAULT_CONFIG_PATH) -> Settings:
     """Load settings from YAML, failing fast on errors."""
 
@@ -74,10 +192,294 @@ def load_settings(config_path: str = DEFAULT_CONFIG_PATH) -> Settings:
         if importlib.util.find_spec("piper") is None:
             raise RuntimeError("Piper module is not installed.")
 
+    voice_cache_config = tts_config.get("voice_cache") or {}
+    if not isinstance(voice_cache_config, dict):
+        raise ValueError("TTS 'voice_cache' configuration must be a mapping.")
+    voice_cache_max_voices = _positive_int(
+        voice_cache_config.get("max_voices", DEFAULT_VOICE_CACHE_MAX_VOICES),
+        "tts.voice_cache.max_voices",
+    )
+    voice_cache_max_memory_mb = voice_cache_config.get("max_memory_mb")
+    if voice_cache_max_memory_mb is not None:
+        voice_cache_max_memory_mb = _positive_int(
+            voice_cache_max_memory_mb, "tts.voice_cache.max_memory_mb"
+        )
+
+    streaming_config = tts_config.get("streaming") or {}
+    if not isinstance(streaming_config, dict):
+        raise ValueError("TTS 'streaming' configuration must be a mapping.")
+    streaming_enabled = streaming_config.get("enabled", True)
+    if not isinstance(streaming_enabled, bool):
+        raise ValueError("'tts.streaming.enabled' must be true or false.")
+    encode_thread_enabled = streaming_config.get("encode_thread", True)
+    if not isinstance(encode_thread_enabled, bool):
+        raise ValueError("'tts.streaming.encode_thread' must be true or false.")
+    stream_buffer_kb = _positive_int(
+        streaming_config.get("buffer_kb", DEFAULT_STREAM_BUFFER_KB),
+        "tts.streaming.buffer_kb",
+    )
+
+    segments_config = tts_config.get("segments") or {}
+    if not isinstance(segments_config, dict):
+        raise ValueError("TTS 'segments' configuration must be a mapping.")
+    segment_workers = _positive_int(
+        segments_config.get("workers", 1), "tts.segments.workers"
+    )
+    segment_silence_ms = _non_negative_int(
+        segments_config.get("silence_ms", 0), "tts.segments.silence_ms"
+    )
+    segment_max_chars = _positive_int(
+        segments_config.get("max_chars", DEFAULT_SEGMENT_MAX_CHARS),
+        "tts.segments.max_chars",
+    )
+    segment_cache_mb = _non_negative_int(
+        segments_config.get("cache_mb", 0), "tts.segments.cache_mb"
+    )
+
+    pool_config = tts_config.get("process_pool") or {}
+    if not isinstance(pool_config, dict):
+        raise ValueError("TTS 'process_pool' configuration must be a mapping.")
+    process_pool_size = _non_negative_int(
+        pool_config.get("size", 0), "tts.process_pool.size"
+    )
+    process_pool_health_interval_s = _positive_number(
+        pool_config.get("health_interval_s", DEFAULT_POOL_HEALTH_INTERVAL_S),
+        "tts.process_pool.health_interval_s",
+    )
+    process_pool_acquire_timeout_s = _positive_number(
+        pool_config.get("acquire_timeout_s", DEFAULT_POOL_ACQUIRE_TIMEOUT_S),
+        "tts.process_pool.acquire_timeout_s",
+    )
+    process_pool_job_timeout_s = _positive_number(
+        pool_config.get("job_timeout_s", DEFAULT_POOL_JOB_TIMEOUT_S),
+        "tts.process_pool.job_timeout_s",
+    )
+    process_pool_warm_timeout_s = _positive_number(
+        pool_config.get("warm_timeout_s", DEFAULT_POOL_WARM_TIMEOUT_S),
+        "tts.process_pool.warm_timeout_s",
+    )
+    process_pool_cpu_affinity = _cpu_affinity(pool_config.get("cpu_affinity"))
+
+    onnx_config = tts_config.get("onnx") or {}
+    if not isinstance(onnx_config, dict):
+        raise ValueError("TTS 'onnx' configuration must be a mapping.")
+    onnx_intra_op_threads = _non_negative_int(
+        onnx_config.get("intra_op_threads", 0), "tts.onnx.intra_op_threads"
+    )
+    onnx_inter_op_threads = _non_negative_int(
+        onnx_config.get("inter_op_threads", 0), "tts.onnx.inter_op_threads"
+    )
+    onnx_execution_mode = onnx_config.get("execution_mode", "sequential")
+    if onnx_execution_mode not in ONNX_EXECUTION_MODES:
+        raise ValueError(
+            "'tts.onnx.execution_mode' must be one of: " + ", ".join(ONNX_EXECUTION_MODES)
+        )
+    onnx_graph_optimization = onnx_config.get("graph_optimization", "all")
+    if onnx_graph_optimization not in ONNX_GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(
+            "'tts.onnx.graph_optimization' must be one of: "
+            + ", ".join(ONNX_GRAPH_OPTIMIZATION_LEVELS)
+        )
+
+    dummy_config = tts_config.get("dummy") or {}
+    if not isinstance(dummy_config, dict):
+        raise ValueError("TTS 'dummy' configuration must be a mapping.")
+    dummy_real_time_factor = _non_negative_number(
+        dummy_config.get("real_time_factor", 0.0), "tts.dummy.real_time_factor"
+    )
+    dummy_sentence_latency_ms = _non_negative_int(
+        dummy_config.get("sentence_latency_ms", 0), "tts.dummy.sentence_latency_ms"
+    )
+    dummy_jitter_ms = _non_negative_int(
+        dummy_config.get("jitter_ms", 0), "tts.dummy.jitter_ms"
+    )
+
+    opus_config = tts_config.get("opus") or {}
+    if not isinstance(opus_config, dict):
+        raise ValueError("TTS 'opus' configuration must be a mapping.")
+    opus_first_page_frames = _positive_int(
+        opus_config.get("first_page_frames", DEFAULT_OPUS_FIRST_PAGE_FRAMES),
+        "tts.opus.first_page_frames",
+    )
+    opus_frames_per_page = _positive_int(
+        opus_config.get("frames_per_page", DEFAULT_OPUS_FRAMES_PER_PAGE),
+        "tts.opus.frames_per_page",
+    )
+
+    encoder_pool_config = tts_config.get("encoder_pool") or {}
+    if not isinstance(encoder_pool_config, dict):
+        raise ValueError("TTS 'encoder_pool' configuration must be a mapping.")
+    encoder_pool_max_idle = _non_negative_int(
+        encoder_pool_config.get("max_idle", DEFAULT_ENCODER_POOL_MAX_IDLE),
+        "tts.encoder_pool.max_idle",
+    )
+    encoder_pool_idle_timeout_s = _positive_number(
+        encoder_pool_config.get("idle_timeout_s", DEFAULT_ENCODER_POOL_IDLE_TIMEOUT_S),
+        "tts.encoder_pool.idle_timeout_s",
+    )
+
+    audio_cache_config = tts_config.get("audio_cache") or {}
+    if not isinstance(audio_cache_config, dict):
+        raise ValueError("TTS 'audio_cache' configuration must be a mapping.")
+    audio_cache_memory_mb = _non_negative_int(
+        audio_cache_config.get("memory_mb", 0), "tts.audio_cache.memory_mb"
+    )
+    audio_cache_disk_path_value = audio_cache_config.get("disk_path")
+    if audio_cache_disk_path_value is not None and not isinstance(
+        audio_cache_disk_path_value, str
+    ):
+        raise ValueError("'tts.audio_cache.disk_path' must be a string.")
+    audio_cache_disk_mb = _positive_int(
+        audio_cache_config.get("disk_mb", DEFAULT_AUDIO_CACHE_DISK_MB),
+        "tts.audio_cache.disk_mb",
+    )
+    audio_cache_max_entry_kb = _positive_int(
+        audio_cache_config.get("max_entry_kb", DEFAULT_AUDIO_CACHE_MAX_ENTRY_KB),
+        "tts.audio_cache.max_entry_kb",
+    )
+
+    admission_config = tts_config.get("admission") or {}
+    if not isinstance(admission_config, dict):
+        raise ValueError("TTS 'admission' configuration must be a mapping.")
+    admission_max_concurrent = _non_negative_int(
+        admission_config.get("max_concurrent", 0), "tts.admission.max_concurrent"
+    )
+    admission_max_queue = _non_negative_int(
+        admission_config.get("max_queue", DEFAULT_ADMISSION_MAX_QUEUE),
+        "tts.admission.max_queue",
+    )
+    admission_queue_timeout_s = _positive_number(
+        admission_config.get("queue_timeout_s", DEFAULT_ADMISSION_QUEUE_TIMEOUT_S),
+        "tts.admission.queue_timeout_s",
+    )
+    admission_retry_after_s = _positive_int(
+        admission_config.get("retry_after_s", DEFAULT_ADMISSION_RETRY_AFTER_S),
+        "tts.admission.retry_after_s",
+    )
+
+    coalescing_config = tts_config.get("coalescing") or {}
+    if not isinstance(coalescing_config, dict):
+        raise ValueError("TTS 'coalescing' configuration must be a mapping.")
+    coalescing_enabled = coalescing_config.get("enabled", False)
+    if not isinstance(coalescing_enabled, bool):
+        raise ValueError("'tts.coalescing.enabled' must be true or false.")
+    coalescing_wait_timeout_s = _positive_number(
+        coalescing_config.get("wait_timeout_s", DEFAULT_COALESCING_WAIT_TIMEOUT_S),
+        "tts.coalescing.wait_timeout_s",
+    )
+
+    prewarm_config = tts_config.get("prewarm") or {}
+    if not isinstance(prewarm_config, dict):
+        raise ValueError("TTS 'prewarm' configuration must be a mapping.")
+    prewarm_enabled = prewarm_config.get("enabled", True)
+    if not isinstance(prewarm_enabled, bool):
+        raise ValueError("'tts.prewarm.enabled' must be true or false.")
+    prewarm_voices = prewarm_config.get("voices") or []
+    if not isinstance(prewarm_voices, list) or not all(
+        isinstance(voice, str) and voice for voice in prewarm_voices
+    ):
+        raise ValueError("'tts.prewarm.voices' must be a list of voice names.")
+    if engine == "piper" and models_path is not None:
+        for voice in prewarm_voices:
+            if not (models_path / f"{voice}.onnx").is_file():
+                raise ValueError(f"Piper prewarm voice not found: {models_path / voice}.onnx")
+    prewarm_warmup_text = prewarm_config.get("warmup_text", DEFAULT_PREWARM_WARMUP_TEXT)
+    if not isinstance(prewarm_warmup_text, str) or not prewarm_warmup_text.strip():
+        raise ValueError("'tts.prewarm.warmup_text' must be a non-empty string.")
+    prewarm_scheduler_interval_s = _non_negative_number(
+        prewarm_config.get("scheduler_interval_s", DEFAULT_PREWARM_SCHEDULER_INTERVAL_S),
+        "tts.prewarm.scheduler_interval_s",
+    )
+    prewarm_idle_unload_s = _non_negative_number(
+        prewarm_config.get("idle_unload_s", DEFAULT_PREWARM_IDLE_UNLOAD_S),
+        "tts.prewarm.idle_unload_s",
+    )
+    prewarm_usage_half_life_s = _positive_number(
+        prewarm_config.get("usage_half_life_s", DEFAULT_PREWARM_USAGE_HALF_LIFE_S),
+        "tts.prewarm.usage_half_life_s",
+    )
+    prewarm_request_ttl_s = _positive_number(
+        prewarm_config.get("request_ttl_s", DEFAULT_PREWARM_REQUEST_TTL_S),
+        "tts.prewarm.request_ttl_s",
+    )
+    prewarm_max_requests = _positive_int(
+        prewarm_config.get("max_requests", DEFAULT_PREWARM_MAX_REQUESTS),
+        "tts.prewarm.max_requests",
+    )
+    prewarm_memory_mb = None
+    if prewarm_config.get("memory_mb") is not None:
+        prewarm_memory_mb = _positive_int(
+            prewarm_config["memory_mb"], "tts.prewarm.memory_mb"
+        )
+    prewarm_warm_interval_s = _non_negative_number(
+        prewarm_config.get("warm_interval_s", DEFAULT_PREWARM_WARM_INTERVAL_S),
+        "tts.prewarm.warm_interval_s",
+    )
+
+    batch_config = tts_config.get("batch") or {}
+    if not isinstance(batch_config, dict):
+        raise ValueError("TTS 'batch' configuration must be a mapping.")
+    batch_max_items = _positive_int(
+        batch_config.get("max_items", DEFAULT_BATCH_MAX_ITEMS), "tts.batch.max_items"
+    )
+    batch_concurrency = _positive_int(
+        batch_config.get("concurrency", DEFAULT_BATCH_CONCURRENCY), "tts.batch.concurrency"
+    )
+
     tts_settings = TtsSettings(
         engine=engine,
         models_path=models_path,
         default_model=default_model,
+        voice_cache_max_voices=voice_cache_max_voices,
+        voice_cache_max_memory_mb=voice_cache_max_memory_mb,
+        streaming_enabled=streaming_enabled,
+        stream_buffer_bytes=stream_buffer_kb * 1024,
+        encode_thread_enabled=encode_thread_enabled,
+        segment_workers=segment_workers,
+        segment_silence_ms=segment_silence_ms,
+        segment_max_chars=segment_max_chars,
+        segment_cache_mb=segment_cache_mb,
+        process_pool_size=process_pool_size,
+        process_pool_health_interval_s=process_pool_health_interval_s,
+        process_pool_acquire_timeout_s=process_pool_acquire_timeout_s,
+        process_pool_job_timeout_s=process_pool_job_timeout_s,
+        process_pool_warm_timeout_s=process_pool_warm_timeout_s,
+        process_pool_cpu_affinity=process_pool_cpu_affinity,
+        onnx_intra_op_threads=onnx_intra_op_threads,
+        onnx_inter_op_threads=onnx_inter_op_threads,
+        onnx_execution_mode=onnx_execution_mode,
+        onnx_graph_optimization=onnx_graph_optimization,
+        dummy_real_time_factor=dummy_real_time_factor,
+        dummy_sentence_latency_ms=dummy_sentence_latency_ms,
+        dummy_jitter_ms=dummy_jitter_ms,
+        opus_first_page_frames=opus_first_page_frames,
+        opus_frames_per_page=opus_frames_per_page,
+        encoder_pool_max_idle=encoder_pool_max_idle,
+        encoder_pool_idle_timeout_s=encoder_pool_idle_timeout_s,
+        audio_cache_memory_mb=audio_cache_memory_mb,
+        audio_cache_disk_path=(
+            Path(audio_cache_disk_path_value) if audio_cache_disk_path_value else None
+        ),
+        audio_cache_disk_mb=audio_cache_disk_mb,
+        audio_cache_max_entry_kb=audio_cache_max_entry_kb,
+        admission_max_concurrent=admission_max_concurrent,
+        admission_max_queue=admission_max_queue,
+        admission_queue_timeout_s=admission_queue_timeout_s,
+        admission_retry_after_s=admission_retry_after_s,
+        coalescing_enabled=coalescing_enabled,
+        coalescing_wait_timeout_s=coalescing_wait_timeout_s,
+        prewarm_enabled=prewarm_enabled,
+        prewarm_voices=tuple(prewarm_voices),
+        prewarm_warmup_text=prewarm_warmup_text,
+        prewarm_scheduler_interval_s=prewarm_scheduler_interval_s,
+        prewarm_idle_unload_s=prewarm_idle_unload_s,
+        prewarm_usage_half_life_s=prewarm_usage_half_life_s,
+        prewarm_request_ttl_s=prewarm_request_ttl_s,
+        prewarm_max_requests=prewarm_max_requests,
+        prewarm_memory_mb=prewarm_memory_mb,
+        prewarm_warm_interval_s=prewarm_warm_interval_s,
+        batch_max_items=batch_max_items,
+        batch_concurrency=batch_concurrency,
     )
 
     return Settings(log_directory=Path(log_directory), tts=tts_settings)
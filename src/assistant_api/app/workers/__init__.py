@@ -1,6 +1,14 @@
 """Worker interfaces for CPU-intensive processing."""
 
 from .base import BaseWorker
-from .manager import WorkerManager
+from .manager import WorkerManager, get_worker_manager
+from .pool import ProcessWorkerPool, WorkerPoolBusyError, WorkerPoolError
 
-__all__ = ["BaseWorker", "WorkerManager"]
+__all__ = [
+    "BaseWorker",
+    "ProcessWorkerPool",
+    "WorkerManager",
+    "WorkerPoolBusyError",
+    "WorkerPoolError",
+    "get_worker_manager",
+]
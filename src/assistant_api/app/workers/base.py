@@ -6,7 +6,8 @@ objects, or transport-specific details. Workers also must avoid global state so
 that they can be instantiated, restarted, and isolated safely.
 
 This module intentionally avoids any execution model (threads, processes,
-async). It only defines structural contracts for future worker implementations.
+async). It only defines structural contracts for worker implementations; the
+process pool in `workers.pool` is one execution model built on top of them.
 """
 
 from __future__ import annotations
@@ -32,6 +33,16 @@ class BaseWorker(ABC):
     def worker_type(cls) -> str:
         """Return a unique string identifier for this worker type."""
 
+    @classmethod
+    def for_worker_process(cls, *args: Any) -> BaseWorker:
+        """Build an instance that lives for the lifetime of a pool process.
+
+        Implementations can override this to wire process-local resources
+        (such as a model cache) that would otherwise be injected by the
+        caller. Arguments must be picklable.
+        """
+        return cls(*args)
+
     @abstractmethod
     def process(self, payload: Any) -> Any:
         """Process a unit of work and return a result.
@@ -1,23 +1,26 @@
-"""Worker registry and lookup utilities.
+"""Worker registry and execution pool ownership.
 
-The manager provides a central place to register worker types without
-instantiating or executing them. It is intentionally minimal and does not
-schedule tasks, start workers, or manage concurrency.
+The manager provides a central place to register worker types. Registered
+types can optionally be backed by a `ProcessWorkerPool`, which runs long-lived
+worker processes and dispatches jobs to them; the manager owns those pools and
+their lifecycle.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Optional, Type
+from typing import Any, Dict, Iterable, Optional, Type
 
 from .base import BaseWorker
+from .pool import ProcessWorkerPool
 
 
 @dataclass(slots=True)
 class WorkerManager:
-    """Registry for available worker types."""
+    """Registry for available worker types and their process pools."""
 
     _registry: Dict[str, Type[BaseWorker]] = field(default_factory=dict)
+    _pools: Dict[str, ProcessWorkerPool] = field(default_factory=dict)
 
     def register(self, worker_cls: Type[BaseWorker]) -> None:
         """Register a worker type by its declared identifier."""
@@ -31,3 +34,46 @@ class WorkerManager:
     def list_types(self) -> Iterable[str]:
         """List the registered worker type identifiers."""
         return tuple(self._registry.keys())
+
+    def start_pool(
+        self,
+        worker_type: str,
+        size: int,
+        factory_args: tuple[Any, ...] = (),
+        **pool_options: Any,
+    ) -> ProcessWorkerPool:
+        """Start a process pool for a registered worker type."""
+        worker_cls = self._registry.get(worker_type)
+        if worker_cls is None:
+            raise KeyError(f"Unknown worker type: {worker_type}")
+        if worker_type in self._pools:
+            raise RuntimeError(f"A pool for {worker_type} is already running.")
+        pool = ProcessWorkerPool(
+            worker_cls.for_worker_process,
+            factory_args,
+            size=size,
+            name=worker_type.replace(":", "-"),
+            **pool_options,
+        )
+        pool.start()
+        self._pools[worker_type] = pool
+        return pool
+
+    def get_pool(self, worker_type: str) -> Optional[ProcessWorkerPool]:
+        """Return the running pool for the given type, if any."""
+        return self._pools.get(worker_type)
+
+    def shutdown_pools(self) -> None:
+        """Stop every running pool."""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
+
+_WORKER_MANAGER = WorkerManager()
+
+
+def get_worker_manager() -> WorkerManager:
+    """Return the shared worker manager instance."""
+    return _WORKER_MANAGER
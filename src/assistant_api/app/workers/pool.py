@@ -0,0 +1,541 @@
+"""Process pool execution engine for workers.
+
+The pool keeps a fixed number of long-lived worker processes. Each process
+builds its own worker instance once (for Piper, with its own loaded voices)
+and then serves one job at a time. PCM produced in a worker process is sent
+back to the API process over a pipe and exposed as an `AudioStream`, so
+inference runs outside the API process and its GIL.
+
+A monitor thread pings idle processes and replaces any that died or stopped
+answering. A process that dies mid-job fails that job's stream and is
+restarted before the slot is handed out again.
+
+Processes can be pinned to CPU sets (Linux), so concurrent inference
+sessions do not compete for the same cores.
+"""
+
+from __future__ import annotations
+
+import builtins
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable, Sequence
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.audio.types import AudioFormat, PcmSpec
+from assistant_api.app.workers.base import BaseWorker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_INTERVAL_S = 10.0
+DEFAULT_HEALTH_TIMEOUT_S = 5.0
+DEFAULT_ACQUIRE_TIMEOUT_S = 30.0
+# Longest a running job may go without a message from its worker process
+# (its spec reply, which follows any voice load, or its next PCM chunk).
+DEFAULT_JOB_TIMEOUT_S = 120.0
+# Warm-up covers starting a process, a cold voice load and a synthesis, so it
+# is not bounded by the request-facing acquire timeout.
+DEFAULT_WARM_TIMEOUT_S = 300.0
+_CANCEL_DRAIN_TIMEOUT_S = 5.0
+# How often a blocked read checks for a cancel requested by another thread.
+_CANCEL_POLL_S = 0.05
+_SHUTDOWN_TIMEOUT_S = 5.0
+
+
+class WorkerPoolError(RuntimeError):
+    """Raised when the pool cannot run a job."""
+
+
+class WorkerPoolBusyError(WorkerPoolError):
+    """Raised when no worker process becomes idle before the acquire timeout."""
+
+
+class _WorkerSlot:
+    """Parent-side handle for one worker process."""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+        self.busy = False
+        self.restarts = 0
+
+
+class ProcessWorkerPool:
+    """Fixed-size pool of worker processes serving one job each at a time."""
+
+    def __init__(
+        self,
+        factory: Callable[..., BaseWorker],
+        factory_args: tuple[Any, ...] = (),
+        size: int = 1,
+        health_interval_s: float = DEFAULT_HEALTH_INTERVAL_S,
+        health_timeout_s: float = DEFAULT_HEALTH_TIMEOUT_S,
+        acquire_timeout_s: float = DEFAULT_ACQUIRE_TIMEOUT_S,
+        job_timeout_s: float = DEFAULT_JOB_TIMEOUT_S,
+        warm_timeout_s: float = DEFAULT_WARM_TIMEOUT_S,
+        name: str = "worker",
+        cpu_sets: Sequence[Sequence[int]] = (),
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        # Spawned processes do not inherit the API process's threads or
+        # event loop, which fork would copy in an inconsistent state.
+        self._context = multiprocessing.get_context("spawn")
+        self._factory = factory
+        self._factory_args = factory_args
+        self._size = size
+        self._health_interval_s = health_interval_s
+        self._health_timeout_s = health_timeout_s
+        self._acquire_timeout_s = acquire_timeout_s
+        self._job_timeout_s = job_timeout_s
+        self._warm_timeout_s = warm_timeout_s
+        self._name = name
+        self._cpu_sets = tuple(tuple(cpu_set) for cpu_set in cpu_sets)
+        self._slots = [_WorkerSlot(index) for index in range(size)]
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def job_timeout_s(self) -> float:
+        return self._job_timeout_s
+
+    def start(self) -> None:
+        """Start every worker process and the health monitor."""
+        for slot in self._slots:
+            self._spawn(slot)
+        self._monitor = threading.Thread(
+            target=self._monitor_loop,
+            name=f"{self._name}-pool-monitor",
+            daemon=True,
+        )
+        self._monitor.start()
+        logger.info("ProcessWorkerPool[%s]: started %d processes", self._name, self._size)
+
+    def submit(self, payload: Any) -> "PooledPcmStream":
+        """Dispatch a job and return its PCM stream once the worker accepts it.
+
+        Errors raised by the worker before it produces audio (for example a
+        missing model file) are re-raised here with their original type when
+        it is a builtin exception.
+        """
+        started = time.perf_counter()
+        slot = self._acquire()
+        queue_wait_s = time.perf_counter() - started
+        assert slot.conn is not None
+        try:
+            slot.conn.send(("job", payload))
+            answered = slot.conn.poll(self._job_timeout_s)
+            message = slot.conn.recv() if answered else None
+        except (EOFError, OSError) as exc:
+            self._handle_crash(slot)
+            raise WorkerPoolError("Worker process exited unexpectedly.") from exc
+        if message is None:
+            # A wedged process would otherwise hold its slot forever; the
+            # monitor never checks busy slots.
+            self._handle_crash(slot, hung=True)
+            raise WorkerPoolError("Worker process did not start the job in time.")
+        kind = message[0]
+        if kind == "error":
+            self._release(slot)
+            raise _rebuild_error(message[1], message[2])
+        if kind != "spec":
+            self._handle_crash(slot)
+            raise WorkerPoolError(f"Unexpected worker message: {kind!r}")
+        return PooledPcmStream(self, slot, message[1], queue_wait_s, message[2])
+
+    def warm(self, payload: Any) -> int:
+        """Ask every idle worker process to preload resources for `payload`.
+
+        Idle processes warm up one at a time, each returning to service as
+        soon as it replies; returns how many succeeded.
+        """
+        return self._broadcast("warm", payload)
+
+    def unload(self, voice_id: str) -> int:
+        """Ask every idle worker process to drop a loaded voice.
+
+        Returns how many processes had the voice loaded.
+        """
+        return self._broadcast("unload", voice_id)
+
+    def _broadcast(self, kind: str, payload: Any) -> int:
+        # One process at a time, so a slow voice load keeps at most one
+        # process away from speech requests.
+        succeeded = 0
+        for slot in self._slots:
+            with self._condition:
+                if slot.busy or slot.conn is None:
+                    continue
+                slot.busy = True
+            if self._request(slot, kind, payload):
+                succeeded += 1
+        return succeeded
+
+    def _request(self, slot: _WorkerSlot, kind: str, payload: Any) -> bool:
+        assert slot.conn is not None
+        try:
+            slot.conn.send((kind, payload))
+            if not slot.conn.poll(self._warm_timeout_s):
+                # The reply would desync the pipe; replace the process.
+                self._handle_crash(slot, hung=True)
+                return False
+            message = slot.conn.recv()
+        except (EOFError, OSError):
+            self._handle_crash(slot)
+            return False
+        self._release(slot)
+        return message[0] == "done" and bool(message[1])
+
+    def alive_count(self) -> int:
+        """Return the number of worker processes currently running."""
+        return sum(
+            1
+            for slot in self._slots
+            if slot.process is not None and slot.process.is_alive()
+        )
+
+    def restart_count(self) -> int:
+        """Return the number of worker processes restarted since start."""
+        return sum(slot.restarts for slot in self._slots)
+
+    def shutdown(self) -> None:
+        """Stop the monitor and every worker process."""
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        for slot in self._slots:
+            self._stop_process(slot)
+        logger.info("ProcessWorkerPool[%s]: stopped", self._name)
+
+    def _acquire(self) -> _WorkerSlot:
+        deadline = time.monotonic() + self._acquire_timeout_s
+        with self._condition:
+            while True:
+                if self._stopping.is_set():
+                    raise WorkerPoolError("Worker pool is shutting down.")
+                for slot in self._slots:
+                    if not slot.busy and slot.conn is not None:
+                        slot.busy = True
+                        return slot
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise WorkerPoolBusyError("No idle worker process available.")
+                self._condition.wait(remaining)
+
+    def _release(self, slot: _WorkerSlot) -> None:
+        with self._condition:
+            slot.busy = False
+            self._condition.notify()
+
+    def _handle_crash(self, slot: _WorkerSlot, hung: bool = False) -> None:
+        logger.error(
+            "ProcessWorkerPool[%s]: worker process %d %s; restarting",
+            self._name,
+            slot.index,
+            "is not responding" if hung else "failed",
+        )
+        self._stop_process(slot, kill=hung)
+        if not self._stopping.is_set():
+            slot.restarts += 1
+            self._spawn(slot)
+        self._release(slot)
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self._factory, self._factory_args, self._cpu_set(slot)),
+            name=f"{self._name}-{slot.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        slot.process = process
+        slot.conn = parent_conn
+
+    def _cpu_set(self, slot: _WorkerSlot) -> tuple[int, ...] | None:
+        if not self._cpu_sets:
+            return None
+        return self._cpu_sets[slot.index % len(self._cpu_sets)]
+
+    def _stop_process(self, slot: _WorkerSlot, kill: bool = False) -> None:
+        process, conn = slot.process, slot.conn
+        slot.process, slot.conn = None, None
+        if conn is not None and not kill:
+            try:
+                conn.send(("shutdown",))
+            except (EOFError, OSError):
+                pass
+        if process is not None:
+            # A hung process would never read the shutdown message.
+            process.join(0 if kill else _SHUTDOWN_TIMEOUT_S)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if conn is not None:
+            conn.close()
+
+    def _monitor_loop(self) -> None:
+        while not self._stopping.wait(self._health_interval_s):
+            for slot in self._slots:
+                with self._condition:
+                    if slot.busy:
+                        continue
+                    slot.busy = True
+                if not self._is_healthy(slot):
+                    self._handle_crash(slot)
+                else:
+                    self._release(slot)
+
+    def _is_healthy(self, slot: _WorkerSlot) -> bool:
+        if slot.process is None or slot.conn is None or not slot.process.is_alive():
+            return False
+        try:
+            slot.conn.send(("ping",))
+            if not slot.conn.poll(self._health_timeout_s):
+                return False
+            return slot.conn.recv()[0] == "pong"
+        except (EOFError, OSError):
+            return False
+
+
+class PooledPcmStream(AudioStream):
+    """PCM stream fed by a job running in a pool worker process.
+
+    Reads block on the worker pipe, whose buffer provides backpressure: the
+    worker process stalls once the consumer stops reading. `queue_wait_s` is
+    how long the job waited for an idle process and `voice_load_s` how long
+    that process spent loading a voice model for it (None when it had one).
+
+    A `Connection` supports one reader at a time, so only the thread holding
+    the stream lock touches the pipe. `cancel` from another thread while a
+    read is blocked only flags the request; the reading thread then cancels
+    the job and its read returns None.
+    """
+
+    def __init__(
+        self,
+        pool: ProcessWorkerPool,
+        slot: _WorkerSlot,
+        pcm_spec: PcmSpec | None,
+        queue_wait_s: float = 0.0,
+        voice_load_s: float | None = None,
+    ) -> None:
+        self._pool = pool
+        self._slot = slot
+        self._pcm_spec = pcm_spec
+        self._finished = False
+        self._cancel_requested = False
+        self._lock = threading.Lock()
+        self._last_message_at = time.monotonic()
+        self.queue_wait_s = queue_wait_s
+        self.voice_load_s = voice_load_s
+
+    @property
+    def output_format(self) -> AudioFormat:
+        return AudioFormat.PCM
+
+    @property
+    def pcm_spec(self) -> PcmSpec | None:
+        return self._pcm_spec
+
+    def push_pcm(self, chunk: bytes) -> None:
+        raise TypeError("PooledPcmStream is fed by its worker process.")
+
+    def read_encoded(self, timeout: float | None = None) -> Optional[bytes]:
+        with self._lock:
+            if self._finished:
+                return None
+            return self._read_locked(timeout)
+
+    def cancel(self) -> None:
+        self._cancel_requested = True
+        with self._lock:
+            if not self._finished:
+                self._cancel_locked()
+
+    def _read_locked(self, timeout: float | None) -> Optional[bytes]:
+        conn = self._slot.conn
+        assert conn is not None
+        job_timeout_s = self._pool.job_timeout_s
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                if self._cancel_requested:
+                    self._cancel_locked()
+                    return None
+                now = time.monotonic()
+                wait_s = min(job_timeout_s - (now - self._last_message_at), _CANCEL_POLL_S)
+                if deadline is not None:
+                    wait_s = min(wait_s, deadline - now)
+                if conn.poll(max(wait_s, 0.0)):
+                    break
+                if time.monotonic() - self._last_message_at >= job_timeout_s:
+                    self._finished = True
+                    self._pool._handle_crash(self._slot, hung=True)
+                    raise WorkerPoolError("Worker process stopped producing audio.")
+                if deadline is not None and time.monotonic() >= deadline:
+                    return b""
+            message = conn.recv()
+        except (EOFError, OSError) as exc:
+            self._finished = True
+            self._pool._handle_crash(self._slot)
+            raise WorkerPoolError("Worker process exited during synthesis.") from exc
+        self._last_message_at = time.monotonic()
+        kind = message[0]
+        if kind == "pcm":
+            return message[1]
+        self._finished = True
+        self._pool._release(self._slot)
+        if kind == "error":
+            raise _rebuild_error(message[1], message[2])
+        return None
+
+    def _cancel_locked(self) -> None:
+        self._finished = True
+        conn = self._slot.conn
+        try:
+            assert conn is not None
+            conn.send(("cancel",))
+            # Drain until the worker acknowledges, so the slot is clean.
+            deadline = time.monotonic() + _CANCEL_DRAIN_TIMEOUT_S
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not conn.poll(remaining):
+                    raise TimeoutError("Worker did not acknowledge cancel.")
+                if conn.recv()[0] in {"end", "error"}:
+                    break
+        except (EOFError, OSError, TimeoutError, AssertionError):
+            self._pool._handle_crash(self._slot)
+            return
+        self._pool._release(self._slot)
+
+
+def _rebuild_error(type_name: str, message: str) -> Exception:
+    error_type = getattr(builtins, type_name, None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        return error_type(message)
+    return WorkerPoolError(f"{type_name}: {message}")
+
+
+def partition_cpus(parts: int) -> tuple[tuple[int, ...], ...]:
+    """Split the CPUs this process may use into `parts` near-equal sets.
+
+    With fewer CPUs than parts, sets are shared round-robin. Returns no sets
+    where CPU affinity is not supported.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return ()
+    cpus = sorted(os.sched_getaffinity(0))
+    if parts >= len(cpus):
+        return tuple((cpu,) for cpu in cpus)
+    size, extra = divmod(len(cpus), parts)
+    cpu_sets = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0)
+        cpu_sets.append(tuple(cpus[start:end]))
+        start = end
+    return tuple(cpu_sets)
+
+
+def _worker_main(
+    conn: Connection,
+    factory: Callable[..., BaseWorker],
+    factory_args: tuple[Any, ...],
+    cpu_set: tuple[int, ...] | None = None,
+) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(processName)s %(name)s %(message)s",
+    )
+    if cpu_set is not None and hasattr(os, "sched_setaffinity"):
+        # Before the worker exists, so inference thread pools size to it.
+        try:
+            os.sched_setaffinity(0, cpu_set)
+            logger.info("Pinned worker process to CPUs %s", ",".join(map(str, cpu_set)))
+        except OSError as exc:
+            logger.warning("Could not pin worker process to CPUs %s: %s", cpu_set, exc)
+    worker = factory(*factory_args)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            kind = message[0]
+            if kind == "ping":
+                conn.send(("pong",))
+            elif kind == "job":
+                _run_job(conn, worker, message[1])
+            elif kind == "warm":
+                conn.send(("done", _warm_worker(worker, message[1])))
+            elif kind == "unload":
+                unload = getattr(worker, "unload", None)
+                conn.send(("done", bool(unload(message[1])) if unload else False))
+            elif kind == "cancel":
+                # A cancel that raced with job completion. The parent drains
+                # that job's own "end", so replying here would leave a stray
+                # message for the next job on this slot.
+                continue
+            elif kind == "shutdown":
+                return
+    finally:
+        worker.shutdown()
+
+
+def _warm_worker(worker: BaseWorker, payload: Any) -> bool:
+    voice = payload.get("voice") if isinstance(payload, dict) else payload
+    warm_up = getattr(worker, "warm_up", None)
+    if warm_up is not None and isinstance(payload, dict) and payload.get("text"):
+        return bool(warm_up(voice, payload["text"]))
+    preload = getattr(worker, "preload", None)
+    if preload is not None:
+        return bool(preload(voice))
+    return True
+
+
+def _run_job(conn: Connection, worker: BaseWorker, payload: Any) -> None:
+    try:
+        process_streaming = getattr(worker, "process_streaming", None)
+        stream = process_streaming(payload) if process_streaming else worker.process(payload)
+    except Exception as exc:
+        logging.getLogger(__name__).exception("Worker job failed before streaming.")
+        conn.send(("error", type(exc).__name__, str(exc)))
+        return
+    conn.send(
+        (
+            "spec",
+            getattr(worker, "pcm_spec", None),
+            getattr(worker, "last_voice_load_s", None),
+        )
+    )
+    try:
+        while True:
+            if conn.poll():
+                message = conn.recv()
+                if message[0] == "cancel":
+                    stream.cancel()
+                    conn.send(("end",))
+                    return
+            chunk = stream.read_encoded()
+            if chunk is None:
+                break
+            if chunk:
+                conn.send(("pcm", chunk))
+    except Exception as exc:
+        stream.cancel()
+        conn.send(("error", type(exc).__name__, str(exc)))
+        return
+    conn.send(("end",))
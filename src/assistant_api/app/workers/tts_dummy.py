@@ -2,19 +2,75 @@
 
 from __future__ import annotations
 
+import random
+import re
+import threading
+import time
 from typing import Any, Iterable
 
-from assistant_api.app.audio.dummy import DummyPcmStream
+from assistant_api.app.audio.pcm_stream import PcmBufferStream
 from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.settings import TtsSettings
 from assistant_api.app.workers.base import BaseWorker
 
 _PCM_SAMPLE_WIDTH_BYTES = 2
 _SAMPLES_PER_CHAR = 160
+_SAMPLE_RATE = 16_000
+_DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024
+_PUSH_CHUNK_BYTES = 4096
+_CANCEL_POLL_S = 0.05
+_SENTENCE_END = re.compile(r"[.!?…]+\s+")
 # Implicit fake PCM format: 16-bit samples, mono, ~16kHz-equivalent chunk pacing.
 
+# Sample `i` of a character with code point `seed` is
+# (((i + seed) % 256) - 128) * 256 as little-endian int16: a zero low byte and
+# a high byte of (i + seed + 128) % 256. Every character's PCM is therefore a
+# slice of one precomputed ramp, and no per-sample work is done at runtime.
+_CHAR_PCM_BYTES = _SAMPLES_PER_CHAR * _PCM_SAMPLE_WIDTH_BYTES
+_PCM_RAMP = bytes(
+    byte
+    for index in range(256 + _SAMPLES_PER_CHAR)
+    for byte in (0, (index + 128) % 256)
+)
+
 
 class DummyTtsWorker(BaseWorker):
-    """Fake TTS worker that generates deterministic PCM bytes."""
+    """Fake TTS worker that generates deterministic PCM bytes.
+
+    PCM is produced on a background thread into a bounded stream, so long
+    inputs exercise the same backpressure path as the Piper worker. Text is
+    produced sentence by sentence; each sentence can be delayed to imitate
+    inference: `sentence_latency_ms` fixed cost, plus `real_time_factor`
+    times the sentence's audio duration, plus up to `jitter_ms` of random
+    delay. With all three at zero the worker produces audio immediately.
+    """
+
+    def __init__(
+        self,
+        max_buffered_bytes: int | None = _DEFAULT_MAX_BUFFERED_BYTES,
+        real_time_factor: float = 0.0,
+        sentence_latency_ms: int = 0,
+        jitter_ms: int = 0,
+    ) -> None:
+        self._max_buffered_bytes = max_buffered_bytes
+        self._real_time_factor = real_time_factor
+        self._sentence_latency_ms = sentence_latency_ms
+        self._jitter_ms = jitter_ms
+        self._random = random.Random()
+
+    @classmethod
+    def from_settings(cls, settings: TtsSettings) -> DummyTtsWorker:
+        """Build a worker configured from `TtsSettings`."""
+        return cls(
+            max_buffered_bytes=settings.stream_buffer_bytes,
+            real_time_factor=settings.dummy_real_time_factor,
+            sentence_latency_ms=settings.dummy_sentence_latency_ms,
+            jitter_ms=settings.dummy_jitter_ms,
+        )
+
+    @classmethod
+    def for_worker_process(cls, settings: TtsSettings) -> DummyTtsWorker:
+        return cls.from_settings(settings)
 
     @classmethod
     def worker_type(cls) -> str:
@@ -22,16 +78,39 @@ class DummyTtsWorker(BaseWorker):
 
     def process(self, payload: Any) -> AudioStream:
         text = _extract_text(payload)
-        stream = DummyPcmStream()
-        chunks = _pcm_chunks_for_text(text)
-        for chunk in chunks:
-            stream.push_pcm(chunk)
-        stream.close()
+        stream = PcmBufferStream(max_buffered_bytes=self._max_buffered_bytes)
+        producer = threading.Thread(
+            target=self._produce_pcm,
+            args=(text, stream),
+            name="dummy-synthesis",
+            daemon=True,
+        )
+        producer.start()
         return stream
 
     def shutdown(self) -> None:
         """No-op shutdown for the dummy worker."""
 
+    def _produce_pcm(self, text: str, stream: PcmBufferStream) -> None:
+        for pcm in _pcm_sentences_for_text(text):
+            delay = self._sentence_delay_s(len(pcm))
+            # Sleep in small steps so an abandoned request stops promptly.
+            while delay > 0 and not stream.cancelled:
+                time.sleep(min(delay, _CANCEL_POLL_S))
+                delay -= _CANCEL_POLL_S
+            for start in range(0, len(pcm), _PUSH_CHUNK_BYTES):
+                if stream.cancelled:
+                    return
+                stream.push_pcm(pcm[start : start + _PUSH_CHUNK_BYTES])
+        stream.close()
+
+    def _sentence_delay_s(self, pcm_bytes: int) -> float:
+        audio_s = pcm_bytes / (_SAMPLE_RATE * _PCM_SAMPLE_WIDTH_BYTES)
+        delay_ms = self._sentence_latency_ms + self._real_time_factor * audio_s * 1000
+        if self._jitter_ms:
+            delay_ms += self._random.uniform(0, self._jitter_ms)
+        return delay_ms / 1000
+
 
 def _extract_text(payload: Any) -> str:
     if isinstance(payload, dict):
@@ -42,22 +121,26 @@ def _extract_text(payload: Any) -> str:
     return str(payload)
 
 
-def _pcm_chunks_for_text(text: str) -> Iterable[bytes]:
+def _pcm_sentences_for_text(text: str) -> Iterable[bytes]:
     if not text:
         yield _silence_chunk()
         return
-    for char in text:
-        yield _pcm_chunk_for_char(char)
+    # Sentences keep their trailing whitespace so every character is voiced.
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        yield _pcm_for_chars(text[start : match.end()])
+        start = match.end()
+    if start < len(text):
+        yield _pcm_for_chars(text[start:])
+
+
+def _pcm_for_chars(chars: str) -> bytes:
+    return b"".join([_pcm_chunk_for_char(char) for char in chars])
 
 
 def _pcm_chunk_for_char(char: str) -> bytes:
-    seed = ord(char)
-    buffer = bytearray()
-    for index in range(_SAMPLES_PER_CHAR):
-        value = ((index + seed) % 256) - 128
-        sample = value * 256
-        buffer.extend(sample.to_bytes(_PCM_SAMPLE_WIDTH_BYTES, "little", signed=True))
-    return bytes(buffer)
+    offset = (ord(char) % 256) * _PCM_SAMPLE_WIDTH_BYTES
+    return _PCM_RAMP[offset : offset + _CHAR_PCM_BYTES]
 
 
 def _silence_chunk() -> bytes:
@@ -4,19 +4,31 @@ from __future__ import annotations
 
 import importlib.util
 import itertools
+import json
 import logging
+import os
 import sys
+import threading
+import time
 from array import array
 from pathlib import Path
-from collections.abc import Iterable
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
 
 from assistant_api.app.audio.pcm_stream import PcmBufferStream
 from assistant_api.app.audio.stream import AudioStream
 from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+from assistant_api.app.core.audio_cache import model_file_hash
+from assistant_api.app.core.prewarm import startup_voices
+from assistant_api.app.core.segment_cache import SegmentPcmCache
+from assistant_api.app.core.segment_pipeline import SegmentPipeline
+from assistant_api.app.core.voice_cache import LoadedVoice, VoiceCache
 from assistant_api.app.settings import TtsSettings
 from assistant_api.app.workers.base import BaseWorker
 
+if TYPE_CHECKING:
+    from assistant_api.app.workers.pool import ProcessWorkerPool
+
 _DEFAULT_SAMPLE_RATE = SampleRate(16_000)
 _PCM_SAMPLE_WIDTH_BYTES = 2
 _DEFAULT_CHUNK_SIZE = 4096
@@ -25,18 +37,62 @@ _AUDIO_CHUNK_TYPE: type[Any] | None | bool = None
 
 
 class PiperTtsWorker(BaseWorker):
-    """TTS worker backed by the Python `piper` module (not the CLI binary)."""
-
-    def __init__(self, settings: TtsSettings) -> None:
+    """TTS worker backed by the Python `piper` module (not the CLI binary).
+
+    When a `VoiceCache` is provided, loaded voices are shared through it so
+    that short-lived worker instances do not reload models per request. When a
+    `SegmentPipeline` is provided, text is split into segments that are
+    synthesized concurrently and reassembled in order. When a
+    `SegmentPcmCache` is provided as well, segments already synthesized for
+    the same voice are spliced in from the cache instead of re-synthesized.
+    """
+
+    def __init__(
+        self,
+        settings: TtsSettings,
+        voice_cache: VoiceCache | None = None,
+        segment_pipeline: SegmentPipeline | None = None,
+        segment_cache: SegmentPcmCache | None = None,
+    ) -> None:
         self._settings = settings
+        self._voice_cache = voice_cache
+        self._segment_pipeline = segment_pipeline
+        self._segment_cache = segment_cache
         self._voice: Any | None = None
         self._voice_id: str | None = None
         self._pcm_spec: PcmSpec | None = None
+        self._last_voice_load_s: float | None = None
 
     @classmethod
     def worker_type(cls) -> str:
         return "tts:piper"
 
+    @classmethod
+    def for_worker_process(cls, settings: TtsSettings) -> PiperTtsWorker:
+        """Build a worker owning process-local caches and pipeline."""
+        max_memory_mb = settings.voice_cache_max_memory_mb
+        voice_cache = VoiceCache(
+            max_voices=settings.voice_cache_max_voices,
+            max_memory_bytes=max_memory_mb * 1024 * 1024 if max_memory_mb else None,
+            pinned=startup_voices(settings),
+        )
+        segment_pipeline = None
+        segment_cache = None
+        if settings.segment_cache_mb > 0:
+            segment_cache = SegmentPcmCache(settings.segment_cache_mb * 1024 * 1024)
+        if uses_segment_pipeline(settings):
+            segment_pipeline = SegmentPipeline(
+                max_workers=settings.segment_workers,
+                silence_ms=settings.segment_silence_ms,
+                max_segment_chars=settings.segment_max_chars,
+            )
+        return cls(
+            settings,
+            voice_cache=voice_cache,
+            segment_pipeline=segment_pipeline,
+            segment_cache=segment_cache,
+        )
+
     @classmethod
     def is_available(cls, settings: TtsSettings) -> bool:
         if settings.engine != "piper":
@@ -52,31 +108,113 @@ class PiperTtsWorker(BaseWorker):
         return self._pcm_spec
 
     def process(self, payload: Any) -> AudioStream:
+        """Synthesize the whole text before returning an unbounded stream."""
         voice_id = _extract_voice(payload, self._settings.default_model)
         logger.info("PiperTtsWorker: using voice model %s", voice_id)
         voice = self._load_voice(voice_id)
         text = _extract_text(payload)
         stream = PcmBufferStream()
-        for chunk in _synthesize_pcm_chunks(voice, text):
+        for chunk in self._iter_pcm(voice, voice_id, text):
             if chunk:
                 stream.push_pcm(chunk)
         stream.close()
         return stream
 
+    def process_streaming(
+        self,
+        payload: Any,
+        max_buffered_bytes: int | None = None,
+    ) -> AudioStream:
+        """Start synthesis in a producer thread and return the stream at once.
+
+        The voice is loaded before returning so that model errors surface to
+        the caller; synthesis errors are re-raised to the stream consumer.
+        Chunks are pushed as Piper yields them, so the first sentence can be
+        encoded and sent while later sentences are still being synthesized.
+        The buffer bound defaults to `TtsSettings.stream_buffer_bytes`.
+        """
+        if max_buffered_bytes is None:
+            max_buffered_bytes = self._settings.stream_buffer_bytes
+        voice_id = _extract_voice(payload, self._settings.default_model)
+        logger.info("PiperTtsWorker: streaming with voice model %s", voice_id)
+        voice = self._load_voice(voice_id)
+        text = _extract_text(payload)
+        stream = PcmBufferStream(max_buffered_bytes=max_buffered_bytes)
+        producer = threading.Thread(
+            target=_produce_pcm,
+            args=(self._iter_pcm(voice, voice_id, text), stream),
+            name="piper-synthesis",
+            daemon=True,
+        )
+        producer.start()
+        return stream
+
+    @property
+    def last_voice_load_s(self) -> float | None:
+        """Seconds this worker spent loading a model for its last request.
+
+        None when the voice was already loaded or another caller loaded it.
+        """
+        return self._last_voice_load_s
+
     def shutdown(self) -> None:
         """No-op shutdown for the Piper worker."""
 
-    def preload(self) -> bool:
+    def preload(self, voice_id: str | None = None) -> bool:
         """Load the Piper voice model if needed."""
         try:
-            voice_id = _extract_voice({}, self._settings.default_model)
+            voice_id = _extract_voice({"voice": voice_id}, self._settings.default_model)
             self._load_voice(voice_id)
         except Exception as exc:
             logger.warning("Piper preload failed: %s", exc)
             return False
         return True
 
+    def warm_up(self, voice_id: str | None, text: str) -> bool:
+        """Load a voice and run one short synthesis through its session.
+
+        ONNX Runtime allocates and optimizes lazily on the first run, so the
+        first real request would otherwise pay for it. The output is
+        discarded and bypasses the segment pipeline and cache.
+        """
+        if not self.preload(voice_id):
+            return False
+        try:
+            for _ in _synthesize_pcm_chunks(self._voice, text):
+                pass
+        except Exception as exc:
+            logger.warning("Piper warm-up synthesis failed: %s", exc)
+            return False
+        return True
+
+    def unload(self, voice_id: str) -> bool:
+        """Drop a voice from this worker and its voice cache.
+
+        Requests already holding the voice keep using it until they finish.
+        """
+        held = self._voice_id == voice_id
+        if held:
+            self._voice = None
+            self._voice_id = None
+            self._pcm_spec = None
+        if self._voice_cache is None:
+            return held
+        return self._voice_cache.evict(voice_id) or held
+
+    def _iter_pcm(self, voice: Any, voice_id: str, text: str) -> Iterator[bytes]:
+        if self._segment_pipeline is None:
+            return iter(_synthesize_pcm_chunks(voice, text))
+        synthesize: Callable[[str], Iterable[bytes]] = (
+            lambda segment: _synthesize_pcm_chunks(voice, segment)
+        )
+        if self._segment_cache is not None and self._segment_cache.enabled:
+            # The model hash keeps entries from surviving a model file swap.
+            model_hash = voice_content_hash(self._settings, voice_id)
+            synthesize = self._segment_cache.wrap(synthesize, voice_id, model_hash)
+        return self._segment_pipeline.run(synthesize, text, self._pcm_spec)
+
     def _load_voice(self, voice_id: str) -> Any:
+        self._last_voice_load_s = None
         if self._voice is not None and self._voice_id == voice_id:
             logger.info("PiperTtsWorker: reusing cached voice model %s", voice_id)
             return self._voice
@@ -86,6 +224,18 @@ class PiperTtsWorker(BaseWorker):
                 self._voice_id,
                 voice_id,
             )
+        if self._voice_cache is not None:
+            loaded = self._voice_cache.get_or_load(
+                voice_id, lambda: self._load_voice_model(voice_id)
+            )
+        else:
+            loaded = self._load_voice_model(voice_id)
+        self._voice = loaded.voice
+        self._voice_id = voice_id
+        self._pcm_spec = loaded.pcm_spec
+        return self._voice
+
+    def _load_voice_model(self, voice_id: str) -> LoadedVoice:
         if importlib.util.find_spec("piper") is None:
             logger.error(
                 "PiperTtsWorker: Piper module missing; external binary is not used."
@@ -98,22 +248,166 @@ class PiperTtsWorker(BaseWorker):
                 model_path,
             )
             raise FileNotFoundError(f"Piper model file not found: {model_path}")
+        import onnxruntime
+        from piper.config import PiperConfig
         from piper.voice import PiperVoice
 
         logger.info(
             "PiperTtsWorker: loading Piper voice from model path: %s", model_path
         )
-        self._voice = PiperVoice.load(str(model_path))
-        self._voice_id = voice_id
-        self._pcm_spec = _pcm_spec_from_voice(self._voice)
-        return self._voice
+        started = time.perf_counter()
+        with open(f"{model_path}.json", "r", encoding="utf-8") as config_file:
+            config = json.load(config_file)
+        # Same as PiperVoice.load, with our session options instead of the
+        # library defaults, which size every session's thread pool to all cores.
+        voice = PiperVoice(
+            config=PiperConfig.from_dict(config),
+            session=onnxruntime.InferenceSession(
+                str(model_path),
+                sess_options=onnx_session_options(self._settings),
+                providers=["CPUExecutionProvider"],
+            ),
+        )
+        self._last_voice_load_s = time.perf_counter() - started
+        # The model file size is used as the memory estimate for cache budgets;
+        # ONNX Runtime keeps the weights resident for the session lifetime.
+        return LoadedVoice(
+            voice_id=voice_id,
+            voice=voice,
+            pcm_spec=_pcm_spec_from_voice(voice),
+            size_bytes=model_path.stat().st_size,
+        )
 
     def _resolve_model_path(self, voice_id: str) -> Path:
-        # Model paths are resolved only via TtsSettings.models_path; environment
-        # variables are not treated as primary configuration for Piper models.
-        if not self._settings.models_path:
-            raise RuntimeError("Piper models_path is not configured.")
-        return self._settings.models_path / f"{voice_id}.onnx"
+        return resolve_model_path(self._settings, voice_id)
+
+
+def onnx_session_options(settings: TtsSettings) -> Any:
+    """Build ONNX Runtime session options from the `tts.onnx` settings."""
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    intra_op_threads = settings.onnx_intra_op_threads
+    if not intra_op_threads and hasattr(os, "sched_getaffinity"):
+        # ONNX Runtime sizes its default pool to the machine, not to the CPUs
+        # this process may run on (a pinned pool worker or a container).
+        available = len(os.sched_getaffinity(0))
+        if available < (os.cpu_count() or available):
+            intra_op_threads = available
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = settings.onnx_inter_op_threads
+    options.execution_mode = (
+        onnxruntime.ExecutionMode.ORT_PARALLEL
+        if settings.onnx_execution_mode == "parallel"
+        else onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    )
+    options.graph_optimization_level = {
+        "disabled": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }[settings.onnx_graph_optimization]
+    return options
+
+
+class PiperPrewarmBackend:
+    """Loads and unloads Piper voices for the prewarm scheduler.
+
+    Without a pool, voices live in the API process voice cache. With a pool,
+    every idle worker process is asked to load or drop the voice; what the
+    processes hold is not visible here, so `loaded_voices` returns None.
+    """
+
+    def __init__(
+        self,
+        settings: TtsSettings,
+        voice_cache: VoiceCache,
+        pool: ProcessWorkerPool | None = None,
+    ) -> None:
+        self._settings = settings
+        self._voice_cache = voice_cache
+        self._pool = pool
+
+    def loaded_voices(self) -> dict[str, int] | None:
+        if self._pool is not None:
+            return None
+        return self._voice_cache.loaded_sizes()
+
+    def voice_size(self, voice_id: str) -> int | None:
+        try:
+            return resolve_model_path(self._settings, voice_id).stat().st_size
+        except (OSError, RuntimeError):
+            return None
+
+    def load(self, voice_id: str) -> bool:
+        if self._pool is not None:
+            return self._pool.warm({"voice": voice_id}) > 0
+        return PiperTtsWorker(self._settings, voice_cache=self._voice_cache).preload(
+            voice_id
+        )
+
+    def unload(self, voice_id: str) -> bool:
+        if self._pool is not None:
+            return self._pool.unload(voice_id) > 0
+        return self._voice_cache.evict(voice_id)
+
+
+def uses_segment_pipeline(settings: TtsSettings) -> bool:
+    """Return True when Piper input must be split into segments."""
+    return (
+        settings.segment_workers > 1
+        or settings.segment_silence_ms > 0
+        or settings.segment_cache_mb > 0
+    )
+
+
+def voice_exists(settings: TtsSettings, voice_id: str) -> bool:
+    """Return True if `voice_id` names a model file under `models_path`."""
+    if not settings.models_path or not voice_id:
+        return False
+    # Voice ids are plain file stems; anything else could escape models_path.
+    if Path(voice_id).name != voice_id or voice_id.startswith("."):
+        return False
+    return resolve_model_path(settings, voice_id).is_file()
+
+
+def resolve_model_path(settings: TtsSettings, voice_id: str) -> Path:
+    """Return the `.onnx` model path for a Piper voice id."""
+    # Model paths are resolved only via TtsSettings.models_path; environment
+    # variables are not treated as primary configuration for Piper models.
+    if not settings.models_path:
+        raise RuntimeError("Piper models_path is not configured.")
+    return settings.models_path / f"{voice_id}.onnx"
+
+
+def voice_content_hash(settings: TtsSettings, voice_id: str) -> str:
+    """Return a hash of a voice's model file and its `.onnx.json` config.
+
+    The config sets the sample rate, speaker map and noise/length scales, so
+    editing it changes the audio as much as swapping the weights.
+    """
+    model_path = resolve_model_path(settings, voice_id)
+    config_hash = model_file_hash(Path(f"{model_path}.json"))
+    return f"{model_file_hash(model_path)}:{config_hash}"
+
+
+def _produce_pcm(chunks: Iterator[bytes], stream: PcmBufferStream) -> None:
+    try:
+        for chunk in chunks:
+            if stream.cancelled:
+                logger.info("PiperTtsWorker: consumer went away; stopping synthesis")
+                break
+            if chunk:
+                stream.push_pcm(chunk)
+    except Exception as exc:
+        logger.exception("PiperTtsWorker: streaming synthesis failed.")
+        stream.fail(exc)
+        return
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    stream.close()
 
 
 def _extract_text(payload: Any) -> str:
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Component micro-benchmark suite.
+
+Measures the hot paths between synthesis and the HTTP response in isolation:
+Piper PCM normalization per payload type, PCM stream throughput, encoder
+throughput and the dummy worker. Results are written as JSON so runs from
+different commits can be compared with `--compare`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from assistant_api.app.audio.encode_pipeline import EncodePipeline
+from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.encoders.pcm import PcmPassthroughEncoder
+from assistant_api.app.audio.pcm_stream import PcmBufferStream
+from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+from assistant_api.app.workers.tts_dummy import DummyTtsWorker
+from assistant_api.app.workers.tts_piper import (
+    _normalize_pcm_chunk,
+    _synthesize_pcm_chunks,
+)
+
+PCM_SPEC = PcmSpec(sample_rate=SampleRate(22050), channels=Channels(1), sample_width_bytes=2)
+# One second of 22.05 kHz mono audio, roughly one Piper sentence.
+SENTENCE_SAMPLES = 22050
+SENTENCE_BYTES = SENTENCE_SAMPLES * 2
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose optional dependency is unavailable."""
+
+
+# name -> (unit, function). Each function returns (amount, seconds) where
+# amount is measured in the unit's numerator (MB, chunks, ...).
+BENCHMARKS: dict[str, tuple[str, Callable[[int], tuple[float, float]]]] = {}
+
+
+def benchmark(name: str, unit: str) -> Callable[[Callable[[int], tuple[float, float]]], Any]:
+    def register(func: Callable[[int], tuple[float, float]]) -> Callable[[int], tuple[float, float]]:
+        BENCHMARKS[name] = (unit, func)
+        return func
+
+    return register
+
+
+def _samples() -> list[int]:
+    return [(index * 37) % 65536 - 32768 for index in range(SENTENCE_SAMPLES)]
+
+
+def _payloads() -> dict[str, Any]:
+    samples = _samples()
+    payloads: dict[str, Any] = {
+        "bytes": array("h", samples).tobytes(),
+        "array": array("h", samples),
+        "list": samples,
+    }
+    try:
+        import numpy
+
+        payloads["ndarray"] = numpy.asarray(samples, dtype=numpy.int16)
+    except ImportError:
+        pass
+    return payloads
+
+
+def _register_normalize(payload_type: str) -> None:
+    @benchmark(f"piper.normalize_pcm_chunk.{payload_type}", "MB/s")
+    def run(iterations: int) -> tuple[float, float]:
+        payload = _payloads().get(payload_type)
+        if payload is None:
+            raise Skip(f"{payload_type} payloads need numpy")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            _normalize_pcm_chunk(payload)
+        return iterations * SENTENCE_BYTES / 1e6, time.perf_counter() - start
+
+    @benchmark(f"piper.synthesize_pcm_chunks.{payload_type}", "MB/s")
+    def run_synthesize(iterations: int) -> tuple[float, float]:
+        payload = _payloads().get(payload_type)
+        if payload is None:
+            raise Skip(f"{payload_type} payloads need numpy")
+
+        class _StreamingVoice:
+            def synthesize_stream_raw(self, text: str) -> Any:
+                return [payload]
+
+        voice = _StreamingVoice()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _chunk in _synthesize_pcm_chunks(voice, "sentence"):
+                pass
+        return iterations * SENTENCE_BYTES / 1e6, time.perf_counter() - start
+
+
+for _payload_type in ("bytes", "array", "list", "ndarray"):
+    _register_normalize(_payload_type)
+
+
+@benchmark("piper.synthesize_pcm_chunks.audio_chunk", "MB/s")
+def bench_audio_chunk(iterations: int) -> tuple[float, float]:
+    try:
+        import numpy
+        from piper.voice import AudioChunk
+    except ImportError as exc:
+        raise Skip(f"piper is not installed ({exc})") from exc
+    audio = numpy.linspace(-0.5, 0.5, SENTENCE_SAMPLES, dtype=numpy.float32)
+    chunk = AudioChunk(22050, 2, 1, audio, [], [])
+
+    class _Voice:
+        def synthesize(self, text: str) -> Any:
+            return iter([chunk])
+
+    voice = _Voice()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for _pcm in _synthesize_pcm_chunks(voice, "sentence"):
+            pass
+    return iterations * SENTENCE_BYTES / 1e6, time.perf_counter() - start
+
+
+def _stream_throughput(max_buffered_bytes: int | None, iterations: int) -> tuple[float, float]:
+    chunk = b"\x01\x00" * 2048
+    stream = PcmBufferStream(max_buffered_bytes=max_buffered_bytes)
+
+    def produce() -> None:
+        for _ in range(iterations):
+            stream.push_pcm(chunk)
+        stream.close()
+
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while stream.read_encoded() is not None:
+        pass
+    producer.join()
+    return iterations * len(chunk) / 1e6, time.perf_counter() - start
+
+
+@benchmark("stream.pcm_buffer.unbounded", "MB/s")
+def bench_stream_unbounded(iterations: int) -> tuple[float, float]:
+    return _stream_throughput(None, iterations * 20)
+
+
+@benchmark("stream.pcm_buffer.bounded_64k", "MB/s")
+def bench_stream_bounded(iterations: int) -> tuple[float, float]:
+    return _stream_throughput(64 * 1024, iterations * 20)
+
+
+def _encoder_factory(name: str) -> Callable[[], AudioEncoder]:
+    if name == "pcm":
+        return lambda: PcmPassthroughEncoder(PCM_SPEC)
+    try:
+        if name == "mp3":
+            from assistant_api.app.audio.encoders.mp3 import Mp3Encoder
+
+            return lambda: Mp3Encoder(PCM_SPEC)
+        from assistant_api.app.audio.encoders.opus import OpusEncoder
+
+        # Opus only accepts 8/12/16/24/48 kHz input.
+        opus_spec = PcmSpec(sample_rate=SampleRate(24000), channels=Channels(1))
+        return lambda: OpusEncoder(opus_spec)
+    except Exception as exc:
+        raise Skip(f"{name} encoder unavailable ({exc})") from exc
+
+
+def _register_encoder(name: str) -> None:
+    @benchmark(f"encoder.{name}", "MB/s")
+    def run(iterations: int) -> tuple[float, float]:
+        encoder = _encoder_factory(name)()
+        chunk = array("h", _samples()).tobytes()[:8192]
+        start = time.perf_counter()
+        for _ in range(iterations * 5):
+            encoder.encode_chunk(chunk)
+        encoder.flush()
+        return iterations * 5 * len(chunk) / 1e6, time.perf_counter() - start
+
+    @benchmark(f"encode_pipeline.{name}", "MB/s")
+    def run_pipeline(iterations: int) -> tuple[float, float]:
+        encoder = _encoder_factory(name)()
+        chunk = array("h", _samples()).tobytes()[:8192]
+        source = PcmBufferStream()
+        for _ in range(iterations * 5):
+            source.push_pcm(chunk)
+        source.close()
+        start = time.perf_counter()
+        pipeline = EncodePipeline(source, encoder, threaded=True, max_buffered_bytes=256 * 1024)
+        while pipeline.read_encoded() is not None:
+            pass
+        return iterations * 5 * len(chunk) / 1e6, time.perf_counter() - start
+
+
+for _encoder_name in ("pcm", "mp3", "opus"):
+    _register_encoder(_encoder_name)
+
+
+@benchmark("worker.dummy.process", "MB/s")
+def bench_dummy_worker(iterations: int) -> tuple[float, float]:
+    worker = DummyTtsWorker(max_buffered_bytes=None)
+    text = "The quick brown fox jumps over the lazy dog. " * 20
+    produced = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        stream = worker.process({"text": text})
+        while (chunk := stream.read_encoded()) is not None:
+            produced += len(chunk)
+    return produced / 1e6, time.perf_counter() - start
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_suite(names: list[str], iterations: int, repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for name in names:
+        unit, func = BENCHMARKS[name]
+        entry: dict[str, Any] = {"name": name, "unit": unit}
+        try:
+            func(max(1, iterations // 10))  # warm-up
+            rates = []
+            for _ in range(repeat):
+                amount, seconds = func(iterations)
+                rates.append(amount / seconds if seconds > 0 else float("inf"))
+        except Skip as exc:
+            entry.update(status="skipped", reason=str(exc))
+        else:
+            entry.update(
+                status="ok",
+                best=max(rates),
+                median=statistics.median(rates),
+                runs=rates,
+            )
+        results.append(entry)
+        _print_entry(entry)
+    return results
+
+
+def _print_entry(entry: dict[str, Any], baseline: dict[str, Any] | None = None) -> None:
+    if entry["status"] != "ok":
+        print(f"{entry['name']:<45} skipped: {entry['reason']}", file=sys.stderr)
+        return
+    line = f"{entry['name']:<45} {entry['median']:>12.2f} {entry['unit']}"
+    if baseline and baseline.get("status") == "ok" and baseline["median"]:
+        line += f"  ({entry['median'] / baseline['median']:.2f}x baseline)"
+    print(line, file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks containing this text")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON file to compare medians against")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    names = [name for name in BENCHMARKS if args.filter in name]
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "repeat": args.repeat,
+        "results": run_suite(names, args.iterations, args.repeat),
+    }
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        by_name = {entry["name"]: entry for entry in baseline.get("results", [])}
+        print(f"\nCompared with {args.compare} ({baseline.get('commit')}):", file=sys.stderr)
+        for entry in report["results"]:
+            _print_entry(entry, by_name.get(entry["name"]))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
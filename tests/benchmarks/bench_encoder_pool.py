@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark pooled versus per-request encoder construction.
+
+Each simulated request obtains an encoder, encodes a short utterance in
+streaming-sized chunks and flushes it. The unpooled run builds a new encoder
+per request, as `/v1/audio/speech` did before the encoder pool; the pooled
+run goes through `EncoderPool`, which resets encoders on release. MP3
+encoders cannot be reset, so with `--format mp3` both runs build one per
+request and the pooled run only adds the pool's overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from assistant_api.app.audio.encoder import AudioEncoder
+from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+from assistant_api.app.core.encoder_pool import EncoderPool
+
+
+def _factory(audio_format: str, pcm_spec: PcmSpec) -> Callable[[], AudioEncoder]:
+    if audio_format == "mp3":
+        from assistant_api.app.audio.encoders.mp3 import Mp3Encoder
+
+        return lambda: Mp3Encoder(pcm_spec)
+    from assistant_api.app.audio.encoders.opus import OpusEncoder
+
+    return lambda: OpusEncoder(pcm_spec)
+
+
+def _request(encoder: AudioEncoder, chunks: list[bytes]) -> None:
+    for chunk in chunks:
+        encoder.encode_chunk(chunk)
+    encoder.flush()
+
+
+def _timed(action: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=["mp3", "opus"], default="opus")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--audio-ms", type=int, default=200, help="Audio per request")
+    parser.add_argument("--chunk-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    pcm_spec = PcmSpec(
+        sample_rate=SampleRate(args.sample_rate),
+        channels=Channels(1),
+        sample_width_bytes=2,
+    )
+    chunk = b"\x10\x00" * (args.sample_rate * args.chunk_ms // 1000)
+    chunks = [chunk] * max(1, args.audio_ms // args.chunk_ms)
+    factory = _factory(args.format, pcm_spec)
+    pool = EncoderPool(max_idle=4)
+    key = (args.format, pcm_spec)
+
+    unpooled = [_timed(lambda: _request(factory(), chunks)) for _ in range(args.requests)]
+    # The reset in `release` runs after the last byte has been sent, still on
+    # the request thread, so it is timed apart and counts toward request cost.
+    pooled: list[float] = []
+    releases: list[float] = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        encoder = pool.acquire(key, factory)
+        _request(encoder, chunks)
+        pooled.append(time.perf_counter() - start)
+        releases.append(_timed(lambda: pool.release(key, encoder)))
+
+    print(f"{args.format}: {args.requests} requests of {args.audio_ms} ms audio")
+    for name, timings in (
+        ("unpooled", unpooled),
+        ("pooled", pooled),
+        ("pooled release", releases),
+    ):
+        print(
+            f"{name:>15}: mean {statistics.mean(timings) * 1000:7.3f} ms  "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95)] * 1000:7.3f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
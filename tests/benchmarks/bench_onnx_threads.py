@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""ONNX Runtime threading benchmark for concurrent Piper synthesis.
+
+Runs a grid of `tts.onnx` session options against a real Piper voice and
+reports synthesis throughput for N concurrent requests, so the
+throughput-optimal `intra_op_threads` (and pool CPU pinning) can be picked
+for a given machine and expected concurrency.
+
+With `--mode threads`, N threads share one in-process voice session, as
+requests do without a process pool. With `--mode pool`, N pool worker
+processes each own a session, optionally pinned to their own CPUs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from assistant_api.app.audio.stream import AudioStream
+from assistant_api.app.audio.types import PcmSpec
+from assistant_api.app.settings import TtsSettings
+from assistant_api.app.workers.pool import ProcessWorkerPool, partition_cpus
+from assistant_api.app.workers.tts_piper import PiperTtsWorker
+
+TEXTS = (
+    "Your call is important to us. Please stay on the line.",
+    "The weather today is mostly sunny, with a light breeze from the west "
+    "and temperatures reaching twenty two degrees in the afternoon.",
+    "Press one for sales, two for support, or stay on the line to speak "
+    "with an operator.",
+)
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _drain(stream: AudioStream) -> int:
+    total = 0
+    while True:
+        chunk = stream.read_encoded()
+        if chunk is None:
+            return total
+        total += len(chunk)
+
+
+def _run_clients(
+    concurrency: int,
+    requests: int,
+    synthesize: Any,
+) -> tuple[float, list[float], int]:
+    """Run `requests` syntheses on each of `concurrency` threads."""
+    latencies: list[float] = []
+    pcm_bytes = [0]
+    lock = threading.Lock()
+    errors: list[BaseException] = []
+
+    def client(offset: int) -> None:
+        try:
+            for index in range(requests):
+                started = time.perf_counter()
+                produced = synthesize(TEXTS[(offset + index) % len(TEXTS)])
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    pcm_bytes[0] += produced
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [
+        threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return wall_s, latencies, pcm_bytes[0]
+
+
+def _bench_threads(
+    settings: TtsSettings, concurrency: int, requests: int
+) -> tuple[float, list[float], int, PcmSpec | None]:
+    worker = PiperTtsWorker(settings)
+    voice_id = settings.default_model or ""
+    if not worker.warm_up(voice_id, TEXTS[0]):
+        raise RuntimeError(f"Could not load voice {voice_id}.")
+
+    def synthesize(text: str) -> int:
+        return _drain(worker.process({"text": text, "voice": voice_id}))
+
+    wall_s, latencies, pcm_bytes = _run_clients(concurrency, requests, synthesize)
+    return wall_s, latencies, pcm_bytes, worker.pcm_spec
+
+
+def _bench_pool(
+    settings: TtsSettings, concurrency: int, requests: int, pin: bool
+) -> tuple[float, list[float], int, PcmSpec | None]:
+    pool = ProcessWorkerPool(
+        PiperTtsWorker.for_worker_process,
+        (settings,),
+        size=concurrency,
+        name="bench-piper",
+        cpu_sets=partition_cpus(concurrency) if pin else (),
+    )
+    pool.start()
+    specs: list[PcmSpec | None] = []
+    try:
+        voice_id = settings.default_model or ""
+        pool.warm({"voice": voice_id, "text": TEXTS[0]})
+
+        def synthesize(text: str) -> int:
+            stream = pool.submit({"text": text, "voice": voice_id})
+            produced = _drain(stream)
+            specs.append(stream.pcm_spec)
+            return produced
+
+        wall_s, latencies, pcm_bytes = _run_clients(concurrency, requests, synthesize)
+    finally:
+        pool.shutdown()
+    return wall_s, latencies, pcm_bytes, specs[0] if specs else None
+
+
+def run_grid(args: argparse.Namespace) -> list[dict[str, Any]]:
+    model = Path(args.model).resolve()
+    base = TtsSettings(
+        engine="piper",
+        models_path=model.parent,
+        default_model=model.stem,
+        streaming_enabled=False,
+        onnx_execution_mode=args.execution_mode,
+        onnx_graph_optimization=args.graph_optimization,
+    )
+    results = []
+    for concurrency in args.concurrency:
+        for intra_op in args.intra_op:
+            for inter_op in args.inter_op:
+                settings = replace(
+                    base,
+                    onnx_intra_op_threads=intra_op,
+                    onnx_inter_op_threads=inter_op,
+                )
+                if args.mode == "pool":
+                    wall_s, latencies, pcm_bytes, pcm_spec = _bench_pool(
+                        settings, concurrency, args.requests, args.pin
+                    )
+                else:
+                    wall_s, latencies, pcm_bytes, pcm_spec = _bench_threads(
+                        settings, concurrency, args.requests
+                    )
+                bytes_per_second = (
+                    pcm_spec.sample_rate * pcm_spec.channels * pcm_spec.sample_width_bytes
+                    if pcm_spec
+                    else 22050 * 2
+                )
+                audio_s = pcm_bytes / bytes_per_second
+                latencies.sort()
+                entry = {
+                    "concurrency": concurrency,
+                    "intra_op_threads": intra_op,
+                    "inter_op_threads": inter_op,
+                    "requests": len(latencies),
+                    "wall_s": wall_s,
+                    "audio_s": audio_s,
+                    # Seconds of audio produced per second of wall time.
+                    "throughput_x_realtime": audio_s / wall_s if wall_s > 0 else 0.0,
+                    "latency_p50_s": statistics.median(latencies),
+                    "latency_p95_s": latencies[math.ceil(len(latencies) * 0.95) - 1],
+                }
+                results.append(entry)
+                print(
+                    f"concurrency={concurrency:<3} intra_op={intra_op:<3} inter_op={inter_op:<3}"
+                    f" throughput={entry['throughput_x_realtime']:7.2f}x realtime"
+                    f" p50={entry['latency_p50_s']:.3f}s p95={entry['latency_p95_s']:.3f}s",
+                    file=sys.stderr,
+                )
+    for concurrency in args.concurrency:
+        level = [entry for entry in results if entry["concurrency"] == concurrency]
+        best = max(level, key=lambda entry: entry["throughput_x_realtime"])
+        best["best"] = True
+        print(
+            f"best for concurrency {concurrency}: intra_op_threads="
+            f"{best['intra_op_threads']} inter_op_threads={best['inter_op_threads']}",
+            file=sys.stderr,
+        )
+    return results
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", required=True, help="Piper .onnx voice (with its .onnx.json)")
+    parser.add_argument("--mode", choices=("threads", "pool"), default="threads")
+    parser.add_argument("--pin", action="store_true", help="Pin pool processes to CPU sets")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--intra-op", type=_int_list, default=[0, 1, 2, 4])
+    parser.add_argument("--inter-op", type=_int_list, default=[0])
+    parser.add_argument("--execution-mode", choices=("sequential", "parallel"), default="sequential")
+    parser.add_argument(
+        "--graph-optimization",
+        choices=("disabled", "basic", "extended", "all"),
+        default="all",
+    )
+    parser.add_argument("--requests", type=int, default=6, help="Requests per client thread")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "mode": args.mode,
+        "pin": args.pin,
+        "execution_mode": args.execution_mode,
+        "graph_optimization": args.graph_optimization,
+        "results": run_grid(args),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
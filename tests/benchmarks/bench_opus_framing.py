@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for OpusEncoder frame slicing.
+
+Compares the ring-buffer OpusEncoder against the previous bytearray
+implementation (copy each frame, then delete it from the front of the
+buffer) on multi-second PCM chunks. With --null-codec the libopus call is
+replaced by a no-op so only buffering and slicing are measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from assistant_api.app.audio.encoders.opus import OpusEncoder
+from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+
+
+class _NullCodec:
+    def encode(self, pcm: object, frame_size: int) -> bytes:
+        return b"\x00"
+
+
+class _LegacyFraming:
+    """The pre-ring-buffer slicing strategy, kept here for comparison."""
+
+    def __init__(self, codec: object, frame_size: int, frame_bytes: int) -> None:
+        self._codec = codec
+        self._frame_size = frame_size
+        self._frame_bytes = frame_bytes
+        self._buffer = bytearray()
+
+    def encode_chunk(self, chunk: bytes) -> bytes:
+        self._buffer.extend(chunk)
+        output = bytearray()
+        while len(self._buffer) >= self._frame_bytes:
+            frame = bytes(self._buffer[: self._frame_bytes])
+            del self._buffer[: self._frame_bytes]
+            output.extend(self._codec.encode(frame, self._frame_size))
+        return bytes(output)
+
+    def flush(self) -> bytes | None:
+        if not self._buffer:
+            return None
+        padded = bytes(self._buffer) + b"\x00" * (self._frame_bytes - len(self._buffer))
+        self._buffer.clear()
+        return self._codec.encode(padded, self._frame_size)
+
+
+def _run(factory: Callable[[], object], chunk: bytes, chunks: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        encoder = factory()
+        start = time.perf_counter()
+        for _ in range(chunks):
+            encoder.encode_chunk(chunk)
+        encoder.flush()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample-rate", type=int, default=22050)
+    parser.add_argument("--chunk-seconds", type=float, default=5.0)
+    parser.add_argument("--chunks", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--null-codec", action="store_true", help="Skip libopus calls")
+    args = parser.parse_args()
+
+    pcm_spec = PcmSpec(
+        sample_rate=SampleRate(args.sample_rate),
+        channels=Channels(1),
+        sample_width_bytes=2,
+    )
+    # Odd-length chunks keep a partial frame in the buffer between calls.
+    chunk = b"\x01\x00" * int(args.sample_rate * args.chunk_seconds) + b"\x01\x00"
+    frame_size = args.sample_rate * OpusEncoder._FRAME_DURATION_MS // 1000
+    frame_bytes = frame_size * 2
+
+    def ring() -> OpusEncoder:
+        encoder = OpusEncoder(pcm_spec)
+        if args.null_codec:
+            encoder._encoder = _NullCodec()
+        return encoder
+
+    def legacy() -> _LegacyFraming:
+        codec = _NullCodec() if args.null_codec else ring()._encoder
+        return _LegacyFraming(codec, frame_size, frame_bytes)
+
+    audio_seconds = args.chunk_seconds * args.chunks
+    for name, factory in (("legacy", legacy), ("ring", ring)):
+        elapsed = _run(factory, chunk, args.chunks, args.repeat)
+        print(
+            f"{name:>6}: {elapsed * 1000:8.2f} ms for {audio_seconds:.1f} s of audio "
+            f"({audio_seconds / elapsed:8.1f}x real time)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Load generator and latency report for /v1/audio/speech.
+
+Drives the API either in-process through ASGI (no sockets, `--config`), a
+local uvicorn started by this script (`--config --uvicorn`), or an already
+running server (`--url`). Requests come from a mix of texts, voices and
+formats, or from a JSONL trace replayed in order. For each concurrency
+level the report gives throughput and p50/p95/p99 time-to-first-byte and
+total latency per format.
+
+Runs fully offline with a config that uses the `dummy` engine; set
+`tts.dummy.real_time_factor` and `sentence_latency_ms` there to imitate
+Piper timing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+DEFAULT_TEXTS = [
+    "Hello.",
+    "Your order has shipped. Is there anything else I can help you with?",
+    "The weather today is sunny with a high of twenty two degrees. "
+    "Tomorrow will be cloudy, with light rain expected in the evening.",
+    "Reminder: your meeting with the design team starts in fifteen minutes. "
+    "The agenda has been shared in the calendar invite. "
+    "Please review the latest mockups before joining.",
+]
+
+
+@dataclass
+class RequestSpec:
+    input: str
+    voice: str | None = None
+    format: str = "mp3"
+    delay_ms: float = 0.0
+    sample_rate: int | None = None
+
+    def body(self) -> dict[str, Any]:
+        body: dict[str, Any] = {"input": self.input, "format": self.format}
+        if self.voice:
+            body["voice"] = self.voice
+        if self.sample_rate:
+            body["sample_rate"] = self.sample_rate
+        return body
+
+
+@dataclass
+class RequestResult:
+    format: str
+    status: int
+    ttfb_s: float | None
+    total_s: float
+    bytes: int
+    error: str | None = None
+
+
+Sender = Callable[[RequestSpec], Awaitable[RequestResult]]
+
+
+def load_trace(path: Path) -> list[RequestSpec]:
+    specs = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            specs.append(
+                RequestSpec(
+                    input=entry.get("input") or entry.get("text") or "",
+                    voice=entry.get("voice"),
+                    format=entry.get("format") or "mp3",
+                    delay_ms=float(entry.get("delay_ms", 0.0)),
+                    sample_rate=entry.get("sample_rate"),
+                )
+            )
+    return specs
+
+
+def build_mix(
+    texts: list[str],
+    voices: list[str | None],
+    formats: list[str],
+    count: int,
+    seed: int,
+    sample_rate: int | None = None,
+) -> list[RequestSpec]:
+    rng = random.Random(seed)
+    return [
+        RequestSpec(
+            input=rng.choice(texts),
+            voice=rng.choice(voices),
+            format=rng.choice(formats),
+            sample_rate=sample_rate,
+        )
+        for _ in range(count)
+    ]
+
+
+def asgi_sender(app: Any) -> Sender:
+    """Send requests straight into the ASGI app, timing body messages."""
+
+    async def send_request(spec: RequestSpec) -> RequestResult:
+        payload = json.dumps(spec.body()).encode("utf-8")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/v1/audio/speech",
+            "raw_path": b"/v1/audio/speech",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"loadgen"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadgen", 80),
+        }
+        request_sent = False
+        disconnected = asyncio.Event()
+        status = 0
+        first_byte: float | None = None
+        received = 0
+        start = time.perf_counter()
+
+        async def receive() -> dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status, first_byte, received
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if body and first_byte is None:
+                    first_byte = time.perf_counter()
+                received += len(body)
+
+        try:
+            await app(scope, receive, send)
+        except Exception as exc:
+            return RequestResult(spec.format, status, None, time.perf_counter() - start, received, repr(exc))
+        finally:
+            disconnected.set()
+        return _result(spec, status, start, first_byte, received)
+
+    return send_request
+
+
+def http_sender(base_url: str, client: Any) -> Sender:
+    """Send requests to a running server over HTTP with streaming reads."""
+    url = base_url.rstrip("/") + "/v1/audio/speech"
+
+    async def send_request(spec: RequestSpec) -> RequestResult:
+        start = time.perf_counter()
+        first_byte: float | None = None
+        received = 0
+        try:
+            async with client.stream("POST", url, json=spec.body()) as response:
+                async for chunk in response.aiter_raw():
+                    if chunk and first_byte is None:
+                        first_byte = time.perf_counter()
+                    received += len(chunk)
+                status = response.status_code
+        except Exception as exc:
+            return RequestResult(spec.format, 0, None, time.perf_counter() - start, received, repr(exc))
+        return _result(spec, status, start, first_byte, received)
+
+    return send_request
+
+
+def _result(
+    spec: RequestSpec,
+    status: int,
+    start: float,
+    first_byte: float | None,
+    received: int,
+) -> RequestResult:
+    end = time.perf_counter()
+    return RequestResult(
+        format=spec.format,
+        status=status,
+        ttfb_s=None if first_byte is None else first_byte - start,
+        total_s=end - start,
+        bytes=received,
+        error=None if status == 200 else f"HTTP {status}",
+    )
+
+
+async def run_level(
+    send_request: Sender,
+    specs: list[RequestSpec],
+    concurrency: int,
+    replay_delays: bool,
+) -> tuple[list[RequestResult], float]:
+    queue: asyncio.Queue[RequestSpec] = asyncio.Queue()
+    for spec in specs:
+        queue.put_nowait(spec)
+    results: list[RequestResult] = []
+    started = time.perf_counter()
+
+    async def client_loop() -> None:
+        while True:
+            try:
+                spec = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if replay_delays and spec.delay_ms:
+                await asyncio.sleep(spec.delay_ms / 1000)
+            results.append(await send_request(spec))
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(results: list[RequestResult], elapsed_s: float) -> dict[str, Any]:
+    by_format: dict[str, list[RequestResult]] = defaultdict(list)
+    for result in results:
+        by_format[result.format].append(result)
+    by_format["all"] = results
+    summary: dict[str, Any] = {}
+    for name, group in by_format.items():
+        ok = [result for result in group if result.error is None]
+        ttfb = [result.ttfb_s for result in ok if result.ttfb_s is not None]
+        total = [result.total_s for result in ok]
+        summary[name] = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "throughput_rps": len(ok) / elapsed_s if elapsed_s else None,
+            "bytes_per_s": sum(result.bytes for result in ok) / elapsed_s if elapsed_s else None,
+            "ttfb_s": {f"p{int(q * 100)}": percentile(ttfb, q) for q in (0.5, 0.95, 0.99)},
+            "total_s": {f"p{int(q * 100)}": percentile(total, q) for q in (0.5, 0.95, 0.99)},
+        }
+    return summary
+
+
+def print_report(level: int, elapsed_s: float, summary: dict[str, Any]) -> None:
+    print(f"\nconcurrency={level} elapsed={elapsed_s:.2f}s", file=sys.stderr)
+    print(
+        f"{'format':<8}{'req':>6}{'err':>5}{'req/s':>9}"
+        f"{'ttfb p50':>10}{'p95':>8}{'p99':>8}{'total p50':>11}{'p95':>8}{'p99':>8}",
+        file=sys.stderr,
+    )
+
+    def ms(value: float | None) -> str:
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    for name, row in summary.items():
+        print(
+            f"{name:<8}{row['requests']:>6}{row['errors']:>5}{row['throughput_rps'] or 0:>9.1f}"
+            f"{ms(row['ttfb_s']['p50']):>10}{ms(row['ttfb_s']['p95']):>8}{ms(row['ttfb_s']['p99']):>8}"
+            f"{ms(row['total_s']['p50']):>11}{ms(row['total_s']['p95']):>8}{ms(row['total_s']['p99']):>8}",
+            file=sys.stderr,
+        )
+
+
+def load_app(config_path: str) -> Any:
+    from assistant_api.app.main import create_app
+
+    return create_app(Path(config_path))
+
+
+def start_uvicorn(config_path: str, host: str) -> tuple[subprocess.Popen[bytes], str]:
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        port = probe.getsockname()[1]
+    code = (
+        "import sys, uvicorn; "
+        f"sys.argv = ['assistant-api', '--config', {config_path!r}]; "
+        f"uvicorn.run('assistant_api.app.main:app', host={host!r}, port={port}, log_level='warning')"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code], env=os.environ.copy())
+    url = f"http://{host}:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return process, url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start listening in time")
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    if args.trace:
+        specs = load_trace(Path(args.trace))
+    else:
+        texts = DEFAULT_TEXTS
+        if args.texts:
+            texts = [
+                line.strip()
+                for line in Path(args.texts).read_text(encoding="utf-8").splitlines()
+                if line.strip()
+            ]
+        voices: list[str | None] = list(args.voices) if args.voices else [None]
+        specs = build_mix(
+            texts, voices, args.formats, args.requests, args.seed, args.sample_rate
+        )
+
+    server: subprocess.Popen[bytes] | None = None
+    client = None
+    lifespan = None
+    try:
+        if args.url or args.uvicorn:
+            import httpx
+
+            url = args.url
+            if url is None:
+                server, url = start_uvicorn(args.config, args.host)
+            client = httpx.AsyncClient(timeout=args.timeout, limits=httpx.Limits(max_connections=None))
+            send_request = http_sender(url, client)
+            target = url
+        else:
+            app = load_app(args.config)
+            lifespan = app.router.lifespan_context(app)
+            await lifespan.__aenter__()
+            send_request = asgi_sender(app)
+            target = "asgi"
+
+        if args.warmup:
+            await run_level(send_request, specs[: args.warmup], 1, False)
+        levels = []
+        for level in args.concurrency:
+            results, elapsed = await run_level(send_request, specs, level, bool(args.trace))
+            summary = summarize(results, elapsed)
+            print_report(level, elapsed, summary)
+            errors = [result.error for result in results if result.error][:5]
+            levels.append(
+                {
+                    "concurrency": level,
+                    "elapsed_s": elapsed,
+                    "summary": summary,
+                    "sample_errors": errors,
+                    "results": [asdict(result) for result in results] if args.raw else None,
+                }
+            )
+        return {"target": target, "requests_per_level": len(specs), "levels": levels}
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if client is not None:
+            await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_argument_group("target")
+    target.add_argument("--config", help="Service config for in-process or --uvicorn runs")
+    target.add_argument("--uvicorn", action="store_true", help="Start a local uvicorn with --config")
+    target.add_argument("--url", help="Base URL of an already running server")
+    target.add_argument("--host", default="127.0.0.1", help="Host for --uvicorn")
+    workload = parser.add_argument_group("workload")
+    workload.add_argument("--trace", help="JSONL trace: input/text, voice, format, delay_ms per line")
+    workload.add_argument("--texts", help="File with one input text per line")
+    workload.add_argument("--voices", nargs="*", help="Voices to mix (default: server default)")
+    workload.add_argument("--formats", nargs="+", default=["mp3", "opus", "pcm"])
+    workload.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    workload.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 4, 16],
+        help="Comma-separated concurrency levels (default: 1,4,16)",
+    )
+    workload.add_argument(
+        "--sample-rate", type=int, help="Request this output sample rate (default: voice native)"
+    )
+    workload.add_argument("--warmup", type=int, default=5, help="Sequential warm-up requests")
+    workload.add_argument("--seed", type=int, default=0)
+    workload.add_argument("--timeout", type=float, default=120.0)
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    output.add_argument("--raw", action="store_true", help="Include every request in the report")
+    args = parser.parse_args()
+    if not args.url and not args.config:
+        parser.error("either --config or --url is required")
+    if args.uvicorn and args.url:
+        parser.error("--uvicorn and --url are mutually exclusive")
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Regression check: Ogg Opus granule positions at page boundaries.
+
+Encodes PCM of many lengths, including ones whose padded last frame exactly
+fills a page (for example 11 frames with one frame on the first page and 10
+per later page), and checks every stream against RFC 7845:
+
+- granule positions never decrease from one audio page to the next;
+- the last page has the end-of-stream flag, and carries the padded last
+  packet when the input ended mid-frame;
+- its granule position trims the padding: pre-skip plus the input length.
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+
+from assistant_api.app.audio.encoders.ogg import OPUS_GRANULE_RATE
+from assistant_api.app.audio.encoders.opus import OpusEncoder
+from assistant_api.app.audio.types import Channels, PcmSpec, SampleRate
+
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_FLAG_EOS = 0x04
+
+
+def _pages(stream: bytes) -> list[tuple[int, int, int]]:
+    """Return (flags, granule, segment count) for every page."""
+    pages = []
+    offset = 0
+    while offset < len(stream):
+        _, _, flags, granule, _, _, _, segments = _PAGE_HEADER.unpack_from(stream, offset)
+        lacing = stream[offset + _PAGE_HEADER.size : offset + _PAGE_HEADER.size + segments]
+        pages.append((flags, granule, segments))
+        offset += _PAGE_HEADER.size + segments + sum(lacing)
+    return pages
+
+
+def _check(sample_rate: int, samples: int, first_page: int, per_page: int) -> str | None:
+    spec = PcmSpec(sample_rate=SampleRate(sample_rate), channels=Channels(1), sample_width_bytes=2)
+    encoder = OpusEncoder(spec, first_page_frames=first_page, frames_per_page=per_page)
+    stream = encoder.encode_chunk(bytes(samples * 2)) + (encoder.flush() or b"")
+    # The first two pages are OpusHead and OpusTags.
+    audio = _pages(stream)[2:]
+    pre_skip = encoder._muxer._pre_skip
+    expected = pre_skip + samples * OPUS_GRANULE_RATE // sample_rate
+    granules = [granule for _, granule, _ in audio]
+    if granules != sorted(granules):
+        return f"granule positions decrease: {granules}"
+    flags, granule, segments = audio[-1]
+    if not flags & _FLAG_EOS:
+        return "last page is not end-of-stream"
+    if not segments and samples % (sample_rate // 50):
+        return "end-of-stream page does not carry the padded packet"
+    if granule != expected:
+        return f"final granule {granule}, expected {expected}"
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample-rate", type=int, default=16_000)
+    parser.add_argument("--max-frames", type=int, default=25)
+    args = parser.parse_args()
+
+    frame = args.sample_rate // 50
+    failures = 0
+    for first_page, per_page in ((1, 10), (1, 1), (3, 4)):
+        for frames in range(1, args.max_frames + 1):
+            # Exactly whole frames, and a partial last frame that is padded.
+            for samples in (frames * frame, frames * frame - frame // 3):
+                error = _check(args.sample_rate, samples, first_page, per_page)
+                if error:
+                    failures += 1
+                    print(
+                        f"FAIL pages={first_page}/{per_page} samples={samples}: {error}",
+                        file=sys.stderr,
+                    )
+    if failures:
+        return 1
+    print("OK: granule positions valid at every page boundary", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
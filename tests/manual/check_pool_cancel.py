@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Regression check: cancelling a pooled stream after its job has finished.
+
+A client that disconnects near the end of a synthesis cancels a stream whose
+worker process has already sent its final "end". The cancel must not leave a
+reply in the pipe, or the next job on that slot reads it instead of its spec
+and the process is restarted. This runs that sequence against a one-process
+pool with the dummy worker and fails if any job errors or the process
+restarts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from assistant_api.app.settings import TtsSettings
+from assistant_api.app.workers.pool import ProcessWorkerPool
+from assistant_api.app.workers.tts_dummy import DummyTtsWorker
+
+
+def _drain(stream) -> int:
+    total = 0
+    while True:
+        chunk = stream.read_encoded()
+        if chunk is None:
+            return total
+        total += len(chunk)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--settle-s",
+        type=float,
+        default=0.5,
+        help="Wait after the first chunk so the job finishes before the cancel",
+    )
+    args = parser.parse_args()
+
+    pool = ProcessWorkerPool(
+        DummyTtsWorker.for_worker_process,
+        (TtsSettings(engine="dummy", models_path=Path("."), default_model=None),),
+        size=1,
+        name="check-cancel",
+    )
+    pool.start()
+    try:
+        for round_index in range(args.rounds):
+            stream = pool.submit({"text": "Hi."})
+            stream.read_encoded()
+            time.sleep(args.settle_s)
+            stream.cancel()
+            produced = _drain(pool.submit({"text": "Hello again."}))
+            print(f"round {round_index}: next job produced {produced} bytes", file=sys.stderr)
+        restarts = pool.restart_count()
+    finally:
+        pool.shutdown()
+    if restarts:
+        print(f"FAIL: worker process restarted {restarts} times", file=sys.stderr)
+        return 1
+    print("OK: no stray replies after cancel", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())